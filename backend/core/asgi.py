@@ -2,6 +2,13 @@
 ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Only the server-sent events stream (/api/tasks/events/) is served through
+it, by a separate gunicorn service with the uvicorn worker, so long-lived
+streams do not tie up a thread each. Everything else runs on the WSGI
+service (``core.wsgi``): Django's ASGI handler reads synchronous streaming
+responses such as exports and file downloads fully into memory before
+sending them, so any other path gets a 404 here. Clients reach the
+stream through a proxy route for its path or at the service's own URL.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -13,4 +20,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from django.urls import reverse  # noqa: E402 (needs the apps loaded above)
+
+ASGI_PATHS = frozenset([reverse('task-events')])
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] not in ASGI_PATHS:
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+        })
+        await send({'type': 'http.response.body', 'body': b'Not served by the events service.\n'})
+        return
+    await django_application(scope, receive, send)
@@ -0,0 +1,168 @@
+"""
+Permission-checked file downloads with HTTP Range support.
+
+Views look up the object (and so check access) and hand its FileField to
+``serve_file``. By default the file is streamed in blocks: a single
+satisfiable ``Range`` gets a 206 with just those bytes, an unsatisfiable
+one a 416, and anything else the whole file. Under WSGI the body is a
+``FileResponse``; under ASGI it is an async iterator reading one block at a
+time in a worker thread, since Django's ASGI handler would collect a sync
+iterator into memory before sending anything.
+
+When ``MEDIA_ACCEL_REDIRECT_PREFIX`` is set, the response carries only an
+``X-Accel-Redirect`` header and the front proxy sends the file itself,
+Range requests included, so workers never copy file bytes. The prefix must
+map to ``MEDIA_ROOT`` through an internal location, for example in nginx::
+
+    location /protected-media/ {
+        internal;
+        alias /app/media/;
+    }
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class RangeFile:
+    """Read-only view of ``length`` bytes of an open file starting at ``start``"""
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return (start, end) for a single satisfiable byte range, or None to send
+    the whole file (no header, multiple ranges or a malformed one, which the
+    spec allows us to ignore). Raise RangeNotSatisfiable otherwise.
+    """
+    match = RANGE_HEADER.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, end
+
+
+def _content_disposition(filename, as_attachment):
+    disposition = 'attachment' if as_attachment else 'inline'
+    try:
+        filename.encode('ascii')
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+async def _read_blocks(file, block_size):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        while True:
+            block = await read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        await sync_to_async(file.close, thread_sensitive=False)()
+
+
+def _file_response(request, file, **kwargs):
+    """A streaming response over ``file`` that the current server can send without buffering"""
+    # DRF views pass their Request wrapper
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        return StreamingHttpResponse(_read_blocks(file, FileResponse.block_size), **kwargs)
+    return FileResponse(file, **kwargs)
+
+
+def serve_file(request, field_file, filename=None, as_attachment=True):
+    """Return a download response for a FileField value"""
+    if not field_file:
+        raise Http404('No file.')
+    filename = filename or os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    prefix = settings.MEDIA_ACCEL_REDIRECT_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{quote(field_file.name)}"
+        response['Content-Disposition'] = _content_disposition(filename, as_attachment)
+        return response
+
+    storage = field_file.storage
+    try:
+        size = storage.size(field_file.name)
+        file = storage.open(field_file.name, 'rb')
+    except FileNotFoundError:
+        raise Http404('File not found.')
+    try:
+        modified = int(storage.get_modified_time(field_file.name).timestamp())
+    except NotImplementedError:
+        modified = None
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    # A stale If-Range date means the client's partial copy is outdated: send everything
+    if not if_range or (modified is not None and parse_http_date_safe(if_range) == modified):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = _file_response(request, file, content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = _file_response(
+            request, RangeFile(file, start, end - start + 1), content_type=content_type, status=206
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Disposition'] = _content_disposition(filename, as_attachment)
+    response['Accept-Ranges'] = 'bytes'
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    return response
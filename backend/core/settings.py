@@ -103,6 +103,30 @@ DATABASES = {
 }
 
 
+# Cache
+# Multi-worker deployments should set REDIS_URL so cached task data and its
+# invalidation are shared between processes. Without it, project membership
+# and workflow rules are read from the database on every check, dashboard
+# stats, analytics, calendars, workloads and schedules are computed on every
+# request, and list and detail responses carry no ETag/Last-Modified validators.
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -142,6 +166,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Internal proxy location mapped to MEDIA_ROOT; when set, downloads are handed
+# to the proxy with X-Accel-Redirect instead of being streamed by Django
+MEDIA_ACCEL_REDIRECT_PREFIX = config('MEDIA_ACCEL_REDIRECT_PREFIX', default='')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -182,6 +209,50 @@ SIMPLE_JWT = {
 # CORS Settings
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:3000').split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ['X-Cache', 'ETag', 'Last-Modified']
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
+
+# Task dashboard statistics cache lifetime in seconds
+TASK_DASHBOARD_CACHE_TIMEOUT = config('TASK_DASHBOARD_CACHE_TIMEOUT', default=300, cast=int)
+# Project analytics cache lifetime; entries are also invalidated on task changes
+TASK_ANALYTICS_CACHE_TIMEOUT = config('TASK_ANALYTICS_CACHE_TIMEOUT', default=3600, cast=int)
+# Cached accessible-project sets; entries are also invalidated on membership changes
+TASK_MEMBERSHIP_CACHE_TIMEOUT = config('TASK_MEMBERSHIP_CACHE_TIMEOUT', default=3600, cast=int)
+# Cached per-user assignee workloads; task changes invalidate the affected users
+TASK_WORKLOAD_CACHE_TIMEOUT = config('TASK_WORKLOAD_CACHE_TIMEOUT', default=600, cast=int)
+# Cached calendar ranges; entries are also invalidated on task changes
+TASK_CALENDAR_CACHE_TIMEOUT = config('TASK_CALENDAR_CACHE_TIMEOUT', default=300, cast=int)
+# Cached per-project dependency schedules; after commit, task and dependency changes
+# re-read the changed rows under the project row lock and store a new version
+TASK_SCHEDULE_CACHE_TIMEOUT = config('TASK_SCHEDULE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Task ETags also expire after this many seconds, since rows carry time-derived fields
+TASK_CONDITIONAL_GET_WINDOW = config('TASK_CONDITIONAL_GET_WINDOW', default=60, cast=int)
+
+# Server-sent task events (tasks.events): change log poll interval and the
+# longest a stream stays open before the client reconnects with Last-Event-ID
+TASK_EVENTS_POLL_INTERVAL = config('TASK_EVENTS_POLL_INTERVAL', default=1.0, cast=float)
+TASK_EVENTS_MAX_DURATION = config('TASK_EVENTS_MAX_DURATION', default=300, cast=int)
+
+# Chunked attachment uploads (tasks.uploads): part files live outside MEDIA_ROOT
+TASK_UPLOAD_TEMP_DIR = config('TASK_UPLOAD_TEMP_DIR', default=str(BASE_DIR / 'upload_parts'))
+TASK_UPLOAD_MAX_SIZE = config('TASK_UPLOAD_MAX_SIZE', default=1024 * 1024 * 1024, cast=int)
+TASK_UPLOAD_MAX_CHUNK_SIZE = config('TASK_UPLOAD_MAX_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+
+# Newest comments embedded in task list rows (?latest_comments= overrides it)
+TASK_LATEST_COMMENTS = config('TASK_LATEST_COMMENTS', default=3, cast=int)
+
+# Dotted paths of callables run with the applied status transitions after
+# commit (tasks.workflow), e.g. "myapp.hooks.notify_reviewers"
+TASK_WORKFLOW_HOOKS = [path.strip() for path in config('TASK_WORKFLOW_HOOKS', default='').split(',') if path.strip()]
+
+# Due-date reminders (manage.py run_scheduler): minutes before due_date at
+# which reminders go out, the due-date look-ahead kept in memory, and the
+# delivery backend (tasks.reminders.ConsoleBackend or FileBackend, or any
+# class with send(user, reminders))
+TASK_REMINDER_LEAD_MINUTES = [int(value) for value in config('TASK_REMINDER_LEAD_MINUTES', default='1440,60').split(',')]
+TASK_REMINDER_WINDOW_HOURS = config('TASK_REMINDER_WINDOW_HOURS', default=48, cast=int)
+TASK_REMINDER_BACKEND = config('TASK_REMINDER_BACKEND', default='tasks.reminders.ConsoleBackend')
+TASK_REMINDER_FILE_PATH = config('TASK_REMINDER_FILE_PATH', default=str(BASE_DIR / 'reminders.ndjson'))
@@ -15,6 +15,7 @@ urlpatterns = [
     path('<slug:post_slug>/like/', views.toggle_like, name='toggle_like'),
     path('<slug:post_slug>/bookmark/', views.toggle_bookmark, name='toggle_bookmark'),
     path('<slug:post_slug>/comments/', views.PostCommentsView.as_view(), name='comments'),
+    path('<slug:post_slug>/image/', views.post_image, name='image'),
     
     # Tags
     path('tags/', views.TagListView.as_view(), name='tags'),
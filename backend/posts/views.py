@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
 from django.db.models import F, Q
+from core.files import serve_file
 from .models import Post, Tag, Comment, Like, Bookmark
 from .serializers import (
     PostSerializer, PostListSerializer, PostCreateUpdateSerializer,
@@ -153,6 +154,17 @@ class PostCommentsView(generics.ListCreateAPIView):
         return context
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def post_image(request, post_slug):
+    """Serve a post's featured image to signed-in users who can see the post"""
+    posts = Post.objects.all()
+    if not request.user.can_moderate():
+        posts = posts.filter(Q(is_published=True, status='published') | Q(author=request.user))
+    post = get_object_or_404(posts, slug=post_slug)
+    return serve_file(request, post.featured_image, as_attachment=False)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_like(request, post_slug):
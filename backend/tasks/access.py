@@ -0,0 +1,131 @@
+"""
+Project access index.
+
+``ProjectAccess`` holds one row per (user, project) pair for the project
+creator and every member. Visibility filters use it as an indexed ``IN``
+subquery instead of OR-joining ``members``, so no ``DISTINCT`` is needed.
+
+A user's accessible project ids are cached as a frozenset under their
+``membership`` cache scope, which ``sync_project_access`` bumps for every
+user whose rows it changes. Permission checks, serializer validation and
+visibility filters all read that set, so a membership check is one set
+lookup instead of a join. The set is only cached in a shared backend: a
+bump in a per-process cache would leave a removed member with access in
+every other worker, so without one each call reads ``ProjectAccess``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import get_version, invalidate_memberships, membership_scope, shared_cache
+from .changes import record_access_changes
+from .models import Project, ProjectAccess
+
+
+def accessible_project_ids(user):
+    """Frozenset of the ids of projects the user created or is a member of"""
+    if not shared_cache():
+        return frozenset(ProjectAccess.objects.filter(user_id=user.pk).values_list('project_id', flat=True))
+    version = get_version(membership_scope(user.pk))
+    # Memoized on the user object so one request reads the cache once
+    memo = getattr(user, '_accessible_project_ids', None)
+    if memo is not None and memo[0] == version:
+        return memo[1]
+    key = f'tasks:membership:{user.pk}:{version}'
+    project_ids = cache.get(key)
+    if project_ids is None:
+        project_ids = frozenset(ProjectAccess.objects.filter(user_id=user.pk).values_list('project_id', flat=True))
+        cache.set(key, project_ids, settings.TASK_MEMBERSHIP_CACHE_TIMEOUT)
+    user._accessible_project_ids = (version, project_ids)
+    return project_ids
+
+
+def has_project_access(user, project_id):
+    return user.role == 'admin' or project_id in accessible_project_ids(user)
+
+
+def can_view_task(user, task):
+    """In-memory counterpart of visible_tasks for one task"""
+    return (
+        has_project_access(user, task.project_id) or
+        user.pk in (task.assigned_to_id, task.created_by_id)
+    )
+
+
+def visible_projects(queryset, user):
+    """Restrict a Project queryset to the projects the user can see"""
+    if user.role == 'admin':
+        return queryset
+    return queryset.filter(pk__in=accessible_project_ids(user))
+
+
+def visible_tasks(queryset, user):
+    """
+    Restrict a Task queryset to the tasks the user can see. Also works for
+    the archive models, which share the project/assigned_to/created_by fields.
+    """
+    if user.role == 'admin':
+        return queryset
+    return queryset.filter(
+        Q(project_id__in=accessible_project_ids(user)) |
+        Q(assigned_to=user) |
+        Q(created_by=user)
+    )
+
+
+def project_user_ids(project_ids):
+    """Ids of every user with access to the given projects"""
+    project_ids = [pk for pk in project_ids if pk]
+    if not project_ids:
+        return set()
+    return set(
+        ProjectAccess.objects.filter(project_id__in=project_ids).values_list('user_id', flat=True)
+    )
+
+
+def task_user_ids(tasks):
+    """Ids of every non-admin user who can see any of the given tasks"""
+    user_ids = set()
+    project_ids = set()
+    for task in tasks:
+        user_ids.update((task.assigned_to_id, task.created_by_id))
+        project_ids.add(task.project_id)
+    user_ids.discard(None)
+    return user_ids | project_user_ids(project_ids)
+
+
+def sync_project_access(project_ids):
+    """
+    Bring the access rows of the given projects in line with created_by and
+    members, logging each grant and revocation for delta sync and
+    invalidating the cached project sets of the affected users
+    """
+    project_ids = {pk for pk in project_ids if pk}
+    if not project_ids:
+        return
+
+    desired = set(Project.objects.filter(pk__in=project_ids).values_list('created_by_id', 'pk'))
+    desired.update(
+        Project.members.through.objects.filter(project_id__in=project_ids).values_list('user_id', 'project_id')
+    )
+    existing = {
+        (user_id, project_id): pk
+        for pk, user_id, project_id in ProjectAccess.objects.filter(
+            project_id__in=project_ids
+        ).values_list('pk', 'user_id', 'project_id')
+    }
+
+    with transaction.atomic():
+        missing = desired - existing.keys()
+        if missing:
+            ProjectAccess.objects.bulk_create(
+                [ProjectAccess(user_id=user_id, project_id=project_id) for user_id, project_id in missing],
+                ignore_conflicts=True,
+            )
+            record_access_changes('access_granted', missing)
+        stale = {pair: pk for pair, pk in existing.items() if pair not in desired}
+        if stale:
+            ProjectAccess.objects.filter(pk__in=list(stale.values())).delete()
+            record_access_changes('access_revoked', stale)
+        invalidate_memberships({user_id for user_id, _ in missing | stale.keys()})
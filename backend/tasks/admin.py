@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import Project, Task, TaskComment, TaskAttachment
+from .models import Project, Task, TaskComment, TaskAttachment, WorkflowTransition
+
+
+class WorkflowTransitionInline(admin.TabularInline):
+    model = WorkflowTransition
+    extra = 0
 
 
 @admin.register(Project)
@@ -9,6 +14,7 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     filter_horizontal = ['members']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [WorkflowTransitionInline]
 
 
 class TaskCommentInline(admin.TabularInline):
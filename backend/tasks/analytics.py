@@ -0,0 +1,167 @@
+"""
+Per-project delivery metrics.
+
+Task columns (live and archived tasks alike, so archiving does not change
+the history) are fetched with ``values_list`` and turned into NumPy
+arrays; every metric is then computed with array operations instead of
+per-task Python loops. Internally timestamps are epoch seconds, with NaN
+for missing values.
+"""
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .models import ArchivedTask, Task
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+PERCENTILES = (50, 85, 95)
+# Estimates within this ratio of the actual hours count as accurate
+ACCURACY_TOLERANCE = 0.2
+
+COLUMNS = ('status', 'created_at', 'completed_at', 'due_date', 'estimated_hours', 'actual_hours')
+
+
+def _epoch(values):
+    return np.fromiter(
+        (value.timestamp() if value is not None else np.nan for value in values),
+        dtype=float, count=len(values),
+    )
+
+
+def _numbers(values):
+    return np.fromiter(
+        (value if value is not None else np.nan for value in values),
+        dtype=float, count=len(values),
+    )
+
+
+def _round(value, digits=2):
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def load_columns(project_id):
+    """One query per table for the columns every metric needs"""
+    rows = list(Task.objects.filter(project_id=project_id).order_by().values_list(*COLUMNS))
+    rows += ArchivedTask.objects.filter(project_id=project_id).order_by().values_list(*COLUMNS)
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    status, created, completed, due, estimated, actual = columns
+    return {
+        'status': np.array(status, dtype=object),
+        'created': _epoch(created),
+        'completed': _epoch(completed),
+        'due': _epoch(due),
+        'estimated': _numbers(estimated),
+        'actual': _numbers(actual),
+    }
+
+
+def cycle_time(data):
+    """Hours from creation to completion for completed tasks"""
+    done = (data['status'] == 'completed') & ~np.isnan(data['completed'])
+    hours = (data['completed'][done] - data['created'][done]) / HOUR
+    hours = hours[hours >= 0]
+    result = {'count': int(hours.size), 'mean_hours': None}
+    result.update({f'p{p}_hours': None for p in PERCENTILES})
+    if hours.size:
+        result['mean_hours'] = _round(hours.mean())
+        for p, value in zip(PERCENTILES, np.percentile(hours, PERCENTILES)):
+            result[f'p{p}_hours'] = _round(value)
+    return result
+
+
+def weekly_throughput(data, now, weeks):
+    """Tasks completed in each of the last ``weeks`` seven-day windows, oldest first"""
+    start = now - weeks * WEEK
+    completed = data['completed'][(data['status'] == 'completed') & (data['completed'] > start)]
+    completed = completed[completed <= now]
+    counts = np.bincount(((completed - start) // WEEK).astype(int), minlength=weeks)[:weeks]
+    return [
+        {'week_start': _isoformat(start + index * WEEK), 'completed': int(count)}
+        for index, count in enumerate(counts)
+    ]
+
+
+def _count_at_or_before(keys, points, weights=None):
+    """For each point, how many keys (or how much weight) are <= it"""
+    order = np.argsort(keys, kind='stable')
+    positions = np.searchsorted(keys[order], points, side='right')
+    if weights is None:
+        return positions
+    cumulative = np.concatenate(([0.0], np.cumsum(weights[order])))
+    return cumulative[positions]
+
+
+def burndown(data, now, days):
+    """
+    Daily remaining work over the last ``days`` days versus the due-date
+    line: ``ideal`` is what would remain if every task finished exactly on
+    its due date. Cancelled tasks are out of scope.
+    """
+    scope = data['status'] != 'cancelled'
+    created = data['created'][scope]
+    # Not completed yet: finishes "never" for the cumulative counts
+    completed = np.where(np.isnan(data['completed'][scope]), np.inf, data['completed'][scope])
+    due_or_created = np.maximum(data['due'][scope], created)
+    hours = np.nan_to_num(data['estimated'][scope])
+
+    day_ends = now - np.arange(days - 1, -1, -1) * DAY
+    added = _count_at_or_before(created, day_ends)
+    done = _count_at_or_before(completed, day_ends)
+    due = _count_at_or_before(due_or_created, day_ends)
+    added_hours = _count_at_or_before(created, day_ends, hours)
+    done_hours = _count_at_or_before(completed, day_ends, hours)
+    due_hours = _count_at_or_before(due_or_created, day_ends, hours)
+
+    return [
+        {
+            'date': _isoformat(day_end)[:10],
+            'remaining': int(added[i] - done[i]),
+            'ideal': int(added[i] - due[i]),
+            'remaining_hours': _round(added_hours[i] - done_hours[i]),
+            'ideal_hours': _round(added_hours[i] - due_hours[i]),
+        }
+        for i, day_end in enumerate(day_ends)
+    ]
+
+
+def estimate_accuracy(data):
+    """Compare estimated_hours with actual_hours where both are recorded"""
+    both = ~np.isnan(data['estimated']) & ~np.isnan(data['actual'])
+    estimated, actual = data['estimated'][both], data['actual'][both]
+    result = {
+        'count': int(estimated.size),
+        'total_estimated_hours': _round(estimated.sum()),
+        'total_actual_hours': _round(actual.sum()),
+        'median_ratio': None,
+        'mean_absolute_percentage_error': None,
+        'within_tolerance': None,
+        'underestimated': int((actual > estimated).sum()),
+        'overestimated': int((actual < estimated).sum()),
+    }
+    if estimated.size:
+        ratio = actual / estimated
+        result['median_ratio'] = _round(np.median(ratio))
+        result['mean_absolute_percentage_error'] = _round(np.abs(ratio - 1).mean() * 100)
+        result['within_tolerance'] = _round((np.abs(ratio - 1) <= ACCURACY_TOLERANCE).mean())
+    return result
+
+
+def project_analytics(project_id, now, weeks=12, days=30):
+    """All metrics for one project; ``now`` is an aware datetime"""
+    data = load_columns(project_id)
+    now = now.timestamp()
+    return {
+        'task_count': int(data['status'].size),
+        'cycle_time': cycle_time(data),
+        'weekly_throughput': weekly_throughput(data, now, weeks),
+        'burndown': burndown(data, now, days),
+        'estimate_accuracy': estimate_accuracy(data),
+    }
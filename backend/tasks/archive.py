@@ -0,0 +1,150 @@
+"""
+Archive tier for finished tasks.
+
+Tasks completed or cancelled longer ago than the retention window are
+moved, with their comments and attachment metadata, into the
+``archived_*`` tables one batch per transaction, so the live ``tasks``
+table and its indexes only hold work that is still moving. Deleting the
+live rows goes through the usual delete signals: caches are invalidated
+and delta-sync clients get tombstones. Archived rows keep their ids and
+field names, so ``access.visible_tasks`` filters them as well.
+
+``TaskArchiveRollup`` keeps archived counts per (project, assignee,
+creator, status, priority) in step with each batch; dashboards add them
+to the live figures instead of counting archived rows.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+
+from .access import visible_tasks
+from .models import (
+    ArchivedTask, ArchivedTaskAttachment, ArchivedTaskComment, Task, TaskArchiveRollup, TaskAttachment,
+    TaskComment,
+)
+from .tags import parse_tags
+
+ARCHIVE_STATUSES = ('completed', 'cancelled')
+TASK_FIELDS = (
+    'id', 'title', 'description', 'due_date', 'priority', 'status', 'project_id', 'assigned_to_id',
+    'created_by_id', 'created_at', 'updated_at', 'completed_at', 'estimated_hours', 'actual_hours', 'tags',
+)
+ROLLUP_KEY = ('project_id', 'assigned_to_id', 'created_by_id', 'status', 'priority')
+
+
+def archivable_tasks(cutoff):
+    """Tasks finished before ``cutoff``; cancelled tasks have no completed_at, so use updated_at"""
+    return Task.objects.filter(
+        Q(status='completed', completed_at__lt=cutoff) |
+        Q(status__in=ARCHIVE_STATUSES, completed_at__isnull=True, updated_at__lt=cutoff)
+    )
+
+
+def tag_names(tags):
+    names = parse_tags(tags)
+    return f",{','.join(names)}," if names else ''
+
+
+def _add_to_rollups(rows):
+    counts = Counter(tuple(row[field] for field in ROLLUP_KEY) for row in rows)
+    existing = {}
+    for rollup in TaskArchiveRollup.objects.select_for_update().filter(
+        project_id__in={key[0] for key in counts}
+    ):
+        existing.setdefault(tuple(getattr(rollup, field) for field in ROLLUP_KEY), rollup)
+
+    changed, created = [], []
+    for key, count in counts.items():
+        rollup = existing.get(key)
+        if rollup is None:
+            created.append(TaskArchiveRollup(task_count=count, **dict(zip(ROLLUP_KEY, key))))
+        else:
+            rollup.task_count += count
+            changed.append(rollup)
+    TaskArchiveRollup.objects.bulk_update(changed, ['task_count'])
+    TaskArchiveRollup.objects.bulk_create(created)
+
+
+def archive_batch(task_ids, cutoff):
+    """Move the given tasks (re-checked against ``cutoff``) to the archive; returns how many moved"""
+    with transaction.atomic():
+        rows = list(
+            archivable_tasks(cutoff).select_for_update().filter(pk__in=task_ids).order_by().values(*TASK_FIELDS)
+        )
+        if not rows:
+            return 0
+        ids = [row['id'] for row in rows]
+
+        ArchivedTask.objects.bulk_create([ArchivedTask(tag_names=tag_names(row['tags']), **row) for row in rows])
+        ArchivedTaskComment.objects.bulk_create([
+            ArchivedTaskComment(**row) for row in TaskComment.objects.filter(task_id__in=ids).values(
+                'id', 'task_id', 'user_id', 'comment', 'created_at'
+            )
+        ])
+        ArchivedTaskAttachment.objects.bulk_create([
+            ArchivedTaskAttachment(**row) for row in TaskAttachment.objects.filter(task_id__in=ids).values(
+                'id', 'task_id', 'file', 'filename', 'uploaded_by_id', 'uploaded_at'
+            )
+        ])
+        _add_to_rollups(rows)
+        # Comments, attachment rows and tag links cascade; files stay in storage
+        Task.objects.filter(pk__in=ids).delete()
+    return len(rows)
+
+
+def archive_tasks(cutoff, batch_size=500):
+    """Archive every task finished before ``cutoff``, yielding the size of each batch"""
+    last_id = 0
+    while True:
+        ids = list(
+            archivable_tasks(cutoff).filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        last_id = ids[-1]
+        yield archive_batch(ids, cutoff)
+
+
+def filter_archived(queryset, params):
+    """Apply the task list filters and ?search= that make sense for archived rows"""
+    for field in ('status', 'priority', 'project', 'assigned_to', 'created_by'):
+        value = params.get(field)
+        if value:
+            queryset = queryset.filter(**{field: value})
+
+    names = []
+    for raw in params.getlist('tag'):
+        names.extend(parse_tags(raw))
+    if names:
+        matches = [Q(tag_names__contains=f',{name},') for name in names]
+        combined = matches.pop()
+        for match in matches:
+            combined = combined | match if params.get('tag_mode') == 'any' else combined & match
+        queryset = queryset.filter(combined)
+
+    for term in params.get('search', '').split():
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(description__icontains=term) | Q(tags__icontains=term)
+        )
+    return queryset
+
+
+def archived_dashboard_totals(user):
+    """Dashboard figures over the user's archived tasks, read from the rollups"""
+    def total(condition=None):
+        return Coalesce(Sum('task_count', filter=condition), 0)
+
+    aggregates = {
+        'total_tasks': total(),
+        'my_tasks': total(Q(assigned_to=user)),
+        'completed_tasks': total(Q(status='completed')),
+        'high_priority': total(Q(priority='high')),
+        'urgent_priority': total(Q(priority='urgent')),
+    }
+    for value, _ in Task.STATUS_CHOICES:
+        aggregates[f'status__{value}'] = total(Q(status=value))
+    for value, _ in Task.PRIORITY_CHOICES:
+        aggregates[f'priority__{value}'] = total(Q(priority=value))
+    return visible_tasks(TaskArchiveRollup.objects.all(), user).aggregate(**aggregates)
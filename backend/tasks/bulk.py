@@ -0,0 +1,310 @@
+"""
+Bulk task operations.
+
+Each operation validates every item up front, checks ``TaskPermission``
+against the caller's visible task set in one query and status changes
+against the project workflows (``tasks.workflow``), writes all valid items
+in a single transaction with ``bulk_create``/``bulk_update`` (or one
+``UPDATE`` when every row gets the same values) and returns a
+per-item result list. Invalid items are reported and skipped.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from .access import accessible_project_ids, task_user_ids, visible_tasks
+from .cache import invalidate_users
+from .changes import record_task_changes, task_state
+from .dependencies import detach_tasks, record_schedule_changes
+from .models import Project, Task
+from .permissions import TaskPermission
+from .serializers import TaskBulkCreateSerializer, TaskBulkUpdateSerializer
+from .tags import sync_task_tags
+from .workflow import Transition, queue_hooks, transition_error, transition_table
+from .workload import record_workload_changes
+
+User = get_user_model()
+
+MAX_BULK_ITEMS = 1000
+BATCH_SIZE = 500
+
+STATUS_VALUES = [choice[0] for choice in Task.STATUS_CHOICES]
+
+NOT_FOUND = 'Not found.'
+PERMISSION_DENIED = 'You do not have permission to perform this action.'
+
+
+class BulkResult:
+    """Collects per-item outcomes in request order"""
+
+    def __init__(self):
+        self.items = {}
+
+    def ok(self, index, task_id, outcome):
+        self.items[index] = {'index': index, 'id': task_id, 'status': outcome}
+
+    def error(self, index, errors, task_id=None):
+        self.items[index] = {'index': index, 'id': task_id, 'status': 'error', 'errors': errors}
+
+    @property
+    def succeeded(self):
+        return sum(1 for item in self.items.values() if item['status'] != 'error')
+
+    def as_dict(self):
+        results = [self.items[index] for index in sorted(self.items)]
+        return {
+            'succeeded': self.succeeded,
+            'failed': len(results) - self.succeeded,
+            'results': results,
+        }
+
+
+def apply_status(task, new_status, now=None):
+    """Set status with change_status semantics: completed_at tracks completion"""
+    task.status = new_status
+    task.completed_at = (now or timezone.now()) if new_status == 'completed' else None
+
+
+def validate_rows(serializer_class, rows, context, partial=False):
+    """
+    Yield (index, validated_data, errors) for each row. One serializer
+    instance validates every row so its fields are only built once.
+    """
+    serializer = serializer_class(context=context, partial=partial)
+    for index, row in enumerate(rows):
+        try:
+            yield index, serializer.run_validation(row), None
+        except serializers.ValidationError as exc:
+            yield index, None, exc.detail
+
+
+def _coerce_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _preload_references(user, rows):
+    """
+    Resolve every project/assignee id referenced by the rows with one query
+    each, along with the projects the user may put tasks in
+    """
+    project_ids = set()
+    user_ids = set()
+    for row in rows:
+        if isinstance(row, dict):
+            project_ids.add(_coerce_id(row.get('project')))
+            user_ids.add(_coerce_id(row.get('assigned_to')))
+    project_ids.discard(None)
+    user_ids.discard(None)
+    return {
+        'projects': Project.objects.in_bulk(project_ids),
+        'users': User.objects.in_bulk(user_ids),
+        'accessible_project_ids': None if user.role == 'admin' else accessible_project_ids(user),
+    }
+
+
+def _load_modifiable(user, ids, result, index_by_id):
+    """Fetch visible tasks by id and record not-found/forbidden items"""
+    tasks = visible_tasks(Task.objects.filter(pk__in=ids), user).in_bulk()
+    allowed = {}
+    for task_id in ids:
+        index = index_by_id[task_id]
+        task = tasks.get(task_id)
+        if task is None:
+            result.error(index, {'detail': NOT_FOUND}, task_id)
+        elif not TaskPermission.can_modify(user, task):
+            result.error(index, {'detail': PERMISSION_DENIED}, task_id)
+        else:
+            allowed[task_id] = task
+    return allowed
+
+
+def _index_ids(ids, result):
+    """Map each valid, unique id to its request index"""
+    index_by_id = {}
+    for index, value in enumerate(ids):
+        task_id = _coerce_id(value)
+        if task_id is None:
+            result.error(index, {'id': ['A valid integer is required.']}, value)
+        elif task_id in index_by_id:
+            result.error(index, {'id': ['Duplicate id.']}, task_id)
+        else:
+            index_by_id[task_id] = index
+    return index_by_id
+
+
+def tasks_changed(tasks, previous_user_ids=(), tags_changed=True, action=None, previous_states=None):
+    """
+    Side effects normally driven by model signals, for bulk writes that skip
+    them. ``action`` and ``previous_states`` are passed to the change log.
+    Call it inside the transaction that wrote the tasks.
+    """
+    tasks = list(tasks)
+    previous_states = previous_states or {}
+    moved = [
+        task.pk for task in tasks
+        if task.pk in previous_states and previous_states[task.pk]['project_id'] != task.project_id
+    ]
+    if moved:
+        # Dependencies link tasks of one project
+        detach_tasks(moved)
+    if tags_changed:
+        sync_task_tags(tasks)
+    project_ids = {task.project_id for task in tasks}
+    project_ids.update(state['project_id'] for state in previous_states.values())
+    invalidate_users(set(previous_user_ids) | task_user_ids(tasks), project_ids)
+    record_task_changes(tasks, action, previous_states)
+    record_workload_changes([(previous_states.get(task.pk), task_state(task)) for task in tasks])
+    record_schedule_changes([(task.pk, previous_states.get(task.pk), task_state(task)) for task in tasks])
+    if previous_states:
+        queue_hooks([
+            Transition(task.pk, task.project_id, previous_states[task.pk]['status'], task.status)
+            for task in tasks if task.pk in previous_states
+        ])
+
+
+def _reject_transitions(tasks, new_statuses, result, index_by_id):
+    """Drop tasks whose status change the project workflow forbids, recording why"""
+    table = transition_table()
+    for task_id, task in list(tasks.items()):
+        new_status = new_statuses.get(task_id)
+        error = new_status and transition_error(task.project_id, task.status, new_status, table)
+        if error:
+            result.error(index_by_id[task_id], {'status': [error]}, task_id)
+            del tasks[task_id]
+
+
+def bulk_create_tasks(user, rows):
+    result = BulkResult()
+    context = _preload_references(user, rows)
+
+    now = timezone.now()
+    pending = []
+    for index, data, errors in validate_rows(TaskBulkCreateSerializer, rows, context):
+        if errors:
+            result.error(index, errors)
+            continue
+        task = Task(created_by=user, **data)
+        # bulk_create skips save(), so set completed_at here
+        apply_status(task, task.status, now)
+        pending.append((index, task))
+
+    if pending:
+        with transaction.atomic():
+            created = Task.objects.bulk_create([task for _, task in pending], batch_size=BATCH_SIZE)
+            tasks_changed(created, action='created')
+        for (index, _), task in zip(pending, created):
+            result.ok(index, task.pk, 'created')
+    return result
+
+
+def bulk_update_tasks(user, rows):
+    result = BulkResult()
+    context = _preload_references(user, rows)
+
+    validated = {}
+    for index, data, errors in validate_rows(TaskBulkUpdateSerializer, rows, context, partial=True):
+        row = rows[index]
+        if errors:
+            result.error(index, errors, row.get('id') if isinstance(row, dict) else None)
+        elif 'id' not in data:
+            result.error(index, {'id': ['This field is required.']})
+        else:
+            validated[index] = data
+
+    index_by_id = {}
+    for index, data in validated.items():
+        if data['id'] in index_by_id:
+            result.error(index, {'id': ['Duplicate id.']}, data['id'])
+        else:
+            index_by_id[data['id']] = index
+    tasks = _load_modifiable(user, list(index_by_id), result, index_by_id)
+    if not tasks:
+        return result
+
+    _reject_transitions(
+        tasks, {task_id: validated[index_by_id[task_id]].get('status') for task_id in tasks},
+        result, index_by_id,
+    )
+    if not tasks:
+        return result
+
+    now = timezone.now()
+    previous_user_ids = task_user_ids(tasks.values())
+    previous_states = {task_id: task_state(task) for task_id, task in tasks.items()}
+    fields = {'updated_at'}
+    for task_id, task in tasks.items():
+        changes = dict(validated[index_by_id[task_id]])
+        changes.pop('id')
+        if 'status' in changes:
+            apply_status(task, changes.pop('status'), now)
+            fields.update(('status', 'completed_at'))
+        for name, value in changes.items():
+            setattr(task, name, value)
+        fields.update(changes)
+        task.updated_at = now
+
+    with transaction.atomic():
+        Task.objects.bulk_update(list(tasks.values()), sorted(fields), batch_size=BATCH_SIZE)
+        tasks_changed(
+            tasks.values(), previous_user_ids,
+            tags_changed='tags' in fields, previous_states=previous_states,
+        )
+    for task_id in tasks:
+        result.ok(index_by_id[task_id], task_id, 'updated')
+    return result
+
+
+def update_status(tasks, new_status):
+    """
+    Apply an already validated status change to tasks loaded from the
+    database, writing only the status columns
+    """
+    tasks = list(tasks)
+    now = timezone.now()
+    previous_states = {task.pk: task_state(task) for task in tasks}
+    for task in tasks:
+        apply_status(task, new_status, now)
+        task.updated_at = now
+
+    with transaction.atomic():
+        # Every row gets the same values, so one UPDATE ... WHERE id IN (...)
+        # is cheaper than bulk_update's per-row CASE expressions
+        Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+            status=new_status,
+            completed_at=now if new_status == 'completed' else None,
+            updated_at=now,
+        )
+        tasks_changed(tasks, tags_changed=False, previous_states=previous_states)
+
+
+def bulk_change_status(user, ids, new_status):
+    result = BulkResult()
+    index_by_id = _index_ids(ids, result)
+    tasks = _load_modifiable(user, list(index_by_id), result, index_by_id)
+    _reject_transitions(tasks, dict.fromkeys(tasks, new_status), result, index_by_id)
+    if not tasks:
+        return result
+
+    update_status(tasks.values(), new_status)
+    for task_id in tasks:
+        result.ok(index_by_id[task_id], task_id, 'updated')
+    return result
+
+
+def bulk_delete_tasks(user, ids):
+    result = BulkResult()
+    index_by_id = _index_ids(ids, result)
+    tasks = _load_modifiable(user, list(index_by_id), result, index_by_id)
+    if not tasks:
+        return result
+
+    with transaction.atomic():
+        # QuerySet.delete() still sends pre/post_delete for each task
+        Task.objects.filter(pk__in=list(tasks)).delete()
+    for task_id in tasks:
+        result.ok(index_by_id[task_id], task_id, 'deleted')
+    return result
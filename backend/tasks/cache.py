@@ -0,0 +1,141 @@
+"""
+Versioned cache helpers for task data.
+
+Cached entries are keyed by a version stamp instead of being deleted one by
+one. Every user has a scope (``user:<id>``) and admins share the ``all``
+scope, which is bumped on any task or project change. Per-project data such
+as analytics uses a ``project:<id>`` scope bumped when the project's tasks
+change. Bumping a scope makes
+every key built from the old stamp unreachable, so invalidation never needs
+to know which keys exist. The ``directory`` scope is bumped when a user's
+public details change, since those are embedded in other users' payloads.
+A ``membership:<id>`` scope covers the user's accessible project ids and is
+only bumped when their access rows change. A ``workload:<id>`` scope covers
+the user's assignee workload and is bumped when a task write changes it.
+A ``schedule:<id>`` scope versions a project's dependency schedule.
+The ``workflow`` scope versions the compiled status transition rules.
+
+Version stamps only reach other worker processes through a shared backend.
+Data that decides access (membership sets, workflow rules) is only cached
+when ``shared_cache()`` says so, and read from the database otherwise.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+ALL_SCOPE = 'all'
+# User names and roles embedded in task and project payloads
+DIRECTORY_SCOPE = 'directory'
+WORKFLOW_SCOPE = 'workflow'
+# Backends whose entries, and so whose version bumps, stay in one process
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache():
+    """Whether every worker process sees the same cache entries"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def user_scope(user_id):
+    return f'user:{user_id}'
+
+
+def project_scope(project_id):
+    return f'project:{project_id}'
+
+
+def membership_scope(user_id):
+    return f'membership:{user_id}'
+
+
+def schedule_scope(project_id):
+    return f'schedule:{project_id}'
+
+
+def workload_scope(user_id):
+    return f'workload:{user_id}'
+
+
+def _version_key(scope):
+    return f'tasks:version:{scope}'
+
+
+def get_version(scope):
+    """Return the current version stamp (nanoseconds) for a scope"""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(scopes):
+    """{scope: version stamp} for several scopes, read in one round trip once they exist"""
+    keys = {_version_key(scope): scope for scope in scopes}
+    found = cache.get_many(list(keys))
+    versions = {scope: found[key] for key, scope in keys.items() if key in found}
+    for key, scope in keys.items():
+        if key not in found:
+            versions[scope] = get_version(scope)
+    return versions
+
+
+def user_version(user):
+    """Version stamp covering everything the given user can see"""
+    if user.role == 'admin':
+        return get_version(ALL_SCOPE)
+    return get_version(user_scope(user.id))
+
+
+def user_cache_key(namespace, user, *parts):
+    """Build a cache key that changes whenever the user's visible data changes"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'tasks:{namespace}:{user.id}:{user_version(user)}:{suffix}'
+
+
+def project_cache_key(namespace, project_id, *parts):
+    """Build a cache key that changes whenever a task of the project changes"""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'tasks:{namespace}:project:{project_id}:{get_version(project_scope(project_id))}:{suffix}'
+
+
+def bump_versions(scopes):
+    stamp = time.time_ns()
+    cache.set_many({_version_key(scope): stamp for scope in set(scopes)}, None)
+
+
+def invalidate_users(user_ids, project_ids=()):
+    """
+    Invalidate cached data for the given users (and all admins) after
+    commit, plus per-project data for ``project_ids``
+    """
+    scopes = {ALL_SCOPE}
+    scopes.update(user_scope(user_id) for user_id in user_ids if user_id)
+    scopes.update(project_scope(project_id) for project_id in project_ids if project_id)
+    transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def invalidate_directory():
+    transaction.on_commit(lambda: bump_versions([DIRECTORY_SCOPE]))
+
+
+def invalidate_memberships(user_ids):
+    scopes = {membership_scope(user_id) for user_id in user_ids if user_id}
+    if scopes:
+        transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def invalidate_workloads(user_ids):
+    scopes = {workload_scope(user_id) for user_id in user_ids if user_id}
+    if scopes:
+        transaction.on_commit(lambda: bump_versions(scopes))
+
+
+def invalidate_workflows():
+    transaction.on_commit(lambda: bump_versions([WORKFLOW_SCOPE]))
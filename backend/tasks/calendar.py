@@ -0,0 +1,73 @@
+"""
+Due-date calendar.
+
+A range is read with one scan of the ``(due_date, id)`` index, selecting
+only the few columns a calendar cell shows, and bucketed by local day in
+Python. Archived tasks, when requested, come from the same index on the
+archive table and are merged in due-date order.
+"""
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+# Longest range, in days, one request may cover
+MAX_RANGE_DAYS = 62
+ROW_FIELDS = ('id', 'title', 'due_date', 'status', 'priority', 'project_id', 'assigned_to_id')
+
+
+def parse_range(start, end):
+    """Return (start, end) dates from ISO strings, or raise ValueError with the reason"""
+    try:
+        start, end = parse_date(start or ''), parse_date(end or '')
+    except ValueError:
+        start = end = None
+    if start is None or end is None:
+        raise ValueError('start and end must be dates (YYYY-MM-DD)')
+    if end < start:
+        raise ValueError('end must not be before start')
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f'the range may cover at most {MAX_RANGE_DAYS} days')
+    return start, end
+
+
+def day_bounds(start, end):
+    """Aware [lower, upper) datetimes covering the local days start..end"""
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start, time.min), tz)
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+    return lower, upper
+
+
+def _rows(queryset, lower, upper):
+    return queryset.filter(due_date__gte=lower, due_date__lt=upper).order_by('due_date', 'id').values(*ROW_FIELDS)
+
+
+def task_calendar(tasks, start, end, archived=None):
+    """
+    Tasks of ``tasks`` (and ``archived``, if given) due between the local
+    days ``start`` and ``end`` inclusive, grouped by day with per-day counts
+    """
+    lower, upper = day_bounds(start, end)
+    rows = list(_rows(tasks, lower, upper))
+    if archived is not None:
+        for row in rows:
+            row['is_archived'] = False
+        archived_rows = list(_rows(archived, lower, upper))
+        for row in archived_rows:
+            row['is_archived'] = True
+        rows = sorted(rows + archived_rows, key=lambda row: (row['due_date'], row['id']))
+
+    days = {}
+    for row in rows:
+        day = timezone.localtime(row['due_date']).date().isoformat()
+        row['project'] = row.pop('project_id')
+        row['assigned_to'] = row.pop('assigned_to_id')
+        days.setdefault(day, []).append(row)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'total': len(rows),
+        'counts': {day: len(items) for day, items in days.items()},
+        'days': days,
+    }
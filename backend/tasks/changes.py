@@ -0,0 +1,194 @@
+"""
+Task change log for incremental (delta) sync.
+
+Every task write appends a ``TaskChange`` row. Model signals record
+single-object writes, ``bulk.tasks_changed`` records bulk writes and
+``access.sync_project_access`` records membership changes, which clients see
+as a project's tasks appearing (``access_granted``) or being tombstoned
+(``access_revoked``).
+
+The number clients pass back as ``?since=`` is the entry's ``sequence``, not
+its id. Ids are taken at insert time but become visible at commit, so a long
+transaction can commit an id below a cursor that has already moved past it.
+Sequences are assigned after commit instead, under the lock of the single
+``TaskChangeHead`` row, which is held until the numbers themselves commit:
+sequence numbers become visible strictly in order, however long the
+transaction that wrote the entry ran. Writers number their entries on
+commit; readers also number any committed entry still waiting (e.g. when a
+process died between its commit and the callback) before they read.
+"""
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+
+from .models import Task, TaskChange, TaskChangeHead
+
+ACCESS_ACTIONS = ('access_granted', 'access_revoked')
+RECORD_BATCH_SIZE = 500
+
+
+def task_state(task):
+    """The previous-version fields change entries, workflow hooks and workload updates need"""
+    return {
+        'project_id': task.project_id, 'assigned_to_id': task.assigned_to_id, 'status': task.status,
+        'priority': task.priority, 'due_date': task.due_date, 'estimated_hours': task.estimated_hours,
+    }
+
+
+def record_task_changes(tasks, action=None, previous_states=None):
+    """
+    Append one entry per task. Without an explicit action, updates are
+    recorded as ``status_changed`` when the status differs from the
+    previous state and as ``updated`` otherwise.
+    """
+    previous_states = previous_states or {}
+    entries = []
+    for task in tasks:
+        previous = previous_states.get(task.pk) or {}
+        task_action = action
+        if task_action is None:
+            task_action = 'status_changed' if previous.get('status', task.status) != task.status else 'updated'
+        entries.append(TaskChange(
+            action=task_action,
+            task_id=task.pk,
+            project_id=task.project_id,
+            assigned_to_id=task.assigned_to_id,
+            created_by_id=task.created_by_id,
+            previous_project_id=previous.get('project_id'),
+            previous_assigned_to_id=previous.get('assigned_to_id'),
+        ))
+    TaskChange.objects.bulk_create(entries, batch_size=RECORD_BATCH_SIZE)
+    transaction.on_commit(assign_sequences)
+
+
+def record_access_changes(action, pairs):
+    """Append access_granted/access_revoked entries for (user_id, project_id) pairs"""
+    TaskChange.objects.bulk_create(
+        [TaskChange(action=action, user_id=user_id, project_id=project_id) for user_id, project_id in pairs],
+        batch_size=RECORD_BATCH_SIZE,
+    )
+    transaction.on_commit(assign_sequences)
+
+
+def assign_sequences():
+    """
+    Number the committed entries that have no sequence yet, in id order.
+    Does nothing inside a transaction, whose own entries must not be
+    numbered before they commit.
+    """
+    pending = TaskChange.objects.filter(sequence__isnull=True)
+    if connection.in_atomic_block or not pending.exists():
+        return
+    with transaction.atomic():
+        # An UPDATE takes the head row's write lock on every backend (SQLite ignores FOR UPDATE)
+        if not TaskChangeHead.objects.filter(pk=1).update(sequence=F('sequence')):
+            last = TaskChange.objects.aggregate(last=Max('sequence'))['last'] or 0
+            TaskChangeHead.objects.get_or_create(pk=1, defaults={'sequence': last})
+            TaskChangeHead.objects.filter(pk=1).update(sequence=F('sequence'))
+        head = TaskChangeHead.objects.get(pk=1)
+        entries = [TaskChange(pk=pk) for pk in pending.order_by('id').values_list('id', flat=True)]
+        for offset, entry in enumerate(entries, 1):
+            entry.sequence = head.sequence + offset
+        TaskChange.objects.bulk_update(entries, ['sequence'], batch_size=RECORD_BATCH_SIZE)
+        head.sequence += len(entries)
+        head.save(update_fields=['sequence'])
+
+
+def sequenced_changes():
+    """Entries safe to hand out: every one numbered, after numbering any that are waiting"""
+    assign_sequences()
+    return TaskChange.objects.filter(sequence__isnull=False)
+
+
+def latest_sequence():
+    return sequenced_changes().order_by('-sequence').values_list('sequence', flat=True).first() or 0
+
+
+def is_pruned(since):
+    """True when entries after ``since`` have been pruned and the client must resync"""
+    oldest = sequenced_changes().order_by('sequence').values_list('sequence', flat=True).first()
+    return bool(since) and oldest is not None and oldest > since + 1
+
+
+def relevant_changes(queryset, user, since):
+    """Entries that may concern the user: their projects, their tasks and their access changes"""
+    if user.role == 'admin':
+        return queryset.exclude(action__in=ACCESS_ACTIONS)
+
+    # Imported here to avoid a cycle: access records access changes through this module
+    from .access import accessible_project_ids
+
+    accessible = accessible_project_ids(user)
+    revoked = TaskChange.objects.filter(
+        sequence__gt=since, action='access_revoked', user_id=user.id
+    ).values('project_id')
+    task_entries = (
+        Q(project_id__in=accessible) | Q(previous_project_id__in=accessible) |
+        Q(project_id__in=revoked) | Q(previous_project_id__in=revoked) |
+        Q(assigned_to_id=user.id) | Q(previous_assigned_to_id=user.id) | Q(created_by_id=user.id)
+    )
+    return queryset.filter(
+        (~Q(action__in=ACCESS_ACTIONS) & task_entries) |
+        Q(action__in=ACCESS_ACTIONS, user_id=user.id)
+    )
+
+
+def is_relevant(entry, user, project_ids):
+    """In-memory counterpart of relevant_changes for one entry"""
+    if entry.action in ACCESS_ACTIONS:
+        return user.role != 'admin' and entry.user_id == user.pk
+    if user.role == 'admin':
+        return True
+    return (
+        entry.project_id in project_ids or entry.previous_project_id in project_ids or
+        user.pk in (entry.assigned_to_id, entry.previous_assigned_to_id, entry.created_by_id)
+    )
+
+
+def changes_since(user, since, limit):
+    """Return (entries, cursor, has_more) for entries after ``since``"""
+    # Fix the upper bound first so entries numbered mid-request are left for the next call
+    upper = latest_sequence()
+    entries = list(
+        relevant_changes(TaskChange.objects.filter(sequence__gt=since, sequence__lte=upper), user, since)
+        .order_by('sequence')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    if has_more:
+        entries = entries[:limit]
+        return entries, entries[-1].sequence, True
+    return entries, max(since, upper), False
+
+
+def resolve_changes(entries, visible, user):
+    """
+    Turn entries into (upserts, tombstones). ``visible`` is the caller's
+    visible task queryset; changed tasks found in it are returned in full
+    (with every task of newly accessible projects), the rest as tombstones.
+    """
+    from .access import visible_tasks
+
+    latest_by_task = {}
+    latest_by_project = {}
+    for entry in entries:
+        if entry.action in ACCESS_ACTIONS:
+            latest_by_project[entry.project_id] = entry
+        else:
+            latest_by_task[entry.task_id] = entry
+    granted = [pk for pk, entry in latest_by_project.items() if entry.action == 'access_granted']
+    revoked = {pk: entry for pk, entry in latest_by_project.items() if entry.action == 'access_revoked'}
+
+    upserts = list(visible.filter(Q(pk__in=list(latest_by_task)) | Q(project_id__in=granted)).order_by('pk'))
+    visible_ids = {task.pk for task in upserts}
+
+    tombstones = {}
+    for task_id, entry in latest_by_task.items():
+        if task_id not in visible_ids:
+            reason = 'deleted' if entry.action == 'deleted' else 'not_visible'
+            tombstones[task_id] = {'id': task_id, 'seq': entry.sequence, 'reason': reason}
+    if revoked:
+        hidden = Task.objects.filter(project_id__in=list(revoked)).exclude(
+            pk__in=visible_tasks(Task.objects.all(), user).values('pk')
+        ).values_list('pk', 'project_id')
+        for task_id, project_id in hidden:
+            tombstones.setdefault(task_id, {'id': task_id, 'seq': revoked[project_id].sequence, 'reason': 'not_visible'})
+    return upserts, sorted(tombstones.values(), key=lambda item: item['seq'])
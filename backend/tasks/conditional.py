@@ -0,0 +1,65 @@
+"""
+Conditional GET for read-only viewset actions.
+
+Validators come from the caller's version stamps in ``tasks.cache`` rather
+than from the data, so they cost two cache reads: the ETag hashes the stamps
+with the user and the full request URL, and Last-Modified is the newest
+stamp. A matching ``If-None-Match``/``If-Modified-Since`` is answered with
+304 before the queryset is evaluated or anything is serialized.
+
+Stamps in a per-process cache miss the bumps made by other workers and
+processes (imports, archiving), so without a shared cache no validators
+are sent and every request gets a full 200.
+"""
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .cache import DIRECTORY_SCOPE, get_version, shared_cache, user_version
+
+
+class ConditionalGetMixin:
+    """Adds validators and 304 handling to ``list`` and ``retrieve``"""
+
+    def get_conditional_time_window(self):
+        """
+        Seconds after which validators expire even without writes, for
+        payloads with time-derived fields (None: only writes change them)
+        """
+        return None
+
+    def get_validators(self, request):
+        """Return (etag, last_modified timestamp) for the current request"""
+        stamps = [user_version(request.user), get_version(DIRECTORY_SCOPE)]
+        window = self.get_conditional_time_window()
+        if window:
+            stamps.append(int(time.time() // window * window * 1_000_000_000))
+        raw = ':'.join(str(part) for part in (
+            request.user.pk, request.user.role, *stamps,
+            request.accepted_media_type, request.get_full_path(),
+        ))
+        etag = '"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+        return etag, max(stamps) // 1_000_000_000
+
+    def dispatch_conditional(self, request, handler, *args, **kwargs):
+        if not shared_cache():
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Responses are per user and must be revalidated before reuse
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.dispatch_conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.dispatch_conditional(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,284 @@
+"""
+Task dependencies and per-project critical paths.
+
+An edge ``blocked_by -> task`` means the task cannot start before its
+blocker is done. Edges link tasks of one project. Adding one locks the
+project row, reads the project's edges in one query and searches them
+from the task: if the blocker is reachable, the edge would close a cycle
+and is rejected.
+
+A schedule gives each task of a project its earliest start and finish in
+hours of remaining work. Open tasks take ``estimated_hours``; finished and
+unestimated tasks take none. The times are derived in topological order
+over an adjacency map, so the work is linear in tasks plus edges. The
+critical path is the chain of blockers that ends at the latest finish.
+
+Schedules are cached per project under its ``schedule`` cache scope. After
+commit, an edge or weight change refreshes the cached schedule: the changed
+tasks and their edges are re-read from the database and only they and the
+tasks downstream of them are re-derived. Refreshes of a project hold its
+row lock and store the result under a new version. Because each one
+re-reads committed rows, refreshes running in any order (or twice) leave
+the same schedule. A schedule computed by a reader while a refresh ran is
+stored under the old version and never read. With a process-local cache
+backend, schedules are computed on every read instead.
+"""
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .cache import bump_versions, get_version, schedule_scope, shared_cache
+from .models import Project, Task, TaskDependency
+
+CLOSED_STATUSES = ('completed', 'cancelled')
+
+
+class DependencyError(Exception):
+    """The dependency cannot be added"""
+
+
+def task_weight(status, estimated_hours):
+    """Hours a task still adds to everything it blocks"""
+    return 0 if status in CLOSED_STATUSES else (estimated_hours or 0)
+
+
+def _cache_key(project_id, version):
+    return f'tasks:schedule:{project_id}:{version}'
+
+
+def project_edges(project_id):
+    """(blocked_by id, task id) pairs of the project, from one indexed query"""
+    return TaskDependency.objects.filter(project_id=project_id).order_by().values_list('blocked_by_id', 'task_id')
+
+
+def find_path(successors, source, target):
+    """Ids of a path from ``source`` to ``target`` through ``successors`` ({id: ids}), or None"""
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parents[node]
+            return path[::-1]
+        for successor in successors.get(node, ()):
+            if successor not in parents:
+                parents[successor] = node
+                queue.append(successor)
+    return None
+
+
+def add_dependency(task, blocked_by):
+    """Record that ``task`` is blocked by ``blocked_by``; returns (dependency, created)"""
+    if task.pk == blocked_by.pk:
+        raise DependencyError('A task cannot be blocked by itself.')
+    if task.project_id != blocked_by.project_id:
+        raise DependencyError('A task can only be blocked by tasks of the same project.')
+
+    with transaction.atomic():
+        # Serialize edge inserts per project, so two concurrent inserts cannot close a cycle between them
+        list(Project.objects.select_for_update().filter(pk=task.project_id).values_list('pk', flat=True))
+        successors = {}
+        for before, after in project_edges(task.project_id):
+            successors.setdefault(before, []).append(after)
+        path = find_path(successors, task.pk, blocked_by.pk)
+        if path:
+            chain = ' -> '.join(f'#{pk}' for pk in path)
+            raise DependencyError(f'Task #{blocked_by.pk} is already blocked by task #{task.pk} ({chain}).')
+        return TaskDependency.objects.get_or_create(
+            task=task, blocked_by=blocked_by, defaults={'project_id': task.project_id}
+        )
+
+
+def remove_dependency(task, blocked_by_id):
+    """Returns whether the dependency existed"""
+    deleted, _ = TaskDependency.objects.filter(task=task, blocked_by_id=blocked_by_id).delete()
+    return bool(deleted)
+
+
+def detach_task(task_id):
+    """Drop every dependency of a task, e.g. when it moves to another project"""
+    detach_tasks([task_id])
+
+
+def detach_tasks(task_ids):
+    """Drop every dependency of the given tasks in one query"""
+    TaskDependency.objects.filter(Q(task_id__in=task_ids) | Q(blocked_by_id__in=task_ids)).delete()
+
+
+def _link(schedule, before, after):
+    schedule['successors'].setdefault(before, set()).add(after)
+    schedule['predecessors'].setdefault(after, set()).add(before)
+
+
+def _detach(schedule, node):
+    """Remove a task and its edges; returns the tasks it blocked"""
+    successors = schedule['successors'].pop(node, set())
+    for after in successors:
+        schedule['predecessors'].get(after, set()).discard(node)
+    for before in schedule['predecessors'].pop(node, set()):
+        schedule['successors'].get(before, set()).discard(node)
+    schedule['weights'].pop(node, None)
+    schedule['finish'].pop(node, None)
+    return successors
+
+
+def _derive(schedule, roots):
+    """Recompute the finish times of ``roots`` and everything downstream, in topological order"""
+    weights, predecessors, successors = schedule['weights'], schedule['predecessors'], schedule['successors']
+    finish = schedule['finish']
+    affected = set()
+    stack = [node for node in roots if node in weights]
+    while stack:
+        node = stack.pop()
+        if node not in affected:
+            affected.add(node)
+            stack.extend(successors.get(node, ()))
+
+    # Kahn's algorithm over the affected tasks; their other blockers keep their finish times
+    waiting = {node: sum(1 for before in predecessors.get(node, ()) if before in affected) for node in affected}
+    ready = deque(node for node, count in waiting.items() if not count)
+    while ready:
+        node = ready.popleft()
+        start = max((finish[before] for before in predecessors.get(node, ())), default=0)
+        finish[node] = start + weights[node]
+        for after in successors.get(node, ()):
+            waiting[after] -= 1
+            if not waiting[after]:
+                ready.append(after)
+
+
+def compute_schedule(project_id):
+    """Build the project's schedule from its tasks and edges"""
+    weights = {
+        pk: task_weight(status, hours)
+        for pk, status, hours in Task.objects.filter(project_id=project_id).order_by().values_list(
+            'id', 'status', 'estimated_hours'
+        )
+    }
+    schedule = {'weights': weights, 'predecessors': {}, 'successors': {}, 'finish': {}}
+    for before, after in project_edges(project_id):
+        _link(schedule, before, after)
+    _derive(schedule, list(weights))
+    return schedule
+
+
+def get_schedule(project_id):
+    """Return (schedule, cache hit); schedules are only cached in a shared cache"""
+    if not shared_cache():
+        return compute_schedule(project_id), False
+    key = _cache_key(project_id, get_version(schedule_scope(project_id)))
+    schedule = cache.get(key)
+    if schedule is not None:
+        return schedule, True
+    schedule = compute_schedule(project_id)
+    cache.set(key, schedule, settings.TASK_SCHEDULE_CACHE_TIMEOUT)
+    return schedule, False
+
+
+def critical_path(schedule):
+    """Task ids of the longest chain, first blocker first"""
+    finish, predecessors = schedule['finish'], schedule['predecessors']
+    if not finish:
+        return []
+    # The lowest id wins ties, so the answer is stable
+    node = max(finish, key=lambda pk: (finish[pk], -pk))
+    path = [node]
+    while predecessors.get(node):
+        node = max(predecessors[node], key=lambda pk: (finish[pk], -pk))
+        path.append(node)
+    return path[::-1]
+
+
+def project_schedule(project_id):
+    """The API representation of a project's schedule; returns (data, cache hit)"""
+    schedule, hit = get_schedule(project_id)
+    finish, weights = schedule['finish'], schedule['weights']
+    path = critical_path(schedule)
+    titles = dict(Task.objects.filter(pk__in=path).values_list('id', 'title'))
+    data = {
+        'total_hours': finish[path[-1]] if path else 0,
+        'critical_path': [
+            {
+                'id': pk,
+                'title': titles.get(pk),
+                'hours': weights[pk],
+                'earliest_start': finish[pk] - weights[pk],
+                'earliest_finish': finish[pk],
+            }
+            for pk in path
+        ],
+        'tasks': [
+            {
+                'id': pk,
+                'earliest_start': finish[pk] - weights[pk],
+                'earliest_finish': finish[pk],
+                'blocked_by': sorted(schedule['predecessors'].get(pk, ())),
+            }
+            for pk in sorted(finish, key=lambda pk: (finish[pk] - weights[pk], pk))
+        ],
+    }
+    return data, hit
+
+
+def _refresh_cached(project_id, task_ids):
+    """Re-read the given tasks and their edges into the cached schedule and re-derive them"""
+    if not shared_cache():
+        return
+    scope = schedule_scope(project_id)
+    with transaction.atomic():
+        list(Project.objects.select_for_update().filter(pk=project_id).values_list('pk', flat=True))
+        schedule = cache.get(_cache_key(project_id, get_version(scope)))
+        bump_versions([scope])
+        if schedule is None:
+            return
+
+        roots = set()
+        for task_id in task_ids:
+            roots.update(_detach(schedule, task_id))
+        for pk, status, hours in Task.objects.filter(project_id=project_id, pk__in=task_ids).order_by().values_list(
+            'id', 'status', 'estimated_hours'
+        ):
+            schedule['weights'][pk] = task_weight(status, hours)
+            roots.add(pk)
+        for before, after in project_edges(project_id).filter(Q(task_id__in=task_ids) | Q(blocked_by_id__in=task_ids)):
+            if before in schedule['weights'] and after in schedule['weights']:
+                _link(schedule, before, after)
+        _derive(schedule, roots)
+        cache.set(_cache_key(project_id, get_version(scope)), schedule, settings.TASK_SCHEDULE_CACHE_TIMEOUT)
+
+
+def record_dependency_change(dependency):
+    """Refresh the two tasks of an added or removed edge in the cached schedule after commit"""
+    task_ids = {dependency.blocked_by_id, dependency.task_id}
+    transaction.on_commit(lambda: _refresh_cached(dependency.project_id, task_ids))
+
+
+def record_schedule_changes(changes):
+    """
+    Refresh cached schedules after commit for (task id, previous state, new
+    state) triples of ``changes.task_state`` dicts; None stands for
+    created/deleted
+    """
+    by_project = {}
+    for task_id, previous, current in changes:
+        moved = previous is not None and (current is None or current['project_id'] != previous['project_id'])
+        if moved:
+            by_project.setdefault(previous['project_id'], set()).add(task_id)
+        if current is None:
+            continue
+        weight = task_weight(current['status'], current['estimated_hours'])
+        if previous is None or moved or weight != task_weight(previous['status'], previous['estimated_hours']):
+            by_project.setdefault(current['project_id'], set()).add(task_id)
+
+    def apply():
+        for project_id, task_ids in by_project.items():
+            _refresh_cached(project_id, task_ids)
+
+    if by_project:
+        transaction.on_commit(apply)
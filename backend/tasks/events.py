@@ -0,0 +1,191 @@
+"""
+Server-sent events for task and comment changes.
+
+Each worker process runs one ``ChangeBroadcaster`` that polls the task change
+log and fans new entries out to per-connection asyncio queues, so an idle
+connection costs a queue and a coroutine rather than a thread or a database
+connection. Every connection filters entries against the projects its user
+can access, and a reconnecting client resumes from ``Last-Event-ID`` through
+the same log. Streams only scale when served by the ASGI events service
+(``core.asgi``); under WSGI each one holds a worker thread.
+"""
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from .access import accessible_project_ids
+from .changes import ACCESS_ACTIONS, is_relevant, latest_sequence, relevant_changes, sequenced_changes
+from .models import TaskChange
+
+logger = logging.getLogger(__name__)
+
+POLL_BATCH_SIZE = 1000
+QUEUE_SIZE = 100
+CATCH_UP_LIMIT = 1000
+HEARTBEAT_SECONDS = 15
+RETRY_MILLISECONDS = 3000
+
+
+class ChangeBroadcaster:
+    """Polls the change log while anyone is subscribed and pushes each batch to every queue"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.cursor = None
+        self.queues = set()
+        self.poller = None
+
+    async def subscribe(self):
+        """Return (queue, cursor); the queue receives every entry after cursor"""
+        if self.cursor is None:
+            self.cursor = await sync_to_async(latest_sequence)()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.queues.add(queue)
+        if self.poller is None or self.poller.done():
+            self.poller = asyncio.create_task(self.poll())
+        return queue, self.cursor
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+
+    def fetch(self, cursor):
+        return list(sequenced_changes().filter(sequence__gt=cursor).order_by('sequence')[:POLL_BATCH_SIZE])
+
+    async def poll(self):
+        while self.queues:
+            try:
+                entries = await sync_to_async(self.fetch)(self.cursor)
+            except Exception:
+                logger.exception('Polling the task change log failed')
+                await sync_to_async(connection.close)()
+                entries = []
+            if entries:
+                self.cursor = entries[-1].sequence
+                for queue in list(self.queues):
+                    self.publish(queue, entries)
+            if len(entries) < POLL_BATCH_SIZE:
+                await asyncio.sleep(self.interval)
+        # Start from the head of the log again once someone subscribes
+        self.cursor = None
+
+    def publish(self, queue, entries):
+        try:
+            queue.put_nowait(entries)
+        except asyncio.QueueFull:
+            # The client is not keeping up: end its stream with a None marker
+            # and let it resume from Last-Event-ID
+            self.unsubscribe(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+
+broadcaster = ChangeBroadcaster(settings.TASK_EVENTS_POLL_INTERVAL)
+
+
+def authenticate(request):
+    """
+    Return (user, token expiry) from the Authorization header, or from
+    ?token= since browsers' EventSource cannot send headers
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else request.GET.get('token')
+    if not raw_token:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    token = authentication.get_validated_token(raw_token)
+    return authentication.get_user(token), token['exp']
+
+
+def catch_up(user, since, cursor):
+    """Entries the client missed, or None when there are too many to replay"""
+    entries = list(
+        relevant_changes(TaskChange.objects.filter(sequence__gt=since, sequence__lte=cursor), user, since)
+        .order_by('sequence')[:CATCH_UP_LIMIT + 1]
+    )
+    return None if len(entries) > CATCH_UP_LIMIT else entries
+
+
+def format_event(event, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {json.dumps(data)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+def entry_event(entry):
+    if entry.action in ACCESS_ACTIONS:
+        event = 'access'
+    elif entry.action == 'commented':
+        event = 'comment'
+    else:
+        event = 'task'
+    data = {'seq': entry.sequence, 'action': entry.action, 'task_id': entry.task_id, 'project_id': entry.project_id}
+    return format_event(event, data, entry.sequence)
+
+
+async def event_stream(user, since, expires_at):
+    queue, cursor = await broadcaster.subscribe()
+    try:
+        project_ids = await sync_to_async(accessible_project_ids)(user)
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+
+        if since is not None and since < cursor:
+            missed = await sync_to_async(catch_up)(user, since, cursor)
+            if missed is None:
+                # Too far behind: the client should resync through tasks/changes/
+                yield format_event('reset', {'cursor': cursor}, cursor)
+                missed = []
+            for entry in missed:
+                yield entry_event(entry)
+
+        while time.time() < expires_at:
+            try:
+                entries = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if entries is None:
+                return
+            for entry in entries:
+                if entry.action in ACCESS_ACTIONS and entry.user_id == user.pk:
+                    project_ids = await sync_to_async(accessible_project_ids)(user)
+                if is_relevant(entry, user, project_ids):
+                    yield entry_event(entry)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+async def task_events(request):
+    """
+    GET /api/tasks/events/ — text/event-stream of task, comment and access
+    events. Streams end when the access token expires or after
+    TASK_EVENTS_MAX_DURATION seconds; EventSource reconnects on its own and
+    sends Last-Event-ID so nothing is missed.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        user, token_expiry = await sync_to_async(authenticate)(request)
+    except (AuthenticationFailed, InvalidToken) as error:
+        return JsonResponse({'detail': str(error.detail) if hasattr(error, 'detail') else str(error)}, status=401)
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return JsonResponse({'error': 'Last-Event-ID and since must be integers'}, status=400)
+
+    expires_at = min(token_expiry, time.time() + settings.TASK_EVENTS_MAX_DURATION)
+    response = StreamingHttpResponse(event_stream(user, since, expires_at), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,42 @@
+import django_filters
+from django.db.models import Count
+
+from .models import Task, TaskTagLink
+from .tags import parse_tags
+
+
+class TaskFilter(django_filters.FilterSet):
+    """
+    Task filters. ``?tag=a&tag=b`` matches tasks carrying every listed tag;
+    add ``tag_mode=any`` to match tasks carrying at least one of them.
+    """
+
+    TAG_MODE_CHOICES = [('all', 'All'), ('any', 'Any')]
+
+    tag = django_filters.CharFilter(method='filter_tags')
+    tag_mode = django_filters.ChoiceFilter(choices=TAG_MODE_CHOICES, method='filter_tag_mode')
+
+    class Meta:
+        model = Task
+        fields = ['status', 'priority', 'project', 'assigned_to', 'created_by']
+
+    def filter_tags(self, queryset, name, value):
+        names = []
+        for raw in self.data.getlist('tag') if hasattr(self.data, 'getlist') else [value]:
+            names.extend(parse_tags(raw))
+        if not names:
+            return queryset
+
+        links = TaskTagLink.objects.filter(tag__name__in=names)
+        if self.data.get('tag_mode') == 'any':
+            return queryset.filter(pk__in=links.values('task_id'))
+
+        # Every tag must be present: group the matching links per task
+        complete = links.values('task_id').annotate(matched=Count('tag_id')).filter(
+            matched=len(set(names))
+        ).values('task_id')
+        return queryset.filter(pk__in=complete)
+
+    def filter_tag_mode(self, queryset, name, value):
+        # Read by filter_tags
+        return queryset
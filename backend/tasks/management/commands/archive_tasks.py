@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.archive import archivable_tasks, archive_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Move tasks completed or cancelled more than --days ago, with their comments and '
+        'attachment metadata, into the archive tables. Each batch is its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Days a task stays live after finishing')
+        parser.add_argument('--batch-size', type=int, default=500, help='Tasks moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the tasks that would move')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = archivable_tasks(cutoff).count()
+            self.stdout.write(f'{count} tasks would be archived')
+            return
+
+        archived = 0
+        for moved in archive_tasks(cutoff, options['batch_size']):
+            archived += moved
+            self.stdout.write(f'{archived} tasks archived')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Archived {archived} tasks finished more than {options["days"]} days ago'
+        ))
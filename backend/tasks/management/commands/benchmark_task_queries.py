@@ -0,0 +1,175 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Value
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from tasks.access import sync_project_access
+from tasks.models import Project, Task
+from tasks.views import TaskViewSet, dashboard_aggregates
+
+User = get_user_model()
+
+BENCHMARK_PREFIX = 'bench-'
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded data and dropped indexes"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic tasks and print EXPLAIN plans and timings for each TaskViewSet query, '
+        'with and without the Task indexes. Everything runs in a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000, help='Number of tasks to seed')
+        parser.add_argument('--users', type=int, default=50, help='Number of users to seed')
+        parser.add_argument('--projects', type=int, default=40, help='Number of projects to seed')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+        parser.add_argument('--no-plans', action='store_true', help='Only print timings')
+
+    def handle(self, *args, **options):
+        if not connection.features.can_rollback_ddl:
+            raise CommandError('This benchmark needs a database with transactional DDL (PostgreSQL or SQLite).')
+
+        self.options = options
+        try:
+            with transaction.atomic():
+                user = self.seed()
+                self.analyze()
+
+                after = self.run_queries(user, 'with indexes')
+                dropped = self.drop_task_indexes()
+                self.analyze()
+                before = self.run_queries(user, f'without indexes ({", ".join(dropped)})')
+
+                self.report(before, after)
+                raise Rollback
+        except Rollback:
+            self.stdout.write('Seeded data and index changes rolled back.')
+
+    def seed(self):
+        options = self.options
+        rng = random.Random(42)
+        now = timezone.now()
+        self.stdout.write(
+            f"Seeding {options['users']} users, {options['projects']} projects, {options['tasks']} tasks..."
+        )
+
+        users = User.objects.bulk_create([
+            User(
+                username=f'{BENCHMARK_PREFIX}{i}', email=f'{BENCHMARK_PREFIX}{i}@example.com',
+                first_name='Bench', last_name=str(i), role='user',
+            )
+            for i in range(options['users'])
+        ])
+        projects = Project.objects.bulk_create([
+            Project(name=f'{BENCHMARK_PREFIX}project-{i}', created_by=rng.choice(users))
+            for i in range(options['projects'])
+        ])
+        through = Project.members.through
+        memberships = {
+            (project.pk, member.pk)
+            for project in projects
+            for member in rng.sample(users, min(len(users), 8))
+        }
+        through.objects.bulk_create([
+            through(project_id=project_id, user_id=user_id) for project_id, user_id in memberships
+        ])
+        sync_project_access([project.pk for project in projects])
+
+        statuses = [choice[0] for choice in Task.STATUS_CHOICES]
+        priorities = [choice[0] for choice in Task.PRIORITY_CHOICES]
+        batch = []
+        for i in range(options['tasks']):
+            batch.append(Task(
+                title=f'{BENCHMARK_PREFIX}task {i}',
+                description='Synthetic benchmark task',
+                due_date=now + timedelta(days=rng.randint(-60, 60)),
+                priority=rng.choice(priorities),
+                status=rng.choice(statuses),
+                project=rng.choice(projects),
+                assigned_to=rng.choice(users + [None]),
+                created_by=rng.choice(users),
+                estimated_hours=rng.randint(1, 40),
+            ))
+            if len(batch) == 2000:
+                Task.objects.bulk_create(batch)
+                batch = []
+        Task.objects.bulk_create(batch)
+        return users[0]
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def drop_task_indexes(self):
+        # Execute the DROP statements directly: SQLite's schema editor refuses to
+        # run inside an atomic block while foreign key checks are enabled
+        schema_editor = connection.schema_editor()
+        dropped = []
+        with connection.cursor() as cursor:
+            for index in Task._meta.indexes:
+                cursor.execute(str(index.remove_sql(Task, schema_editor)))
+                dropped.append(index.name)
+        return dropped
+
+    def viewset_queries(self, user):
+        """(label, queryset) pairs built by TaskViewSet exactly as the API does"""
+        factory = APIRequestFactory()
+        project = user.project_access.values_list('project_id', flat=True).first()
+
+        def build(action, query='', **filters):
+            request = factory.get(f'/api/tasks/tasks/{query}')
+            view = TaskViewSet(action=action, format_kwarg=None, kwargs={})
+            view.request = Request(request)
+            view.request.user = user
+            queryset = view.filter_queryset(view.get_queryset())
+            return queryset.filter(**filters) if filters else queryset
+
+        now = timezone.now()
+        return [
+            ('list (page 1)', build('list')[:20]),
+            ('list ?status=todo', build('list', '?status=todo')[:20]),
+            ('list ?project=&status=', build('list', f'?project={project}&status=in_progress')[:20]),
+            ('my_tasks', build('my_tasks', assigned_to=user)),
+            ('my_tasks ?status=todo', build('my_tasks', '?status=todo', assigned_to=user)),
+            ('overdue', build('overdue', due_date__lt=now, status__in=['todo', 'in_progress'])),
+            ('keyset page (due_date, id)', build('list').order_by('due_date', 'id')[:20]),
+            # Constant values() keeps the single aggregate row but yields an explainable queryset
+            ('dashboard_stats', build('dashboard_stats').order_by().values(
+                row=Value(1)).annotate(**dashboard_aggregates(user, now))),
+        ]
+
+    def run_queries(self, user, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n=== {label} ==='))
+        timings = {}
+        for name, queryset in self.viewset_queries(user):
+            samples = []
+            for _ in range(self.options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+
+            self.stdout.write(self.style.SUCCESS(f'{name}: {timings[name]:.2f} ms'))
+            if not self.options['no_plans']:
+                for line in queryset.explain().splitlines():
+                    self.stdout.write(f'    {line}')
+        return timings
+
+    def report(self, before, after):
+        self.stdout.write(self.style.MIGRATE_HEADING('\n=== Summary (median ms) ==='))
+        self.stdout.write(f"{'query':<32}{'before':>10}{'after':>10}{'speedup':>10}")
+        for name, after_ms in after.items():
+            before_ms = before[name]
+            speedup = before_ms / after_ms if after_ms else float('inf')
+            self.stdout.write(f'{name:<32}{before_ms:>10.2f}{after_ms:>10.2f}{speedup:>9.1f}x')
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.models import AttachmentUpload
+from tasks.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked attachment uploads that have not received data within the given time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Idle hours after which a pending upload is dropped')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = AttachmentUpload.objects.filter(status='pending', updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            discard_upload(upload)
+            upload.delete()
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'✓ Removed {count} stale uploads'))
@@ -0,0 +1,212 @@
+import csv
+import json
+import os
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from tasks.bulk import tasks_changed, validate_rows
+from tasks.models import Project, Task
+from tasks.serializers import TaskBulkCreateSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Import tasks from a CSV or NDJSON file (columns as produced by the task export). '
+        'Rows are validated and inserted in batches; rejected rows are written to a side file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per validation/insert batch')
+        parser.add_argument('--created-by', help='Username or email used when a row has no created_by')
+        parser.add_argument('--rejects', default='rejected_tasks.ndjson',
+                            help='Where to write rejected rows (NDJSON)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, insert nothing')
+
+    def handle(self, *args, **options):
+        self.options = options
+        input_format = options['format'] or self.guess_format(options['path'])
+        self.default_creator = None
+        if options['created_by']:
+            self.default_creator = User.objects.filter(
+                Q(username=options['created_by']) | Q(email=options['created_by'])
+            ).first()
+            if self.default_creator is None:
+                raise CommandError(f"User {options['created_by']!r} not found")
+
+        imported = rejected = 0
+        started = time.perf_counter()
+        source = sys.stdin if options['path'] == '-' else open(options['path'], newline='', encoding='utf-8')
+        with source, open(options['rejects'], 'w', encoding='utf-8') as rejects:
+            for batch in self.batches(self.read_rows(source, input_format), options['batch_size']):
+                created, errors = self.import_batch(batch)
+                imported += created
+                rejected += len(errors)
+                for line_number, row, row_errors in errors:
+                    rejects.write(json.dumps({'line': line_number, 'row': row, 'errors': row_errors}, default=str) + '\n')
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{imported + rejected} rows processed, {imported} imported, {rejected} rejected '
+                    f'({(imported + rejected) / elapsed:.0f} rows/s)'
+                )
+
+        elapsed = time.perf_counter() - started
+        processed = imported + rejected
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {verb} {imported} of {processed} rows in {elapsed:.1f}s '
+            f'({processed / elapsed if elapsed else 0:.0f} rows/s)'
+        ))
+        if rejected:
+            self.stdout.write(self.style.WARNING(f"✗ {rejected} rows rejected, see {options['rejects']}"))
+        else:
+            os.remove(options['rejects'])
+
+    def guess_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.ndjson', '.jsonl'):
+            return 'ndjson'
+        if extension == '.csv':
+            return 'csv'
+        raise CommandError('Cannot infer the input format; pass --format')
+
+    def read_rows(self, source, input_format):
+        """Yield (line number, row dict) lazily so the file is never fully loaded"""
+        if input_format == 'csv':
+            reader = csv.DictReader(source)
+            for row in reader:
+                yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+            return
+        for line_number, line in enumerate(source, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                row = {'__invalid__': str(error)}
+            yield line_number, row if isinstance(row, dict) else {'__invalid__': 'Expected a JSON object'}
+
+    def batches(self, rows, size):
+        batch = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def resolve_projects(self, rows):
+        """One query for every project referenced by id or name in the batch"""
+        ids, names = set(), set()
+        for _, row in rows:
+            if row.get('project_id') is not None:
+                ids.add(str(row['project_id']))
+            elif row.get('project') is not None:
+                names.add(str(row['project']))
+        int_ids = {int(value) for value in ids if value.isdigit()}
+        by_id, by_name = {}, {}
+        if int_ids or names:
+            for project in Project.objects.filter(Q(pk__in=int_ids) | Q(name__in=names)):
+                by_id[project.pk] = project
+                # Project names are not unique; None marks an ambiguous name
+                by_name[project.name] = None if project.name in by_name else project
+        return by_id, by_name
+
+    def resolve_users(self, rows):
+        """One query for every user referenced by id, username or email in the batch"""
+        ids, handles = set(), set()
+        for _, row in rows:
+            for field in ('assigned_to', 'created_by'):
+                if row.get(f'{field}_id') is not None:
+                    ids.add(str(row[f'{field}_id']))
+                elif row.get(field) is not None:
+                    handles.add(str(row[field]))
+        int_ids = {int(value) for value in ids if value.isdigit()}
+        by_id, by_handle = {}, {}
+        if int_ids or handles:
+            for user in User.objects.filter(Q(pk__in=int_ids) | Q(username__in=handles) | Q(email__in=handles)):
+                by_id[user.pk] = user
+                by_handle[user.username] = user
+                by_handle[user.email] = user
+        return by_id, by_handle
+
+    def reference(self, row, field, by_id, by_name, errors, label):
+        """Return the referenced pk, None when absent, or record an error"""
+        if row.get(f'{field}_id') is not None:
+            value = str(row[f'{field}_id'])
+            obj = by_id.get(int(value)) if value.isdigit() else None
+            if obj is None:
+                errors[field] = [f'{label} {value} does not exist.']
+            return obj.pk if obj else None
+        if row.get(field) is not None:
+            value = str(row[field])
+            if value not in by_name:
+                errors[field] = [f'{label} {value!r} does not exist.']
+            elif by_name[value] is None:
+                errors[field] = [f'{label} name {value!r} is ambiguous; use {field}_id.']
+            else:
+                return by_name[value].pk
+        return None
+
+    def import_batch(self, batch):
+        projects_by_id, projects_by_name = self.resolve_projects(batch)
+        users_by_id, users_by_handle = self.resolve_users(batch)
+        context = {'projects': projects_by_id, 'users': users_by_id}
+        fields = TaskBulkCreateSerializer.Meta.fields
+
+        now = timezone.now()
+        prepared, rejected = [], []
+        for line_number, row in batch:
+            if '__invalid__' in row:
+                rejected.append((line_number, row, {'row': [row['__invalid__']]}))
+                continue
+
+            errors = {}
+            data = {key: row[key] for key in fields if key in row and key not in ('project', 'assigned_to')}
+            project_id = self.reference(row, 'project', projects_by_id, projects_by_name, errors, 'Project')
+            if project_id is not None:
+                data['project'] = project_id
+            data['assigned_to'] = self.reference(row, 'assigned_to', users_by_id, users_by_handle, errors, 'User')
+            creator_id = self.reference(row, 'created_by', users_by_id, users_by_handle, errors, 'User')
+            creator = users_by_id.get(creator_id) or self.default_creator
+            if creator is None and 'created_by' not in errors:
+                errors['created_by'] = ['Missing created_by and no --created-by default given.']
+
+            completed_at = None
+            if row.get('completed_at'):
+                completed_at = parse_datetime(str(row['completed_at']))
+                if completed_at is None:
+                    errors['completed_at'] = ['Invalid datetime.']
+            prepared.append((line_number, row, data, errors, creator, completed_at))
+
+        pending = []
+        validated = validate_rows(TaskBulkCreateSerializer, [item[2] for item in prepared], context)
+        for (line_number, row, _, errors, creator, completed_at), (_, data, field_errors) in zip(prepared, validated):
+            if field_errors:
+                errors = {**field_errors, **errors}
+            if errors:
+                rejected.append((line_number, row, errors))
+                continue
+
+            task = Task(created_by=creator, **data)
+            if task.status == 'completed':
+                task.completed_at = completed_at or now
+            pending.append(task)
+
+        if pending and not self.options['dry_run']:
+            with transaction.atomic():
+                created = Task.objects.bulk_create(pending, batch_size=self.options['batch_size'])
+                tasks_changed(created, action='created')
+        return len(pending), rejected
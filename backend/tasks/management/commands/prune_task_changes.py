@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from tasks.changes import sequenced_changes
+from tasks.models import TaskChange
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete task change log entries older than the retention window. '
+        'Clients holding an older delta-sync cursor get 410 Gone and resync.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Days of change history to keep')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Entries deleted per statement')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Entries are numbered in time order, so everything below the first
+        # entry inside the window can go. The newest entry is always kept: it
+        # marks where the history starts, which is how stale cursors are detected.
+        # Entries still waiting for a number are never pruned
+        numbered = sequenced_changes()
+        boundary = (
+            numbered.filter(created_at__gte=cutoff).order_by('sequence').values_list('sequence', flat=True).first()
+            or numbered.order_by('-sequence').values_list('sequence', flat=True).first()
+        )
+        stale = numbered.filter(sequence__lt=boundary or 0)
+
+        deleted = 0
+        while True:
+            batch = list(stale.order_by('id').values_list('id', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            TaskChange.objects.filter(id__in=batch).delete()
+            deleted += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Pruned {deleted} change log entries older than {options["days"]} days'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tasks.access import sync_project_access
+from tasks.models import Project, ProjectAccess
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the project access index from project owners and members'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of projects to sync per transaction')
+        parser.add_argument('--truncate', action='store_true',
+                            help='Delete every access row before rebuilding')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['truncate']:
+            deleted, _ = ProjectAccess.objects.all().delete()
+            self.stdout.write(f"Deleted {deleted} access rows")
+
+        project_ids = list(Project.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(project_ids), batch_size):
+            batch = project_ids[start:start + batch_size]
+            with transaction.atomic():
+                sync_project_access(batch)
+            self.stdout.write(f"Synced projects {start + 1}-{start + len(batch)} of {len(project_ids)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Project access index rebuilt: {ProjectAccess.objects.count()} rows'
+        ))
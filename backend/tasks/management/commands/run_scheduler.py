@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from tasks.reminders import ReminderScheduler, get_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the due-date reminder worker. Keeps upcoming reminders in a heap, '
+        'follows task changes through the change log and sends each user one batch per tick.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=30,
+                            help='Longest sleep between ticks in seconds (change log polling)')
+        parser.add_argument('--backend', help='Dotted path of the delivery backend (default: TASK_REMINDER_BACKEND)')
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+
+    def handle(self, *args, **options):
+        scheduler = ReminderScheduler(get_backend(options['backend']))
+        scheduler.start()
+        self.stdout.write(
+            f'Tracking {len(scheduler.tasks)} tasks due before {scheduler.loaded_until:%Y-%m-%d %H:%M}'
+        )
+        try:
+            while True:
+                sent = scheduler.tick()
+                if sent:
+                    self.stdout.write(self.style.SUCCESS(f'✓ Sent {sent} reminders'))
+                if options['once']:
+                    return
+                close_old_connections()
+                time.sleep(scheduler.seconds_until_next(timezone.now(), options['interval']))
+        except KeyboardInterrupt:
+            self.stdout.write('Scheduler stopped')
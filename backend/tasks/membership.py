@@ -0,0 +1,62 @@
+"""
+Bulk project membership changes.
+
+Users are referenced by id or email and resolved in one query. The
+difference from the current member set is applied through the related
+manager, so adding is one bulk ``INSERT`` and removing one ``DELETE``, and
+the ``m2m_changed`` signal still keeps the access index, caches and change
+log in step.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+User = get_user_model()
+
+MAX_MEMBER_REFS = 1000
+
+
+def resolve_users(user_ids, emails):
+    """Return ({matched user ids}, [references that match no user]) using one query"""
+    user_ids, emails = set(user_ids), set(emails)
+    found_ids, found_emails = set(), set()
+    if user_ids or emails:
+        for pk, email in User.objects.filter(Q(pk__in=user_ids) | Q(email__in=emails)).values_list('pk', 'email'):
+            found_ids.add(pk)
+            found_emails.add(email)
+    return found_ids, sorted(user_ids - found_ids) + sorted(emails - found_emails)
+
+
+def change_members(project, mode, user_ids=(), emails=()):
+    """
+    Add, remove or replace (``mode``) the project's members with the
+    referenced users and report what happened to each of them
+    """
+    wanted, not_found = resolve_users(user_ids, emails)
+    result = {'not_found': not_found}
+    if mode == 'replace' and not_found:
+        # Replacing with a partly unknown list would silently drop members
+        result.update(added=[], removed=[], unchanged=[])
+        return result
+
+    with transaction.atomic():
+        current = set(project.members.values_list('pk', flat=True))
+        if mode == 'add':
+            to_add, to_remove = wanted - current, set()
+            result['already_members'] = sorted(wanted & current)
+        elif mode == 'remove':
+            to_add, to_remove = set(), wanted & current
+            result['not_members'] = sorted(wanted - current)
+        else:
+            to_add, to_remove = wanted - current, current - wanted
+            result['unchanged'] = sorted(wanted & current)
+        if to_remove:
+            project.members.remove(*to_remove)
+        if to_add:
+            project.members.add(*to_add)
+
+    if mode != 'remove':
+        result['added'] = sorted(to_add)
+    if mode != 'add':
+        result['removed'] = sorted(to_remove)
+    return result
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_project_access(apps, schema_editor):
+    Project = apps.get_model('tasks', 'Project')
+    ProjectAccess = apps.get_model('tasks', 'ProjectAccess')
+
+    pairs = set(Project.objects.values_list('created_by_id', 'pk'))
+    pairs.update(Project.members.through.objects.values_list('user_id', 'project_id'))
+    ProjectAccess.objects.bulk_create(
+        [ProjectAccess(user_id=user_id, project_id=project_id) for user_id, project_id in pairs],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='tasks.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'project_access',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectaccess',
+            constraint=models.UniqueConstraint(fields=('user', 'project'), name='unique_project_access'),
+        ),
+        migrations.RunPython(backfill_project_access, migrations.RunPython.noop),
+    ]
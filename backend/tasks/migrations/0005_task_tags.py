@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def parse_existing_tags(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskTag = apps.get_model('tasks', 'TaskTag')
+    TaskTagLink = apps.get_model('tasks', 'TaskTagLink')
+
+    pairs = set()
+    for task_id, tags in Task.objects.exclude(tags='').values_list('pk', 'tags').iterator(chunk_size=2000):
+        for part in tags.split(','):
+            name = part.strip().lower()[:50]
+            if name:
+                pairs.add((task_id, name))
+
+    names = {name for _, name in pairs}
+    TaskTag.objects.bulk_create([TaskTag(name=name) for name in names], batch_size=1000, ignore_conflicts=True)
+    tag_ids = dict(TaskTag.objects.values_list('name', 'pk'))
+    TaskTagLink.objects.bulk_create(
+        [TaskTagLink(task_id=task_id, tag_id=tag_ids[name]) for task_id, name in pairs],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'db_table': 'task_tags',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskTagLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_links', to='tasks.tasktag')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='tasks.task')),
+            ],
+            options={
+                'db_table': 'task_tag_links',
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, related_name='tasks', through='tasks.TaskTagLink', to='tasks.tasktag'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktaglink',
+            index=models.Index(fields=['tag', 'task'], name='task_tag_links_tag_task_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tasktaglink',
+            constraint=models.UniqueConstraint(fields=('task', 'tag'), name='unique_task_tag'),
+        ),
+        migrations.RunPython(parse_existing_tags, migrations.RunPython.noop),
+    ]
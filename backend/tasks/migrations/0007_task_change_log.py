@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('status_changed', 'Status changed'), ('deleted', 'Deleted'), ('access_granted', 'Access granted'), ('access_revoked', 'Access revoked')], max_length=20)),
+                ('task_id', models.BigIntegerField(blank=True, null=True)),
+                ('project_id', models.BigIntegerField(blank=True, null=True)),
+                ('assigned_to_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_by_id', models.BigIntegerField(blank=True, null=True)),
+                ('previous_project_id', models.BigIntegerField(blank=True, null=True)),
+                ('previous_assigned_to_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'task_changes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
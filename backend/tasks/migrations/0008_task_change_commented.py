@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_change_log'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskchange',
+            name='action',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('status_changed', 'Status changed'), ('deleted', 'Deleted'), ('commented', 'Commented'), ('access_granted', 'Access granted'), ('access_revoked', 'Access revoked')], max_length=20),
+        ),
+    ]
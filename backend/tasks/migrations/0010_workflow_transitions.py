@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_attachment_uploads'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('review', 'Under Review'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=15)),
+                ('to_status', models.CharField(choices=[('todo', 'To Do'), ('in_progress', 'In Progress'), ('review', 'Under Review'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=15)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_transitions', to='tasks.project')),
+            ],
+            options={
+                'db_table': 'workflow_transitions',
+                'ordering': ['project', 'from_status', 'to_status'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='workflowtransition',
+            constraint=models.UniqueConstraint(fields=('project', 'from_status', 'to_status'), name='unique_workflow_transition'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('due_date', models.DateTimeField()),
+                ('lead_minutes', models.PositiveIntegerField()),
+                ('user_id', models.BigIntegerField()),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'sent_reminders',
+                'indexes': [models.Index(fields=['due_date'], name='sent_reminders_due_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sentreminder',
+            constraint=models.UniqueConstraint(fields=('task_id', 'due_date', 'lead_minutes'), name='unique_sent_reminder'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_sent_reminders'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['due_date', 'id'], name='archived_due_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_archived_due_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blocked_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependents', to='tasks.task')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_dependencies', to='tasks.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependencies', to='tasks.task')),
+            ],
+            options={
+                'db_table': 'task_dependencies',
+                'ordering': ['task', 'blocked_by'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.UniqueConstraint(fields=('task', 'blocked_by'), name='unique_task_dependency'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdependency',
+            constraint=models.CheckConstraint(check=models.Q(('task', models.F('blocked_by')), _negated=True), name='task_dependency_not_self'),
+        ),
+    ]
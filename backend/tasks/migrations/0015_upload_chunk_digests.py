@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_task_dependencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachmentupload',
+            name='chunk_digests',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:14
+
+from django.db import migrations, models
+
+
+def backfill_sequences(apps, schema_editor):
+    # Existing cursors are entry ids, so existing entries keep them as their sequence
+    TaskChange = apps.get_model('tasks', 'TaskChange')
+    TaskChangeHead = apps.get_model('tasks', 'TaskChangeHead')
+
+    TaskChange.objects.update(sequence=models.F('id'))
+    last = TaskChange.objects.aggregate(last=models.Max('id'))['last'] or 0
+    TaskChangeHead.objects.create(pk=1, sequence=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_upload_chunk_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChangeHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'task_change_head',
+            },
+        ),
+        migrations.AddField(
+            model_name='taskchange',
+            name='sequence',
+            field=models.BigIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='taskchange',
+            index=models.Index(condition=models.Q(('sequence__isnull', True)), fields=['id'], name='task_changes_unsequenced'),
+        ),
+        migrations.RunPython(backfill_sequences, migrations.RunPython.noop),
+    ]
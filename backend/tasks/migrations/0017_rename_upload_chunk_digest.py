@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_task_change_sequence'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='attachmentupload',
+            old_name='expected_sha256',
+            new_name='expected_chunk_digest',
+        ),
+        migrations.RenameField(
+            model_name='attachmentupload',
+            old_name='sha256',
+            new_name='chunk_digest',
+        ),
+    ]
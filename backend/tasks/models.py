@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 User = get_user_model()
@@ -24,6 +27,35 @@ class Project(models.Model):
         return self.name
 
 
+class ProjectAccess(models.Model):
+    """Materialized (user, project) access index kept in sync with created_by and members"""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='project_access')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='access_entries')
+
+    class Meta:
+        db_table = 'project_access'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='unique_project_access'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.project_id}"
+
+
+class TaskTag(models.Model):
+    """Normalized tag name; Task.tags stays the editable comma-separated source"""
+
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        db_table = 'task_tags'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class Task(models.Model):
     """Task model as per assessment requirements"""
     
@@ -64,10 +96,32 @@ class Task(models.Model):
     estimated_hours = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(1000)])
     actual_hours = models.PositiveIntegerField(null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(1000)])
     tags = models.CharField(max_length=500, blank=True, help_text="Comma-separated tags")
+    # Indexed copy of ``tags``, kept in sync by tasks.tags.sync_task_tags
+    tag_set = models.ManyToManyField(TaskTag, through='TaskTagLink', related_name='tasks', blank=True)
+
+    # Maintained by a database trigger on PostgreSQL (see tasks.search); unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         db_table = 'tasks'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination keys; (created_at, id) also serves ORDER BY -created_at
+            models.Index(fields=['created_at', 'id'], name='tasks_created_at_id_idx'),
+            models.Index(fields=['due_date', 'id'], name='tasks_due_date_id_idx'),
+            # Hot filters: my tasks by status, project boards by status
+            models.Index(fields=['assigned_to', 'status'], name='tasks_assignee_status_idx'),
+            models.Index(fields=['project', 'status'], name='tasks_project_status_idx'),
+            # Partial indexes (skipped on backends without support)
+            models.Index(
+                fields=['due_date'], name='tasks_overdue_due_date_idx',
+                condition=models.Q(status__in=['todo', 'in_progress']),
+            ),
+            models.Index(
+                fields=['assigned_to', 'due_date'], name='tasks_open_assignee_due_idx',
+                condition=models.Q(status__in=['todo', 'in_progress', 'review']),
+            ),
+        ]
         permissions = [
             ("can_view_all_tasks", "Can view all tasks"),
             ("can_manage_all_tasks", "Can manage all tasks"),
@@ -88,6 +142,73 @@ class Task(models.Model):
         return delta.days
 
 
+class WorkflowTransition(models.Model):
+    """
+    An allowed status change for a project's tasks. A project without any
+    transitions allows every change; once it has some, only those do.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='workflow_transitions')
+    from_status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    to_status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+
+    class Meta:
+        db_table = 'workflow_transitions'
+        ordering = ['project', 'from_status', 'to_status']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'from_status', 'to_status'], name='unique_workflow_transition'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id}: {self.from_status} -> {self.to_status}"
+
+
+class TaskDependency(models.Model):
+    """
+    ``task`` is blocked by ``blocked_by``. Both belong to ``project``
+    (kept on the row so a project's edges are one indexed read); create
+    rows through ``tasks.dependencies.add_dependency``, which rejects cycles.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='task_dependencies')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependencies')
+    blocked_by = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='dependents')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'task_dependencies'
+        ordering = ['task', 'blocked_by']
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'blocked_by'], name='unique_task_dependency'),
+            models.CheckConstraint(check=~models.Q(task=models.F('blocked_by')), name='task_dependency_not_self'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} blocked by {self.blocked_by_id}"
+
+
+class TaskTagLink(models.Model):
+    """Task to tag relation"""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(TaskTag, on_delete=models.CASCADE, related_name='task_links')
+
+    class Meta:
+        db_table = 'task_tag_links'
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'tag'], name='unique_task_tag'),
+        ]
+        indexes = [
+            # Tag filters and facets look up tasks by tag
+            models.Index(fields=['tag', 'task'], name='task_tag_links_tag_task_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} -> {self.tag_id}"
+
+
 class TaskComment(models.Model):
     """Comments on tasks for collaboration"""
     
@@ -117,4 +238,231 @@ class TaskAttachment(models.Model):
         db_table = 'task_attachments'
 
     def __str__(self):
-        return f"{self.filename} - {self.task.title}"
\ No newline at end of file
+        return f"{self.filename} - {self.task.title}"
+
+
+class AttachmentUpload(models.Model):
+    """A resumable chunked upload that becomes a TaskAttachment once complete"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='uploads')
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachment_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    # Bytes received so far; chunks are accepted only at this offset
+    offset = models.BigIntegerField(default=0)
+    # Hex SHA-256 of each chunk received, in order
+    chunk_digests = models.TextField(blank=True, default='')
+    # Optional client-supplied digest checked at completion, then the computed
+    # one. Both are the SHA-256 of the binary chunk digests in order, not of
+    # the file itself (see tasks.uploads)
+    expected_chunk_digest = models.CharField(max_length=64, blank=True)
+    chunk_digest = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attachment = models.OneToOneField(
+        TaskAttachment, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'attachment_uploads'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class TaskChange(models.Model):
+    """
+    Append-only task change log. ``sequence`` is the delta-sync cursor: it
+    is assigned in commit order once the writing transaction has committed
+    (see tasks.changes), so unlike ``id`` it never goes backwards.
+    """
+
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('status_changed', 'Status changed'),
+        ('deleted', 'Deleted'),
+        ('commented', 'Commented'),
+        ('access_granted', 'Access granted'),
+        ('access_revoked', 'Access revoked'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    # Plain ids rather than foreign keys so entries outlive deleted tasks and projects
+    task_id = models.BigIntegerField(null=True, blank=True)
+    project_id = models.BigIntegerField(null=True, blank=True)
+    assigned_to_id = models.BigIntegerField(null=True, blank=True)
+    created_by_id = models.BigIntegerField(null=True, blank=True)
+    # Where the task was before an update, so users who lost sight of it get a tombstone
+    previous_project_id = models.BigIntegerField(null=True, blank=True)
+    previous_assigned_to_id = models.BigIntegerField(null=True, blank=True)
+    # access_granted / access_revoked: the user whose access to project_id changed
+    user_id = models.BigIntegerField(null=True, blank=True)
+    # Null until the entry's transaction has committed and it has been numbered
+    sequence = models.BigIntegerField(null=True, blank=True, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'task_changes'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(sequence__isnull=True), name='task_changes_unsequenced'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.task_id or self.project_id}"
+
+
+class TaskChangeHead(models.Model):
+    """Single row holding the last sequence number handed out to the change log"""
+
+    sequence = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'task_change_head'
+
+    def __str__(self):
+        return f"Change log head at #{self.sequence}"
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed or cancelled task moved out of ``tasks`` by the
+    archive_tasks command. Keeps the original id, so links and delta-sync
+    tombstones still refer to the same task.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    due_date = models.DateTimeField()
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='archived_tasks')
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_assigned_tasks'
+    )
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_created_tasks')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    estimated_hours = models.PositiveIntegerField(null=True, blank=True)
+    actual_hours = models.PositiveIntegerField(null=True, blank=True)
+    tags = models.CharField(max_length=500, blank=True)
+    # Normalized tags wrapped in commas (",a,b,") so a tag is an exact substring match
+    tag_names = models.CharField(max_length=600, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'archived_tasks'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archived_created_at_id_idx'),
+            models.Index(fields=['project', 'status'], name='archived_project_status_idx'),
+            models.Index(fields=['assigned_to', 'status'], name='archived_assignee_status_idx'),
+            models.Index(fields=['due_date', 'id'], name='archived_due_date_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+    @property
+    def is_overdue(self):
+        from django.utils import timezone
+        return self.due_date < timezone.now() and self.status != 'completed'
+
+    @property
+    def days_until_due(self):
+        from django.utils import timezone
+        delta = self.due_date - timezone.now()
+        return delta.days
+
+
+class ArchivedTaskComment(models.Model):
+    """A comment of an archived task, under its original id"""
+
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='comments')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    comment = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'archived_task_comments'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Comment by {self.user_id} on archived task {self.task_id}"
+
+
+class ArchivedTaskAttachment(models.Model):
+    """Attachment metadata of an archived task; the file stays where it was"""
+
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='attachments')
+    file = models.FileField(upload_to='task_attachments/')
+    filename = models.CharField(max_length=255)
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    uploaded_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'archived_task_attachments'
+
+    def __str__(self):
+        return f"{self.filename} (archived task {self.task_id})"
+
+
+class TaskArchiveRollup(models.Model):
+    """
+    Archived task counts per (project, assignee, creator, status, priority),
+    maintained by the archive command so dashboards can add archived
+    totals without scanning ``archived_tasks``. The key fields match Task's,
+    so the same visibility filter applies.
+    """
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='archive_rollups')
+    assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    status = models.CharField(max_length=15, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=10, choices=Task.PRIORITY_CHOICES)
+    task_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'task_archive_rollups'
+
+    def __str__(self):
+        return f"{self.project_id}/{self.status}/{self.priority}: {self.task_count}"
+
+
+class SentReminder(models.Model):
+    """
+    A due-date reminder already delivered by the run_scheduler worker, so a
+    restart neither repeats nor skips reminders. A new due date is a new key.
+    """
+
+    task_id = models.BigIntegerField()
+    due_date = models.DateTimeField()
+    lead_minutes = models.PositiveIntegerField()
+    user_id = models.BigIntegerField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sent_reminders'
+        constraints = [
+            models.UniqueConstraint(fields=['task_id', 'due_date', 'lead_minutes'], name='unique_sent_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['due_date'], name='sent_reminders_due_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} {self.lead_minutes}m before {self.due_date}"
@@ -0,0 +1,136 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over (created_at, id) or (due_date, id).
+
+    Opt in with ``?pagination=cursor``; follow the ``next`` link for further
+    pages. Unlike page-number pagination there is no COUNT(*) and no OFFSET,
+    so every page costs the same regardless of depth.
+    """
+
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering_fields = ['created_at', 'due_date']
+    default_ordering = '-created_at'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (request.query_params.get(cls.mode_query_param) == cls.mode or
+                cls.cursor_query_param in request.query_params)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, view)
+        field = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            value, pk = position
+            op = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{field}__{op}': value}) |
+                Q(**{field: value, f'id__{op}': pk})
+            )
+
+        queryset = queryset.order_by(self.ordering, '-id' if descending else 'id')
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 20
+        if self.page_size_query_param in request.query_params:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except ValueError:
+                raise ValidationError({self.page_size_query_param: 'Must be an integer.'})
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request, view):
+        ordering = request.query_params.get('ordering')
+        if not ordering:
+            if view is not None and hasattr(view, 'get_keyset_ordering'):
+                return view.get_keyset_ordering()
+            return self.default_ordering
+        if ordering.lstrip('-') not in self.ordering_fields:
+            raise ValidationError({
+                'ordering': f"Cursor pagination supports ordering by {', '.join(self.ordering_fields)} only."
+            })
+        return ordering
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            value = parse_datetime(payload['v'])
+            pk = int(payload['id'])
+            if value is None or payload['o'] != self.ordering:
+                raise ValueError
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        return value, pk
+
+    def encode_cursor(self, obj):
+        payload = {
+            'v': getattr(obj, self.ordering.lstrip('-')).isoformat(),
+            'id': obj.pk,
+            'o': self.ordering,
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.mode_query_param:
+            url = replace_query_param(url, self.mode_query_param, self.mode)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+
+class CommentKeysetPagination(TaskKeysetPagination):
+    """
+    Keyset pagination for one task's comments: newest first, or oldest
+    first with ``?ordering=created_at``. Always on, so no opt-in parameter.
+    """
+
+    mode_query_param = None
+    ordering_fields = ['created_at']
+    default_ordering = '-created_at'
+
+    def get_ordering(self, request, view):
+        return super().get_ordering(request, None)
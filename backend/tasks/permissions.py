@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .access import can_view_task
+
 
 class IsAdminOrModeratorForProject(permissions.BasePermission):
     """
@@ -30,6 +32,7 @@ class TaskPermission(permissions.BasePermission):
     """
     Custom permission for tasks:
     - All authenticated users can create tasks
+    - Users can read tasks they can see (a cached project-membership lookup)
     - Admins can do anything
     - Users can update/delete their own created tasks or assigned tasks
     - Users can update status of tasks assigned to them
@@ -44,21 +47,19 @@ class TaskPermission(permissions.BasePermission):
         return request.user.is_authenticated
 
     def has_object_permission(self, request, view, obj):
-        # Read permissions for any authenticated user
         if request.method in permissions.SAFE_METHODS:
-            return True
+            return can_view_task(request.user, obj)
         
-        # Admin can do anything
-        if request.user.role == 'admin':
+        # PATCH (status updates), PUT and DELETE share the same rule
+        return self.can_modify(request.user, obj)
+
+    @staticmethod
+    def can_modify(user, task):
+        """
+        Admins can do anything; other users can update/delete tasks they
+        created or are assigned to. Compares ids so that checking a whole
+        batch of tasks needs no extra queries.
+        """
+        if user.role == 'admin':
             return True
-            
-        # For PATCH (partial update) - used for status updates
-        if request.method == 'PATCH':
-            # Users can update tasks they created or are assigned to
-            return (obj.created_by == request.user or 
-                    obj.assigned_to == request.user)
-        
-        # For PUT and DELETE
-        # Users can update/delete tasks they created or are assigned to
-        return (obj.created_by == request.user or 
-                obj.assigned_to == request.user)
+        return task.created_by_id == user.id or task.assigned_to_id == user.id
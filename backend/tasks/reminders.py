@@ -0,0 +1,219 @@
+"""
+Due-date reminders for the ``run_scheduler`` worker.
+
+The scheduler keeps a heap of (send time, task, lead) entries instead of
+scanning every task each tick. Tasks are loaded in slices of the indexed
+``due_date`` column as the look-ahead window advances, and tasks changed
+since the last tick are re-read from the change log cursor. Heap entries
+are never removed in place: an entry whose task has since moved, closed
+or been deleted no longer matches ``self.tasks`` and is dropped when it
+is popped.
+
+Each tick delivers the due reminders grouped per recipient (the assignee,
+or the creator of an unassigned task) through the backend named by
+``TASK_REMINDER_BACKEND``, and records them in ``SentReminder``.
+"""
+import heapq
+import json
+import sys
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .changes import latest_sequence, sequenced_changes
+from .models import SentReminder, Task
+
+User = get_user_model()
+
+OPEN_STATUSES = ('todo', 'in_progress', 'review')
+CHANGE_BATCH_SIZE = 1000
+# Sent-reminder rows are kept this long after the due date, then pruned
+SENT_RETENTION = timedelta(days=1)
+
+Reminder = namedtuple('Reminder', ['task_id', 'title', 'project_id', 'due_date', 'lead_minutes'])
+# What a heap entry was computed from; the entry is stale once this changes
+TaskState = namedtuple('TaskState', ['due_date', 'title', 'project_id', 'recipient_id'])
+
+
+class ConsoleBackend:
+    """Writes one block per recipient to stdout"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def format(self, user, reminders):
+        lines = [f'Reminders for {user.username} <{user.email}>:']
+        for reminder in reminders:
+            lines.append(f'  - #{reminder.task_id} {reminder.title} is due {reminder.due_date:%Y-%m-%d %H:%M %Z}')
+        return '\n'.join(lines) + '\n'
+
+    def send(self, user, reminders):
+        self.stream.write(self.format(user, reminders))
+        self.stream.flush()
+
+
+class FileBackend:
+    """Appends one JSON line per recipient to TASK_REMINDER_FILE_PATH"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.TASK_REMINDER_FILE_PATH
+
+    def send(self, user, reminders):
+        record = {
+            'user_id': user.pk,
+            'email': user.email,
+            'sent_at': timezone.now().isoformat(),
+            'reminders': [
+                {**reminder._asdict(), 'due_date': reminder.due_date.isoformat()} for reminder in reminders
+            ],
+        }
+        with open(self.path, 'a', encoding='utf-8') as output:
+            output.write(json.dumps(record) + '\n')
+
+
+def get_backend(path=None):
+    return import_string(path or settings.TASK_REMINDER_BACKEND)()
+
+
+class ReminderScheduler:
+    def __init__(self, backend, lead_minutes=None, window=None):
+        self.backend = backend
+        self.lead_minutes = sorted(set(lead_minutes or settings.TASK_REMINDER_LEAD_MINUTES), reverse=True)
+        # The window must reach the earliest send time of anything due inside it
+        self.window = max(
+            window or timedelta(hours=settings.TASK_REMINDER_WINDOW_HOURS),
+            timedelta(minutes=self.lead_minutes[0]),
+        )
+        self.heap = []
+        self.tasks = {}
+        self.loaded_until = None
+        self.cursor = None
+
+    def start(self, now=None):
+        now = now or timezone.now()
+        # Take the cursor first so changes made during the initial load are replayed
+        self.cursor = latest_sequence()
+        self.loaded_until = now
+        self.extend_window(now)
+
+    def state(self, task):
+        return TaskState(task.due_date, task.title, task.project_id, task.assigned_to_id or task.created_by_id)
+
+    def track(self, task, now):
+        """
+        Remember the task and schedule its reminders. When every lead has
+        already passed, one immediate reminder is scheduled instead, so a
+        task that comes into view late (or during downtime) still gets one.
+        """
+        state = self.state(task)
+        previous = self.tasks.get(task.pk)
+        self.tasks[task.pk] = state
+        if previous is not None and previous.due_date == state.due_date:
+            # Existing heap entries still match; they pick up the new title or recipient
+            return
+        upcoming = [lead for lead in self.lead_minutes if task.due_date - timedelta(minutes=lead) > now]
+        for lead in upcoming or self.lead_minutes[-1:]:
+            heapq.heappush(self.heap, (task.due_date - timedelta(minutes=lead), task.pk, lead, task.due_date))
+
+    def open_tasks(self):
+        return Task.objects.filter(status__in=OPEN_STATUSES).only(
+            'id', 'title', 'due_date', 'project_id', 'assigned_to_id', 'created_by_id'
+        )
+
+    def extend_window(self, now):
+        """Load the next slice of due dates, (loaded_until, now + window]"""
+        until = now + self.window
+        if until <= self.loaded_until:
+            return
+        for task in self.open_tasks().filter(
+            due_date__gt=max(self.loaded_until, now), due_date__lte=until
+        ).order_by('due_date', 'id').iterator():
+            self.track(task, now)
+        self.loaded_until = until
+
+    def changed_task_ids(self):
+        entries = list(
+            sequenced_changes().filter(sequence__gt=self.cursor, task_id__isnull=False)
+            .order_by('sequence').values_list('sequence', 'task_id')[:CHANGE_BATCH_SIZE]
+        )
+        if entries:
+            self.cursor = entries[-1][0]
+        return {task_id for _, task_id in entries}, len(entries) == CHANGE_BATCH_SIZE
+
+    def refresh(self, now):
+        """Re-read the tasks changed since the last tick"""
+        more = True
+        while more:
+            changed, more = self.changed_task_ids()
+            if not changed:
+                break
+            for task in self.open_tasks().filter(pk__in=changed, due_date__gt=now, due_date__lte=self.loaded_until):
+                self.track(task, now)
+                changed.discard(task.pk)
+            # Deleted, closed or moved out of the window
+            for task_id in changed:
+                self.tasks.pop(task_id, None)
+
+    def due_reminders(self, now):
+        """Pop every entry whose send time has come and that still matches its task"""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, task_id, lead, due_date = heapq.heappop(self.heap)
+            state = self.tasks.get(task_id)
+            if state is None or state.due_date != due_date:
+                continue
+            due.append((state, Reminder(task_id, state.title, state.project_id, due_date, lead)))
+        # The shortest lead is always a task's last reminder
+        for state, reminder in due:
+            if reminder.lead_minutes == self.lead_minutes[-1]:
+                self.tasks.pop(reminder.task_id, None)
+        return due
+
+    def deliver(self, due):
+        """Send each recipient one batch, skipping reminders already in the sent log"""
+        if not due:
+            return 0
+        sent = set(
+            SentReminder.objects.filter(
+                task_id__in={reminder.task_id for _, reminder in due}
+            ).values_list('task_id', 'due_date', 'lead_minutes')
+        )
+        by_user = defaultdict(list)
+        for state, reminder in due:
+            if (reminder.task_id, reminder.due_date, reminder.lead_minutes) not in sent:
+                by_user[state.recipient_id].append(reminder)
+
+        recipients = User.objects.filter(pk__in=list(by_user), is_active=True).exclude(
+            profile__receives_notifications=False
+        )
+        delivered = []
+        for user in recipients:
+            reminders = sorted(by_user[user.pk], key=lambda item: (item.due_date, item.task_id))
+            self.backend.send(user, reminders)
+            delivered.extend(
+                SentReminder(task_id=item.task_id, due_date=item.due_date, lead_minutes=item.lead_minutes,
+                             user_id=user.pk)
+                for item in reminders
+            )
+        SentReminder.objects.bulk_create(delivered, ignore_conflicts=True)
+        return len(delivered)
+
+    def tick(self, now=None):
+        """One scheduler step; returns how many reminders were delivered"""
+        now = now or timezone.now()
+        self.refresh(now)
+        previous = self.loaded_until
+        self.extend_window(now)
+        if self.loaded_until.date() != previous.date():
+            SentReminder.objects.filter(due_date__lt=now - SENT_RETENTION).delete()
+        return self.deliver(self.due_reminders(now))
+
+    def seconds_until_next(self, now, interval):
+        """Sleep until the next reminder is due, but wake at least every ``interval`` seconds"""
+        if not self.heap:
+            return interval
+        return max(0.0, min(interval, (self.heap[0][0] - now).total_seconds()))
@@ -0,0 +1,217 @@
+"""
+Full-text search for tasks.
+
+PostgreSQL keeps ``Task.search_vector`` up to date with a trigger and
+searches it through a GIN index. SQLite (local development) uses an FTS5
+external-content table kept in sync with triggers. Both rank results by
+relevance and return a highlighted snippet. Other databases fall back to
+DRF's ``SearchFilter``.
+
+The database marks matches in the snippet with private-use characters;
+``snippet_html`` escapes the task text and only then turns the markers into
+``<mark>`` tags, so a title or description can never inject markup.
+"""
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, FloatField, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from rest_framework import filters
+
+SEARCH_CONFIG = 'english'
+MATCH_START = '\ue000'
+MATCH_STOP = '\ue001'
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+POSTGRES_INSTALL_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.tags, '')), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON tasks
+    """,
+    """
+    CREATE TRIGGER tasks_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, tags ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update()
+    """,
+    # Touch every row so the trigger fills search_vector for existing tasks
+    """
+    UPDATE tasks SET title = title
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS tasks_search_vector_gin ON tasks USING gin (search_vector)
+    """,
+]
+
+POSTGRES_UNINSTALL_SQL = [
+    "DROP INDEX IF EXISTS tasks_search_vector_gin",
+    "DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON tasks",
+    "DROP FUNCTION IF EXISTS tasks_search_vector_update()",
+]
+
+SQLITE_TABLE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, tags, description,
+        content='tasks', content_rowid='id', tokenize='porter unicode61'
+    )
+"""
+
+# Re-created after migrations because SQLite drops triggers whenever Django
+# rebuilds the tasks table during an ALTER
+SQLITE_TRIGGER_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, tags, description ON tasks BEGIN
+        INSERT INTO tasks_fts(tasks_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+        INSERT INTO tasks_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+]
+
+SQLITE_UNINSTALL_SQL = [
+    "DROP TRIGGER IF EXISTS tasks_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_fts_update",
+    "DROP TABLE IF EXISTS tasks_fts",
+]
+
+
+def install_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for sql in POSTGRES_INSTALL_SQL:
+            schema_editor.execute(sql)
+    elif vendor == 'sqlite':
+        schema_editor.execute(SQLITE_TABLE_SQL)
+        for sql in SQLITE_TRIGGER_SQL:
+            schema_editor.execute(sql)
+        schema_editor.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def uninstall_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_UNINSTALL_SQL
+    elif vendor == 'sqlite':
+        statements = SQLITE_UNINSTALL_SQL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def ensure_sqlite_triggers(using='default', **kwargs):
+    """post_migrate hook restoring the FTS triggers after a table rebuild"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+        if cursor.fetchone() is None:
+            return
+        for sql in SQLITE_TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+def sqlite_match_expression(terms):
+    """Quote every word so user input cannot inject FTS5 query syntax"""
+    words = [word.replace('"', '""') for word in terms.split()]
+    return ' '.join(f'"{word}"*' for word in words if word)
+
+
+def snippet_html(snippet):
+    """Escape a snippet, then turn its match markers into <mark> tags"""
+    return escape(snippet or '').replace(MATCH_START, HIGHLIGHT_START).replace(MATCH_STOP, HIGHLIGHT_STOP)
+
+
+def search_tasks(queryset, terms):
+    """
+    Filter a Task queryset to matches for ``terms`` and annotate
+    ``search_rank`` (higher is better) and ``search_snippet`` (raw text with
+    match markers; render it with ``snippet_html``).
+    Returns None when the database has no full-text backend.
+    """
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        query = SearchQuery(terms, config=SEARCH_CONFIG, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_snippet=SearchHeadline(
+                'description', query, config=SEARCH_CONFIG,
+                start_sel=MATCH_START, stop_sel=MATCH_STOP,
+                max_words=35, min_words=15,
+            ),
+        )
+
+    if vendor == 'sqlite':
+        match = sqlite_match_expression(terms)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        # bm25() weights follow the column order: title, tags, description
+        return queryset.filter(
+            pk__in=RawSQL('SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH %s', [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f'SELECT -bm25(tasks_fts, 10.0, 5.0, 1.0) FROM tasks_fts '
+                f'WHERE tasks_fts MATCH %s AND tasks_fts.rowid = "{table}"."id"',
+                [match], output_field=FloatField(),
+            ),
+            search_snippet=RawSQL(
+                f"SELECT snippet(tasks_fts, -1, %s, %s, '…', 24) FROM tasks_fts "
+                f'WHERE tasks_fts MATCH %s AND tasks_fts.rowid = "{table}"."id"',
+                [MATCH_START, MATCH_STOP, match], output_field=TextField(),
+            ),
+        )
+
+    return None
+
+
+class TaskSearchFilter(filters.SearchFilter):
+    """
+    Ranked full-text search on ``?search=``.
+
+    Results are ordered by relevance unless the client passes ``?ordering=``.
+    Falls back to ``SearchFilter``'s ``search_fields`` lookup on databases
+    without a full-text backend.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = ' '.join(self.get_search_terms(request))
+        if not terms:
+            return queryset
+
+        results = search_tasks(queryset, terms)
+        if results is None:
+            return super().filter_queryset(request, queryset, view).annotate(
+                search_rank=Value(0.0, output_field=FloatField()),
+                search_snippet=Value('', output_field=TextField()),
+            )
+
+        if not request.query_params.get('ordering'):
+            results = results.order_by('-search_rank', '-created_at')
+        return results
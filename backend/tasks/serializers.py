@@ -1,10 +1,28 @@
+import os
+
 from rest_framework import serializers
-from .models import Project, Task, TaskComment, TaskAttachment
+from .models import (
+    Project, Task, TaskComment, TaskAttachment, AttachmentUpload, WorkflowTransition,
+    ArchivedTask, ArchivedTaskComment, ArchivedTaskAttachment,
+)
+from .access import accessible_project_ids, can_view_task
+from .membership import MAX_MEMBER_REFS
+from .search import snippet_html
+from .workflow import transition_error
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.urls import reverse
 
 User = get_user_model()
 
 
+class SearchSnippetField(serializers.CharField):
+    """Search snippet as HTML: escaped text with ``<mark>`` around the matches"""
+
+    def to_representation(self, value):
+        return snippet_html(value)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -22,6 +40,9 @@ class ProjectSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_by', 'created_at', 'updated_at']
     
     def get_task_count(self, obj):
+        # Querysets from the views annotate task_count to avoid a query per row
+        if hasattr(obj, 'task_count'):
+            return obj.task_count
         return obj.tasks.count()
     
     def create(self, validated_data):
@@ -29,29 +50,122 @@ class ProjectSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ProjectMembersSerializer(serializers.Serializer):
+    """Users for the bulk membership actions, by id and/or email"""
+
+    user_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    emails = serializers.ListField(child=serializers.EmailField(), required=False, default=list)
+
+    def validate(self, attrs):
+        count = len(attrs['user_ids']) + len(attrs['emails'])
+        if count > MAX_MEMBER_REFS:
+            raise serializers.ValidationError(f'At most {MAX_MEMBER_REFS} users per request.')
+        if not count and not self.context.get('allow_empty'):
+            raise serializers.ValidationError('Provide user_ids and/or emails.')
+        return attrs
+
+
+class WorkflowTransitionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkflowTransition
+        fields = ['from_status', 'to_status']
+
+    def validate(self, attrs):
+        if attrs['from_status'] == attrs['to_status']:
+            raise serializers.ValidationError('A transition must change the status.')
+        return attrs
+
+
+class TaskDependencySerializer(serializers.Serializer):
+    """The blocker for the task dependency actions"""
+
+    blocked_by = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all())
+
+    def validate_blocked_by(self, value):
+        if not can_view_task(self.context['request'].user, value):
+            raise serializers.ValidationError("Task does not exist.")
+        return value
+
+
 class TaskCommentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    task = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all(), write_only=True)
     
     class Meta:
         model = TaskComment
-        fields = ['id', 'comment', 'user', 'created_at']
+        fields = ['id', 'task', 'comment', 'user', 'created_at']
         read_only_fields = ['user', 'created_at']
 
+    def validate_task(self, value):
+        if self.instance is not None and value.pk != self.instance.task_id:
+            raise serializers.ValidationError("Comments cannot be moved to another task.")
+        if not can_view_task(self.context['request'].user, value):
+            raise serializers.ValidationError("Task does not exist.")
+        return value
+
 
 class TaskAttachmentSerializer(serializers.ModelSerializer):
     uploaded_by = UserSerializer(read_only=True)
+    download_url = serializers.SerializerMethodField()
     
     class Meta:
         model = TaskAttachment
-        fields = ['id', 'filename', 'file', 'uploaded_by', 'uploaded_at']
+        fields = ['id', 'filename', 'file', 'download_url', 'uploaded_by', 'uploaded_at']
         read_only_fields = ['uploaded_by', 'uploaded_at']
 
+    def get_download_url(self, obj):
+        url = reverse('taskattachment-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """
+    Chunked upload session; ``expected_chunk_digest`` may be given at init
+    and is checked against ``chunk_digest`` at completion. Both are the
+    SHA-256 of the concatenated binary SHA-256 digests of the chunks, in
+    order, not the SHA-256 of the file.
+    """
+
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            'id', 'task', 'filename', 'size', 'expected_chunk_digest', 'offset', 'chunk_size', 'status',
+            'chunk_digest', 'attachment', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['offset', 'status', 'chunk_digest', 'attachment', 'created_at', 'updated_at']
+
+    def get_chunk_size(self, obj):
+        return settings.TASK_UPLOAD_MAX_CHUNK_SIZE
+
+    def validate_task(self, value):
+        if not can_view_task(self.context['request'].user, value):
+            raise serializers.ValidationError("Task does not exist.")
+        return value
+
+    def validate_filename(self, value):
+        # Keep only the final path component of client-supplied names
+        name = os.path.basename(value.replace('\\', '/')).strip()
+        if not name:
+            raise serializers.ValidationError("A file name is required.")
+        return name
+
+    def validate_size(self, value):
+        if value < 0:
+            raise serializers.ValidationError("Size cannot be negative.")
+        if value > settings.TASK_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f"Files may be at most {settings.TASK_UPLOAD_MAX_SIZE} bytes.")
+        return value
+
 
 class TaskSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
     project = ProjectSerializer(read_only=True)
     comments = TaskCommentSerializer(many=True, read_only=True)
+    comment_count = serializers.SerializerMethodField()
     attachments = TaskAttachmentSerializer(many=True, read_only=True)
     is_overdue = serializers.ReadOnlyField()
     days_until_due = serializers.ReadOnlyField()
@@ -66,24 +180,28 @@ class TaskSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'due_date', 'priority', 'status',
             'project', 'project_id', 'assigned_to', 'assigned_to_id', 'created_by',
             'created_at', 'updated_at', 'completed_at', 'estimated_hours', 
-            'actual_hours', 'tags', 'comments', 'attachments', 'is_overdue', 'days_until_due'
+            'actual_hours', 'tags', 'comments', 'comment_count', 'attachments', 'is_overdue', 'days_until_due'
         ]
         read_only_fields = ['created_by', 'created_at', 'updated_at']
+
+    def get_comment_count(self, obj):
+        if hasattr(obj, 'comment_count'):
+            return obj.comment_count
+        return obj.comments.count()
     
     def create(self, validated_data):
         validated_data['created_by'] = self.context['request'].user
         return super().create(validated_data)
     
     def validate_project_id(self, value):
-        try:
-            project = Project.objects.get(id=value)
-            # Check if user has access to this project
-            user = self.context['request'].user
-            if user.role not in ['admin'] and user not in project.members.all() and project.created_by != user:
-                raise serializers.ValidationError("You don't have access to this project.")
+        user = self.context['request'].user
+        if user.role != 'admin' and value in accessible_project_ids(user):
             return value
-        except Project.DoesNotExist:
+        if not Project.objects.filter(id=value).exists():
             raise serializers.ValidationError("Project does not exist.")
+        if user.role != 'admin':
+            raise serializers.ValidationError("You don't have access to this project.")
+        return value
     
     def validate_assigned_to_id(self, value):
         if value is not None:
@@ -95,6 +213,122 @@ class TaskSerializer(serializers.ModelSerializer):
         return value
 
 
+class UserBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name']
+
+
+class ProjectBriefSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Project
+        fields = ['id', 'name']
+
+
+class TaskListSerializer(serializers.ModelSerializer):
+    """
+    Compact task representation for list endpoints.
+
+    Related objects are reduced to ids and names and comment/attachment
+    counts come from SQL annotations. ``latest_comments`` holds the newest
+    comments (``?latest_comments=N``, 0 to omit), fetched for the whole page
+    in one windowed query. Pass ``?expand=project,comments,attachments``
+    to nest the full representations instead. Search results also carry
+    ``search_rank`` and a highlighted ``search_snippet``.
+    """
+
+    EXPANDABLE_FIELDS = {
+        'project': lambda: ProjectSerializer(read_only=True),
+        'comments': lambda: TaskCommentSerializer(many=True, read_only=True),
+        'attachments': lambda: TaskAttachmentSerializer(many=True, read_only=True),
+    }
+
+    created_by = UserBriefSerializer(read_only=True)
+    assigned_to = UserBriefSerializer(read_only=True)
+    project = ProjectBriefSerializer(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    attachment_count = serializers.IntegerField(read_only=True)
+    is_overdue = serializers.ReadOnlyField()
+    days_until_due = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Task
+        fields = [
+            'id', 'title', 'description', 'due_date', 'priority', 'status',
+            'project', 'assigned_to', 'created_by', 'created_at', 'updated_at',
+            'completed_at', 'estimated_hours', 'actual_hours', 'tags',
+            'comment_count', 'attachment_count', 'is_overdue', 'days_until_due'
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.context.get('latest_comments'):
+            self.fields['latest_comments'] = TaskCommentSerializer(many=True, read_only=True)
+        for name in self.context.get('expand', ()):
+            if name in self.EXPANDABLE_FIELDS:
+                self.fields[name] = self.EXPANDABLE_FIELDS[name]()
+        if self.context.get('search'):
+            self.fields['search_rank'] = serializers.FloatField(read_only=True)
+            self.fields['search_snippet'] = SearchSnippetField(read_only=True)
+
+
+class ArchivedTaskCommentSerializer(serializers.ModelSerializer):
+    user = UserBriefSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedTaskComment
+        fields = ['id', 'comment', 'user', 'created_at']
+        read_only_fields = fields
+
+
+class ArchivedTaskAttachmentSerializer(serializers.ModelSerializer):
+    uploaded_by = UserBriefSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedTaskAttachment
+        fields = ['id', 'filename', 'uploaded_by', 'uploaded_at']
+        read_only_fields = fields
+
+
+class ArchivedTaskListSerializer(serializers.ModelSerializer):
+    """Archived task in the shape of TaskListSerializer rows, flagged with ``is_archived``"""
+
+    created_by = UserBriefSerializer(read_only=True)
+    assigned_to = UserBriefSerializer(read_only=True)
+    project = ProjectBriefSerializer(read_only=True)
+    comment_count = serializers.IntegerField(read_only=True)
+    attachment_count = serializers.IntegerField(read_only=True)
+    is_overdue = serializers.ReadOnlyField()
+    days_until_due = serializers.ReadOnlyField()
+    is_archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedTask
+        fields = [
+            'id', 'title', 'description', 'due_date', 'priority', 'status',
+            'project', 'assigned_to', 'created_by', 'created_at', 'updated_at',
+            'completed_at', 'estimated_hours', 'actual_hours', 'tags',
+            'comment_count', 'attachment_count', 'is_overdue', 'days_until_due',
+            'is_archived', 'archived_at'
+        ]
+        read_only_fields = fields
+
+    def get_is_archived(self, obj):
+        return True
+
+
+class ArchivedTaskSerializer(ArchivedTaskListSerializer):
+    """Archived task with its comments and attachment metadata"""
+
+    comments = ArchivedTaskCommentSerializer(many=True, read_only=True)
+    attachments = ArchivedTaskAttachmentSerializer(many=True, read_only=True)
+
+    class Meta(ArchivedTaskListSerializer.Meta):
+        fields = ArchivedTaskListSerializer.Meta.fields + ['comments', 'attachments']
+        read_only_fields = fields
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     """Simplified serializer for task creation"""
     
@@ -112,4 +346,60 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Task
-        fields = ['title', 'description', 'due_date', 'priority', 'status', 'assigned_to', 'estimated_hours', 'actual_hours', 'tags']
\ No newline at end of file
+        fields = ['title', 'description', 'due_date', 'priority', 'status', 'assigned_to', 'estimated_hours', 'actual_hours', 'tags']
+
+    def validate_status(self, value):
+        if self.instance is not None:
+            error = transition_error(self.instance.project_id, self.instance.status, value)
+            if error:
+                raise serializers.ValidationError(error)
+        return value
+
+
+class TaskBulkSerializerMixin:
+    """
+    Resolves ``project`` and ``assigned_to`` ids from lookups preloaded by
+    the caller (``context['projects']`` / ``context['users']``) so that
+    validating a batch does not query once per row. Projects outside
+    ``context['accessible_project_ids']`` are rejected; leave it out (or
+    None) for admins.
+    """
+
+    def validate_project(self, value):
+        project = self.context['projects'].get(value)
+        if project is None:
+            raise serializers.ValidationError("Project does not exist.")
+        accessible = self.context.get('accessible_project_ids')
+        if accessible is not None and value not in accessible:
+            raise serializers.ValidationError("You don't have access to this project.")
+        return project
+
+    def validate_assigned_to(self, value):
+        if value is None:
+            return None
+        user = self.context['users'].get(value)
+        if user is None:
+            raise serializers.ValidationError("User does not exist.")
+        return user
+
+
+class TaskBulkCreateSerializer(TaskBulkSerializerMixin, serializers.ModelSerializer):
+    """Row serializer for bulk task creation"""
+
+    project = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = TaskCreateSerializer.Meta.fields
+
+
+class TaskBulkUpdateSerializer(TaskBulkSerializerMixin, serializers.ModelSerializer):
+    """Row serializer for bulk partial updates"""
+
+    id = serializers.IntegerField()
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+
+    class Meta:
+        model = Task
+        fields = ['id'] + TaskUpdateSerializer.Meta.fields
@@ -0,0 +1,171 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .access import project_user_ids, sync_project_access, task_user_ids
+from .cache import invalidate_directory, invalidate_memberships, invalidate_users, invalidate_workflows
+from .changes import record_access_changes, record_task_changes, task_state
+from .dependencies import detach_task, record_dependency_change, record_schedule_changes
+from .models import (
+    Project, ProjectAccess, Task, TaskAttachment, TaskComment, TaskDependency, WorkflowTransition,
+)
+from .tags import sync_task_tags
+from .workflow import Transition, queue_hooks
+from .workload import record_workload_changes
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Task)
+def remember_previous_task_users(sender, instance, **kwargs):
+    """Collect users who could see the task before this save"""
+    instance._previous_user_ids = set()
+    instance._previous_tags = None
+    instance._previous_state = None
+    if instance.pk:
+        previous = Task.objects.filter(pk=instance.pk).values(
+            'project_id', 'assigned_to_id', 'created_by_id', 'tags', 'status',
+            'priority', 'due_date', 'estimated_hours',
+        ).first()
+        if previous:
+            instance._previous_tags = previous.pop('tags')
+            previous_task = Task(**previous)
+            instance._previous_state = task_state(previous_task)
+            instance._previous_user_ids = task_user_ids([previous_task])
+
+
+@receiver(post_save, sender=Task)
+def invalidate_task_caches(sender, instance, **kwargs):
+    user_ids = task_user_ids([instance])
+    user_ids.update(getattr(instance, '_previous_user_ids', set()))
+    previous_state = getattr(instance, '_previous_state', None) or {}
+    invalidate_users(user_ids, {instance.project_id, previous_state.get('project_id')})
+
+
+@receiver(post_save, sender=Task)
+def sync_tags_on_save(sender, instance, created, **kwargs):
+    if created or instance.tags != getattr(instance, '_previous_tags', None):
+        sync_task_tags([instance])
+
+
+@receiver(post_save, sender=Task)
+def record_task_save(sender, instance, created, **kwargs):
+    previous_state = getattr(instance, '_previous_state', None)
+    if created:
+        record_task_changes([instance], 'created')
+    else:
+        record_task_changes([instance], previous_states={instance.pk: previous_state})
+        if previous_state:
+            queue_hooks([Transition(instance.pk, instance.project_id, previous_state['status'], instance.status)])
+            if previous_state['project_id'] != instance.project_id:
+                # Dependencies link tasks of one project
+                detach_task(instance.pk)
+    record_workload_changes([(previous_state, task_state(instance))])
+    record_schedule_changes([(instance.pk, previous_state, task_state(instance))])
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task_caches(sender, instance, **kwargs):
+    invalidate_users(task_user_ids([instance]), {instance.project_id})
+
+
+@receiver(post_delete, sender=Task)
+def record_task_delete(sender, instance, **kwargs):
+    record_task_changes([instance], 'deleted')
+    record_workload_changes([(task_state(instance), None)])
+    record_schedule_changes([(instance.pk, task_state(instance), None)])
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_project_owner(sender, instance, **kwargs):
+    instance._previous_owner_id = None
+    if instance.pk:
+        instance._previous_owner_id = Project.objects.filter(pk=instance.pk).values_list(
+            'created_by_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Project)
+def sync_project_owner_access(sender, instance, created, **kwargs):
+    previous_owner_id = getattr(instance, '_previous_owner_id', None)
+    if created or previous_owner_id != instance.created_by_id:
+        sync_project_access([instance.pk])
+    invalidate_users(project_user_ids([instance.pk]) | {previous_owner_id})
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_deleted_project_caches(sender, instance, **kwargs):
+    # Access rows cascade away with the project, so collect users first
+    user_ids = project_user_ids([instance.pk])
+    invalidate_users(user_ids)
+    invalidate_memberships(user_ids)
+    record_access_changes('access_revoked', [(user_id, instance.pk) for user_id in user_ids])
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def sync_membership_access(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # user.projects.<op>(...) — instance is the user, pk_set holds project ids
+        if action == 'pre_clear':
+            instance._cleared_project_ids = set(
+                ProjectAccess.objects.filter(user=instance).values_list('project_id', flat=True)
+            )
+        elif action in ('post_add', 'post_remove'):
+            sync_project_access(pk_set or [])
+            invalidate_users({instance.pk} | project_user_ids(pk_set or []))
+        elif action == 'post_clear':
+            sync_project_access(getattr(instance, '_cleared_project_ids', set()))
+            invalidate_users({instance.pk})
+        return
+
+    if action == 'pre_clear':
+        instance._cleared_user_ids = project_user_ids([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        sync_project_access([instance.pk])
+        invalidate_users(set(pk_set or []) | project_user_ids([instance.pk]))
+    elif action == 'post_clear':
+        sync_project_access([instance.pk])
+        invalidate_users(getattr(instance, '_cleared_user_ids', set()))
+
+
+@receiver(post_save, sender=WorkflowTransition)
+@receiver(post_delete, sender=WorkflowTransition)
+def invalidate_workflow_rules(sender, instance, **kwargs):
+    invalidate_workflows()
+
+
+@receiver(post_save, sender=TaskDependency)
+def record_dependency_save(sender, instance, created, **kwargs):
+    if created:
+        record_dependency_change(instance)
+
+
+@receiver(post_delete, sender=TaskDependency)
+def record_dependency_delete(sender, instance, **kwargs):
+    record_dependency_change(instance)
+
+
+@receiver(post_save, sender=TaskComment)
+@receiver(post_delete, sender=TaskComment)
+@receiver(post_save, sender=TaskAttachment)
+@receiver(post_delete, sender=TaskAttachment)
+def invalidate_task_child_caches(sender, instance, **kwargs):
+    # Task rows embed comment/attachment counts; the task may already be gone
+    # when its children are cascade-deleted
+    task = Task.objects.filter(pk=instance.task_id).only('project_id', 'assigned_to_id', 'created_by_id').first()
+    if task is not None:
+        invalidate_users(task_user_ids([task]))
+
+
+@receiver(post_save, sender=TaskComment)
+def record_task_comment(sender, instance, created, **kwargs):
+    if created:
+        record_task_changes([instance.task], 'commented')
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_directory(sender, instance, created, update_fields=None, **kwargs):
+    # New users are not embedded anywhere yet, and logins only touch last_login
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_directory()
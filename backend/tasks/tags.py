@@ -0,0 +1,67 @@
+"""
+Normalized task tags.
+
+``Task.tags`` remains the comma-separated field clients edit. Its parsed
+names are mirrored into ``TaskTag``/``TaskTagLink`` so tag filters and
+facet counts are indexed lookups instead of substring scans.
+"""
+from django.db import transaction
+
+from .models import TaskTag, TaskTagLink
+
+MAX_TAG_LENGTH = TaskTag._meta.get_field('name').max_length
+
+
+def parse_tags(value):
+    """Split a comma-separated tag string into unique, normalized names"""
+    names = []
+    for part in (value or '').split(','):
+        name = part.strip().lower()[:MAX_TAG_LENGTH]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_or_create_tags(names):
+    """Map tag names to TaskTag ids, creating missing tags in one insert"""
+    names = set(names)
+    if not names:
+        return {}
+    tag_ids = dict(TaskTag.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = names - tag_ids.keys()
+    if missing:
+        TaskTag.objects.bulk_create([TaskTag(name=name) for name in missing], ignore_conflicts=True)
+        tag_ids.update(TaskTag.objects.filter(name__in=missing).values_list('name', 'pk'))
+    return tag_ids
+
+
+def sync_task_tags(tasks):
+    """Bring the tag links of the given tasks in line with their ``tags`` strings"""
+    tasks = [task for task in tasks if task.pk]
+    if not tasks:
+        return
+
+    wanted_names = {task.pk: parse_tags(task.tags) for task in tasks}
+    with transaction.atomic():
+        tag_ids = get_or_create_tags(name for names in wanted_names.values() for name in names)
+        desired = {
+            (task_id, tag_ids[name])
+            for task_id, names in wanted_names.items()
+            for name in names
+        }
+        existing = {
+            (task_id, tag_id): pk
+            for pk, task_id, tag_id in TaskTagLink.objects.filter(
+                task_id__in=wanted_names
+            ).values_list('pk', 'task_id', 'tag_id')
+        }
+
+        missing = desired - existing.keys()
+        if missing:
+            TaskTagLink.objects.bulk_create(
+                [TaskTagLink(task_id=task_id, tag_id=tag_id) for task_id, tag_id in missing],
+                ignore_conflicts=True,
+            )
+        stale = [pk for pair, pk in existing.items() if pair not in desired]
+        if stale:
+            TaskTagLink.objects.filter(pk__in=stale).delete()
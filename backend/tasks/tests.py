@@ -0,0 +1,1329 @@
+import hashlib
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.asgi import application, django_application
+from core.wsgi import application as wsgi_application
+from . import bulk
+from .access import has_project_access, sync_project_access
+from .analytics import project_analytics
+from .archive import archive_batch
+from .bulk import tasks_changed
+from .changes import changes_since, record_task_changes, task_state
+from .reminders import ReminderScheduler
+from .dependencies import add_dependency, compute_schedule, get_schedule
+from .export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS
+from .models import (
+    AttachmentUpload, Project, ProjectAccess, Task, TaskAttachment, TaskChange, TaskComment, TaskDependency,
+    WorkflowTransition,
+)
+from .uploads import part_path
+from .workload import compute_workloads, day_start, project_workloads
+from .workflow import set_project_rules, transition_error
+
+User = get_user_model()
+
+PROCESS_LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def wsgi_peak_memory(path, user):
+    """Status and peak traced memory of a GET through the WSGI application, read chunk by chunk"""
+    environ = RequestFactory().get(path, HTTP_AUTHORIZATION=bearer(user)).environ
+    statuses = []
+    tracemalloc.start()
+    try:
+        body = wsgi_application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        for _ in body:
+            pass
+        body.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statuses[0], peak
+
+
+def make_user(username, **extra):
+    return User.objects.create_user(username=username, email=f'{username}@example.com', password='pw12345!', **extra)
+
+
+def make_task(project, user, **fields):
+    fields.setdefault('title', 'Task')
+    fields.setdefault('due_date', timezone.now() + timedelta(days=1))
+    return Task.objects.create(description='', project=project, created_by=user, **fields)
+
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class SharedCacheMixin:
+    """Runs each test against a file-based cache, which every process shares"""
+
+    def setUp(self):
+        super().setUp()
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        settings_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+applied_transitions = []
+
+
+def record_transitions(transitions):
+    applied_transitions.extend(transitions)
+
+
+def failing_hook(transitions):
+    raise RuntimeError('hook failed')
+
+
+def bearer(user):
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+async def asgi_get(path, app=application, headers=()):
+    """(status, body size, peak traced memory) of a GET through an ASGI application"""
+    status, size = None, 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status, size
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        else:
+            size += len(message.get('body', b''))
+
+    tracemalloc.start()
+    try:
+        await app({
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), *headers], 'client': ('127.0.0.1', 1),
+            'server': ('testserver', 80),
+        }, receive, send)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return status, size, peak
+
+
+class EventsServiceTests(SimpleTestCase):
+    """The ASGI service only serves the events stream"""
+
+    async def test_events_path_is_served(self):
+        # Reaches the view, which rejects the anonymous request
+        self.assertEqual((await asgi_get('/api/tasks/events/'))[0], 401)
+
+    async def test_streaming_paths_are_not_served(self):
+        for path in ('/api/tasks/tasks/export/', '/api/tasks/attachments/1/download/', '/api/auth/users/1/avatar/'):
+            self.assertEqual((await asgi_get(path))[0], 404)
+
+
+class ProcessLocalCacheTests(TestCase):
+    """
+    Without a shared cache, access and workflow checks read the database.
+    on_commit never runs in a TestCase, so the cache versions are not bumped,
+    as they would not be in another worker.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pw12345!')
+        cls.member = User.objects.create_user(username='member', email='member@example.com', password='pw12345!')
+        cls.project = Project.objects.create(name='Shared', created_by=cls.owner)
+        cls.project.members.add(cls.member)
+        sync_project_access([cls.project.pk])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_removed_member_loses_access(self):
+        self.assertTrue(has_project_access(self.member, self.project.pk))
+        self.project.members.remove(self.member)
+        sync_project_access([self.project.pk])
+        self.assertFalse(has_project_access(self.member, self.project.pk))
+        self.assertFalse(any(key for key in cache._cache if ':tasks:membership:' in key))
+
+    def test_new_rules_apply(self):
+        self.assertIsNone(transition_error(self.project.pk, 'todo', 'completed'))
+        WorkflowTransition.objects.create(project=self.project, from_status='todo', to_status='in_progress')
+        self.assertIsNotNone(transition_error(self.project.pk, 'todo', 'completed'))
+
+
+class ExportMemoryTests(TestCase):
+    """Exports stream under the WSGI server: peak memory does not grow with the row count"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='exporter', email='exporter@example.com', password='pw12345!')
+        cls.project = Project.objects.create(name='Export', created_by=cls.user)
+
+    def add_tasks(self, count):
+        due = timezone.now() + timedelta(days=1)
+        Task.objects.bulk_create([
+            Task(title=f'Task {index}', description='x' * 200, due_date=due, project=self.project,
+                 created_by=self.user, tags='alpha, beta')
+            for index in range(count)
+        ])
+
+    def test_peak_memory_is_flat(self):
+        paths = [f'/api/tasks/tasks/export/?export_format={name}' for name in EXPORT_FORMATS]
+        # Past two fetch chunks the buffers in use stop growing
+        self.add_tasks(2 * EXPORT_CHUNK_SIZE)
+        wsgi_peak_memory(paths[0], self.user)
+        small = {path: wsgi_peak_memory(path, self.user) for path in paths}
+        self.add_tasks(6 * EXPORT_CHUNK_SIZE)
+        for path in paths:
+            status, large = wsgi_peak_memory(path, self.user)
+            self.assertEqual(status, '200 OK')
+            self.assertLess(large, small[path][1] * 1.2, path)
+
+
+class DownloadMemoryTests(TestCase):
+    """Downloads are sent in blocks under both servers, never read into memory whole"""
+
+    FILE_SIZE = 16 * 1024 * 1024
+
+    @classmethod
+    def setUpClass(cls):
+        # Before super(), which runs setUpTestData
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, MEDIA_ACCEL_REDIRECT_PREFIX='')
+        cls.settings_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='downloader', email='downloader@example.com', password='pw12345!')
+        project = Project.objects.create(name='Files', created_by=cls.user)
+        task = Task.objects.create(
+            title='Files', description='', due_date=timezone.now(), project=project, created_by=cls.user
+        )
+        cls.attachment = TaskAttachment(task=task, filename='big.bin', uploaded_by=cls.user)
+        cls.attachment.file.save('big.bin', ContentFile(b'\0' * cls.FILE_SIZE))
+        cls.path = f'/api/tasks/attachments/{cls.attachment.pk}/download/'
+
+    def test_wsgi(self):
+        status, peak = wsgi_peak_memory(self.path, self.user)
+        self.assertEqual(status, '200 OK')
+        self.assertLess(peak, self.FILE_SIZE // 4)
+
+    async def test_asgi_handler(self):
+        headers = [(b'authorization', bearer(self.user).encode())]
+        status, size, peak = await asgi_get(self.path, django_application, headers)
+        self.assertEqual((status, size), (200, self.FILE_SIZE))
+        self.assertLess(peak, self.FILE_SIZE // 4)
+
+        headers.append((b'range', b'bytes=100-8388707'))
+        status, size, peak = await asgi_get(self.path, django_application, headers)
+        self.assertEqual((status, size), (206, 8 * 1024 * 1024))
+        self.assertLess(peak, self.FILE_SIZE // 8)
+
+    def test_media_requires_authentication(self):
+        for path in (f'/api/auth/users/{self.user.pk}/avatar/', '/api/posts/missing/image/'):
+            self.assertEqual(APIClient().get(path).status_code, 401)
+
+
+class ChunkedUploadTests(TestCase):
+    """Completion combines the chunk digests and moves the part file into storage"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(self.root, 'media'), TASK_UPLOAD_TEMP_DIR=os.path.join(self.root, 'parts')
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        user = User.objects.create_user(username='uploader', email='uploader@example.com', password='pw12345!')
+        project = Project.objects.create(name='Uploads', created_by=user)
+        self.task = Task.objects.create(
+            title='Uploads', description='', due_date=timezone.now(), project=project, created_by=user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def upload(self, chunks, chunk_digest):
+        size = sum(len(chunk) for chunk in chunks)
+        response = self.client.post('/api/tasks/uploads/', {
+            'task': self.task.pk, 'filename': 'notes.txt', 'size': size, 'expected_chunk_digest': chunk_digest,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        upload_id, start = response.data['id'], 0
+        for chunk in chunks:
+            end = start + len(chunk) - 1
+            response = self.client.put(
+                f'/api/tasks/uploads/{upload_id}/chunk/', chunk, content_type='application/octet-stream',
+                HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{size}',
+            )
+            self.assertEqual(response.status_code, 200, response.data)
+            start = end + 1
+        return AttachmentUpload.objects.get(pk=upload_id)
+
+    def test_complete(self):
+        chunks = [b'a' * 1000, b'b' * 500]
+        chunk_digest = hashlib.sha256(b''.join(hashlib.sha256(chunk).digest() for chunk in chunks)).hexdigest()
+        upload = self.upload(chunks, chunk_digest)
+        part_inode = os.stat(part_path(upload)).st_ino
+
+        response = self.client.post(f'/api/tasks/uploads/{upload.pk}/complete/')
+        self.assertEqual(response.status_code, 201, response.data)
+        attachment = TaskAttachment.objects.get(pk=response.data['id'])
+        self.assertEqual(os.stat(attachment.file.path).st_ino, part_inode)
+        self.assertFalse(os.path.exists(part_path(upload)))
+        with attachment.file.open('rb') as stored:
+            self.assertEqual(stored.read(), b''.join(chunks))
+        upload.refresh_from_db()
+        self.assertEqual(response.data['id'], upload.attachment_id)
+        self.assertEqual(upload.chunk_digest, chunk_digest)
+
+    def test_digest_mismatch(self):
+        upload = self.upload([b'a' * 1000], hashlib.sha256(b'a' * 1000).hexdigest())
+        response = self.client.post(f'/api/tasks/uploads/{upload.pk}/complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(os.path.exists(part_path(upload)))
+
+
+class ChangeSequenceTests(TransactionTestCase):
+    """A cursor never moves past an entry whose transaction commits later"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pw12345!', role='admin'
+        )
+        project = Project.objects.create(name='Changes', created_by=self.admin)
+        self.tasks = [
+            Task.objects.create(title=f'Task {index}', description='', due_date=timezone.now(),
+                                project=project, created_by=self.admin)
+            for index in range(2)
+        ]
+
+    def changed_task_ids(self, since):
+        entries, cursor, _ = changes_since(self.admin, since, 100)
+        return [entry.task_id for entry in entries], cursor
+
+    def test_late_commit_with_a_lower_id(self):
+        _, cursor = self.changed_task_ids(0)
+        late, early = self.tasks
+        last_id = TaskChange.objects.order_by('-id').values_list('id', flat=True).first()
+        # The late entry took its id first but commits second; neither is
+        # numbered yet, as when a process dies between commit and numbering
+        TaskChange.objects.create(pk=last_id + 2, action='updated', task_id=early.pk, project_id=early.project_id)
+        ids, cursor = self.changed_task_ids(cursor)
+        self.assertEqual(ids, [early.pk])
+
+        TaskChange.objects.create(pk=last_id + 1, action='updated', task_id=late.pk, project_id=late.project_id)
+        ids, _ = self.changed_task_ids(cursor)
+        self.assertEqual(ids, [late.pk])
+
+    @skipUnless(connection.vendor == 'postgresql', 'SQLite cannot run two write transactions at once')
+    def test_slow_transaction(self):
+        _, cursor = self.changed_task_ids(0)
+        slow, fast = self.tasks
+        inserted, release = threading.Event(), threading.Event()
+
+        def write_slowly():
+            try:
+                with transaction.atomic():
+                    record_task_changes([slow], 'updated')
+                    inserted.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        writer = threading.Thread(target=write_slowly)
+        writer.start()
+        try:
+            inserted.wait(10)
+            record_task_changes([fast], 'updated')
+            ids, cursor = self.changed_task_ids(cursor)
+            self.assertEqual(ids, [fast.pk])
+        finally:
+            release.set()
+            writer.join()
+        ids, _ = self.changed_task_ids(cursor)
+        self.assertEqual(ids, [slow.pk])
+
+
+class WorkloadCacheTests(SharedCacheMixin, TestCase):
+    """Task writes invalidate the assignee's cached workload instead of patching it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='lead', email='lead@example.com', password='pw12345!')
+        cls.member = User.objects.create_user(username='dev', email='dev@example.com', password='pw12345!')
+        cls.project = Project.objects.create(name='Workload', created_by=cls.owner)
+        cls.project.members.add(cls.member)
+        sync_project_access([cls.project.pk])
+
+    def create_task(self, **fields):
+        return Task.objects.create(
+            description='', due_date=timezone.now() + timedelta(days=3), project=self.project,
+            created_by=self.owner, assigned_to=self.member, estimated_hours=2, **fields
+        )
+
+    def test_writes_invalidate(self):
+        task = self.create_task(title='First')
+        self.assertFalse(project_workloads(self.project.pk)[1])
+        self.assertTrue(project_workloads(self.project.pk)[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task(title='Second', priority='urgent')
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'completed'
+            task.save()
+
+        workloads, hit = project_workloads(self.project.pk)
+        self.assertFalse(hit)
+        self.assertEqual(workloads, compute_workloads({self.owner.pk, self.member.pk}, day_start()))
+        self.assertEqual(workloads[self.member.pk][0], 1)
+
+    def test_not_cached_without_a_shared_cache(self):
+        self.create_task(title='First')
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            project_workloads(self.project.pk)
+            workloads, hit = project_workloads(self.project.pk)
+        self.assertFalse(hit)
+        self.assertEqual(workloads[self.member.pk][0], 1)
+
+
+class ScheduleCacheTests(SharedCacheMixin, TestCase):
+    """Cached schedules match a fresh computation whatever order refreshes run in"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='planner', email='planner@example.com', password='pw12345!')
+        cls.project = Project.objects.create(name='Schedule', created_by=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = [
+            Task.objects.create(title=f'Step {index}', description='', due_date=timezone.now(),
+                                project=self.project, created_by=self.user, estimated_hours=index + 1)
+            for index in range(3)
+        ]
+        add_dependency(self.tasks[1], self.tasks[0])
+        add_dependency(self.tasks[2], self.tasks[1])
+
+    def test_refreshes_out_of_order(self):
+        self.assertFalse(get_schedule(self.project.pk)[1])
+        first, second, third = self.tasks
+        with self.captureOnCommitCallbacks() as callbacks:
+            first.estimated_hours = 10
+            first.save()
+            first.estimated_hours = 20
+            first.save()
+            third.delete()
+            fourth = Task.objects.create(title='Step 4', description='', due_date=timezone.now(),
+                                         project=self.project, created_by=self.user, estimated_hours=5)
+            add_dependency(second, fourth)
+        for callback in reversed(callbacks):
+            callback()
+
+        schedule, hit = get_schedule(self.project.pk)
+        self.assertTrue(hit)
+        fresh = compute_schedule(self.project.pk)
+        for name in ('weights', 'finish'):
+            self.assertEqual(schedule[name], fresh[name])
+        edges = {(before, after) for after, befores in schedule['predecessors'].items() for before in befores}
+        self.assertEqual(edges, {(first.pk, second.pk), (fourth.pk, second.pk)})
+        self.assertEqual(schedule['finish'][second.pk], 22)
+
+    def test_not_cached_without_a_shared_cache(self):
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            get_schedule(self.project.pk)
+            schedule, hit = get_schedule(self.project.pk)
+        self.assertFalse(hit)
+        self.assertEqual(schedule['finish'][self.tasks[2].pk], 6)
+
+
+class SearchSnippetTests(TestCase):
+    """Snippets escape the task text before highlighting matches"""
+
+    def test_markup_in_title_is_escaped(self):
+        user = User.objects.create_user(username='searcher', email='searcher@example.com', password='pw12345!')
+        project = Project.objects.create(name='Search', created_by=user)
+        Task.objects.create(
+            title='<script>alert(1)</script> deploy', description='', due_date=timezone.now(),
+            project=project, created_by=user,
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/tasks/tasks/', {'search': 'deploy'})
+        self.assertEqual(response.status_code, 200)
+        snippet = response.data['results'][0]['search_snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertIn('<mark>deploy</mark>', snippet)
+
+
+@override_settings(TASK_LATEST_COMMENTS=2)
+class TaskCommentsTests(TestCase):
+    """Task detail embeds every comment; list rows only the latest few"""
+
+    def test_detail_and_list(self):
+        user = User.objects.create_user(username='commenter', email='commenter@example.com', password='pw12345!')
+        project = Project.objects.create(name='Comments', created_by=user)
+        task = Task.objects.create(
+            title='Discussed', description='', due_date=timezone.now(), project=project, created_by=user
+        )
+        TaskComment.objects.bulk_create([TaskComment(task=task, user=user, comment=f'#{index}') for index in range(5)])
+        client = APIClient()
+        client.force_authenticate(user)
+
+        detail = client.get(f'/api/tasks/tasks/{task.pk}/').data
+        self.assertEqual((len(detail['comments']), detail['comment_count']), (5, 5))
+        row = client.get('/api/tasks/tasks/').data['results'][0]
+        self.assertEqual((len(row['latest_comments']), row['comment_count']), (2, 5))
+
+
+class BulkTaskTests(TestCase):
+    """Bulk operations report per-row results and respect project access"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user('bulkowner')
+        cls.outsider = make_user('bulkoutsider')
+        cls.admin = make_user('bulkadmin', role='admin')
+        cls.project = Project.objects.create(name='Bulk', created_by=cls.owner)
+        sync_project_access([cls.project.pk])
+
+    def bulk_create(self, user, rows):
+        return api_client(user).post('/api/tasks/tasks/bulk/create/', {'tasks': rows}, format='json')
+
+    def row(self, **fields):
+        return {'title': 'Bulk', 'description': 'Created in bulk',
+                'due_date': (timezone.now() + timedelta(days=1)).isoformat(), 'project': self.project.pk, **fields}
+
+    def test_create_requires_project_access(self):
+        response = self.bulk_create(self.outsider, [self.row()])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][0]['errors']['project'], ["You don't have access to this project."])
+        self.assertFalse(Task.objects.exists())
+
+        self.assertEqual(self.bulk_create(self.owner, [self.row()]).status_code, 201)
+        self.assertEqual(self.bulk_create(self.admin, [self.row()]).status_code, 201)
+
+    def test_create_completed_sets_completed_at(self):
+        response = self.bulk_create(self.owner, [self.row(status='completed'), self.row()])
+        self.assertEqual(response.status_code, 201)
+        done, open_task = Task.objects.order_by('pk')
+        self.assertIsNotNone(done.completed_at)
+        self.assertIsNone(open_task.completed_at)
+
+    def test_moved_tasks_lose_their_dependencies(self):
+        first, second, third = (make_task(self.project, self.owner, title=f'Step {index}') for index in range(3))
+        add_dependency(second, first)
+        add_dependency(third, second)
+        other = Project.objects.create(name='Elsewhere', created_by=self.owner)
+
+        previous_states = {second.pk: task_state(second)}
+        second.project = other
+        with transaction.atomic():
+            Task.objects.bulk_update([second], ['project'])
+            tasks_changed([second], tags_changed=False, previous_states=previous_states)
+        self.assertFalse(TaskDependency.objects.exists())
+
+    def test_per_row_errors(self):
+        member = make_user('bulkmember')
+        self.project.members.add(member)
+        own, other = make_task(self.project, member), make_task(self.project, self.owner)
+        hidden = make_task(Project.objects.create(name='Hidden', created_by=self.outsider), self.outsider)
+
+        response = api_client(member).patch('/api/tasks/tasks/bulk/update/', {'tasks': [
+            {'id': own.pk, 'priority': 'high'},
+            {'id': own.pk, 'priority': 'low'},
+            {'id': other.pk, 'priority': 'high'},
+            {'id': hidden.pk, 'priority': 'high'},
+            {'id': own.pk, 'priority': 'extreme'},
+            {'priority': 'high'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (1, 5))
+        results = response.data['results']
+        self.assertEqual(results[0]['status'], 'updated')
+        self.assertEqual(results[1]['errors'], {'id': ['Duplicate id.']})
+        self.assertEqual(str(results[2]['errors']['detail']), 'You do not have permission to perform this action.')
+        self.assertEqual(str(results[3]['errors']['detail']), 'Not found.')
+        self.assertIn('priority', results[4]['errors'])
+        self.assertIn('id', results[5]['errors'])
+        self.assertEqual(
+            dict(Task.objects.values_list('pk', 'priority')),
+            {own.pk: 'high', other.pk: 'medium', hidden.pk: 'medium'},
+        )
+
+    def test_delete_only_permitted_tasks(self):
+        mine, theirs = make_task(self.project, self.owner), make_task(self.project, self.outsider)
+        response = api_client(self.owner).post(
+            '/api/tasks/tasks/bulk/delete/', {'ids': [mine.pk, theirs.pk, 'x']}, format='json'
+        )
+        self.assertEqual([item['status'] for item in response.data['results']], ['deleted', 'error', 'error'])
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)), [theirs.pk])
+
+    def test_all_rows_failing_is_a_bad_request(self):
+        response = api_client(self.owner).post('/api/tasks/tasks/bulk/status/', {'ids': [0], 'status': 'completed'},
+                                              format='json')
+        self.assertEqual((response.status_code, response.data['failed']), (400, 1))
+
+
+class ConditionalGetTests(SharedCacheMixin, TestCase):
+    """ETags follow the version stamps and change with every write"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('etags')
+        cls.project = Project.objects.create(name='Cached', created_by=cls.user)
+
+    def test_not_modified_until_a_write(self):
+        client = api_client(self.user)
+        response = client.get('/api/tasks/projects/')
+        etag = response['ETag']
+        self.assertEqual(client.get('/api/tasks/projects/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_task(self.project, self.user)
+        response = client.get('/api/tasks/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_no_validators_without_a_shared_cache(self):
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            response = api_client(self.user).get('/api/tasks/projects/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+
+    def test_time_window_is_read_per_request(self):
+        client = api_client(self.user)
+        with mock.patch('time.time', return_value=1000.0):
+            etag = client.get('/api/tasks/tasks/')['ETag']
+        with mock.patch('time.time', return_value=1500.0), override_settings(TASK_CONDITIONAL_GET_WINDOW=3600):
+            self.assertEqual(client.get('/api/tasks/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+            etag = client.get('/api/tasks/tasks/')['ETag']
+        with mock.patch('time.time', return_value=2000.0), override_settings(TASK_CONDITIONAL_GET_WINDOW=3600):
+            self.assertEqual(client.get('/api/tasks/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class DashboardStatsTests(SharedCacheMixin, TestCase):
+    """dashboard_stats counts in one query and is cached until the user's data changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('dashboard')
+        cls.project = Project.objects.create(name='Dashboard', created_by=cls.user)
+        make_task(cls.project, cls.user, status='completed', priority='high')
+        make_task(cls.project, cls.user, assigned_to=cls.user, priority='urgent',
+                  due_date=timezone.now() - timedelta(days=1))
+
+    def get(self, **params):
+        return api_client(self.user).get('/api/tasks/tasks/dashboard_stats/', params)
+
+    def test_counts(self):
+        stats = self.get().data
+        self.assertEqual(
+            [stats[name] for name in ('total_tasks', 'my_tasks', 'completed_tasks', 'overdue_tasks',
+                                      'high_priority', 'urgent_priority')],
+            [2, 1, 1, 1, 1, 1],
+        )
+        self.assertEqual(stats['status_distribution'], {'completed': 1, 'todo': 1})
+
+    def test_cached_until_a_write(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        self.assertEqual(self.get(fresh=1)['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_task(self.project, self.user)
+        response = self.get()
+        self.assertEqual((response['X-Cache'], response.data['total_tasks']), ('MISS', 3))
+
+    def test_not_cached_without_a_shared_cache(self):
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            self.get()
+            self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+
+class ProjectAnalyticsTests(SharedCacheMixin, TestCase):
+    """Delivery metrics over live tasks, and their per-project cache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('analyst')
+        cls.project = Project.objects.create(name='Delivery', created_by=cls.user)
+        cls.now = timezone.now().replace(microsecond=0)
+        day = timedelta(days=1)
+        for created, completed, estimated, actual in (
+            (3 * day, 2 * day, 4, 5), (10 * day, 8 * day, 2, 2), (1 * day, None, 3, None),
+        ):
+            task = make_task(cls.project, cls.user, estimated_hours=estimated, actual_hours=actual,
+                             status='completed' if completed else 'todo')
+            Task.objects.filter(pk=task.pk).update(
+                created_at=cls.now - created, completed_at=completed and cls.now - completed,
+            )
+
+    def test_metrics(self):
+        data = project_analytics(self.project.pk, self.now, weeks=2, days=1)
+        self.assertEqual(data['task_count'], 3)
+        self.assertEqual((data['cycle_time']['count'], data['cycle_time']['mean_hours']), (2, 36.0))
+        self.assertEqual([week['completed'] for week in data['weekly_throughput']], [1, 1])
+        self.assertEqual((data['burndown'][0]['remaining'], data['burndown'][0]['remaining_hours']), (1, 3.0))
+        accuracy = data['estimate_accuracy']
+        self.assertEqual(
+            (accuracy['count'], accuracy['total_estimated_hours'], accuracy['total_actual_hours'],
+             accuracy['underestimated'], accuracy['within_tolerance']),
+            (2, 6.0, 7.0, 1, 0.5),
+        )
+
+    def test_cached_until_a_write(self):
+        client = api_client(self.user)
+        path = f'/api/tasks/projects/{self.project.pk}/analytics/'
+        self.assertEqual(client.get(path)['X-Cache'], 'MISS')
+        self.assertEqual(client.get(path)['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            make_task(self.project, self.user)
+        response = client.get(path)
+        self.assertEqual((response['X-Cache'], response.data['task_count']), ('MISS', 4))
+
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            client.get(path)
+            self.assertEqual(client.get(path)['X-Cache'], 'MISS')
+
+
+class TaskCalendarTests(SharedCacheMixin, TestCase):
+    """Due-date calendar buckets, archived rows and the per-user cache"""
+
+    path = '/api/tasks/tasks/calendar/?start=2026-03-01&end=2026-03-07'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('planner')
+        cls.project = Project.objects.create(name='Calendar', created_by=cls.user)
+        day = timezone.make_aware(datetime(2026, 3, 2, 9))
+        cls.first = make_task(cls.project, cls.user, title='First', due_date=day)
+        cls.second = make_task(cls.project, cls.user, title='Second', due_date=day + timedelta(hours=3))
+        cls.later = make_task(cls.project, cls.user, title='Later', due_date=day + timedelta(days=2))
+        make_task(cls.project, cls.user, title='Outside', due_date=day + timedelta(days=10))
+        cls.done = make_task(cls.project, cls.user, title='Done', due_date=day, status='completed')
+        Task.objects.filter(pk=cls.done.pk).update(completed_at=day)
+        archive_batch([cls.done.pk], day + timedelta(days=1))
+
+    def test_groups_by_day(self):
+        data = api_client(self.user).get(self.path).data
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['counts'], {'2026-03-02': 2, '2026-03-04': 1})
+        self.assertEqual(
+            [row['id'] for row in data['days']['2026-03-02']], [self.first.pk, self.second.pk]
+        )
+
+    def test_include_archived(self):
+        data = api_client(self.user).get(self.path + '&include_archived=1').data
+        self.assertEqual(data['counts']['2026-03-02'], 3)
+        self.assertEqual(
+            [(row['id'], row['is_archived']) for row in data['days']['2026-03-02']],
+            [(self.first.pk, False), (self.done.pk, True), (self.second.pk, False)],
+        )
+
+    def test_invalid_ranges(self):
+        client = api_client(self.user)
+        for query in ('start=2026-03-07&end=2026-03-01', 'start=2026-01-01&end=2026-04-01', 'start=soon'):
+            self.assertEqual(client.get(f'/api/tasks/tasks/calendar/?{query}').status_code, 400)
+
+    def test_hidden_from_non_members(self):
+        data = api_client(make_user('outsider')).get(self.path).data
+        self.assertEqual(data['total'], 0)
+
+    def test_cached_until_a_write(self):
+        client = api_client(self.user)
+        self.assertEqual(client.get(self.path)['X-Cache'], 'MISS')
+        self.assertEqual(client.get(self.path)['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.get(pk=self.later.pk).delete()
+        response = client.get(self.path)
+        self.assertEqual((response['X-Cache'], response.data['total']), ('MISS', 2))
+
+        with override_settings(CACHES=PROCESS_LOCAL_CACHES):
+            client.get(self.path)
+            self.assertEqual(client.get(self.path)['X-Cache'], 'MISS')
+
+
+class ImportTasksTests(TestCase):
+    """import_tasks inserts valid rows and writes the rest to the rejects file"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('importer')
+        cls.project = Project.objects.create(name='Imported', created_by=cls.user)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.rejects = os.path.join(self.directory, 'rejects.ndjson')
+
+    def run_import(self, lines, *args):
+        path = os.path.join(self.directory, 'tasks.ndjson')
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write('\n'.join(lines) + '\n')
+        call_command('import_tasks', path, '--rejects', self.rejects, '--batch-size', '2', *args,
+                     stdout=io.StringIO())
+
+    def row(self, **fields):
+        return json.dumps({
+            'title': 'Imported task', 'description': 'From a file', 'due_date': '2026-05-01T09:00:00Z',
+            'project': 'Imported', 'created_by': 'importer', **fields,
+        })
+
+    def test_rejects_file(self):
+        self.run_import([
+            self.row(title='Valid'),
+            self.row(project='Missing'),
+            '{not json',
+            self.row(title='Done', status='completed', completed_at='2026-04-01T10:00:00Z'),
+        ])
+        self.assertEqual(
+            dict(Task.objects.values_list('title', 'status')), {'Valid': 'todo', 'Done': 'completed'}
+        )
+        self.assertEqual(Task.objects.get(title='Done').completed_at.isoformat(), '2026-04-01T10:00:00+00:00')
+        with open(self.rejects, encoding='utf-8') as rejects:
+            rejected = [json.loads(line) for line in rejects]
+        self.assertEqual([item['line'] for item in rejected], [2, 3])
+        self.assertIn('project', rejected[0]['errors'])
+        self.assertIn('row', rejected[1]['errors'])
+
+    def test_dry_run_inserts_nothing(self):
+        self.run_import([self.row()], '--dry-run')
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(os.path.exists(self.rejects))
+
+
+class ProjectAccessTests(TestCase):
+    """The access index follows owners and members, and can be rebuilt"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user('founder')
+        cls.member = make_user('joiner')
+        cls.project = Project.objects.create(name='Indexed', created_by=cls.owner)
+        cls.task = make_task(cls.project, cls.owner)
+
+    def access(self):
+        return set(ProjectAccess.objects.values_list('user_id', 'project_id'))
+
+    def test_membership_changes(self):
+        self.assertEqual(self.access(), {(self.owner.pk, self.project.pk)})
+        self.assertEqual(api_client(self.member).get(f'/api/tasks/tasks/{self.task.pk}/').status_code, 404)
+
+        self.project.members.add(self.member)
+        self.assertIn((self.member.pk, self.project.pk), self.access())
+        self.assertEqual(api_client(self.member).get(f'/api/tasks/tasks/{self.task.pk}/').status_code, 200)
+
+        self.member.projects.remove(self.project)
+        self.assertNotIn((self.member.pk, self.project.pk), self.access())
+        self.assertEqual(api_client(self.member).get(f'/api/tasks/tasks/{self.task.pk}/').status_code, 404)
+
+        self.member.projects.add(self.project)
+        self.project.members.clear()
+        self.assertEqual(self.access(), {(self.owner.pk, self.project.pk)})
+
+    def test_owner_change(self):
+        self.project.created_by = self.member
+        self.project.save()
+        self.assertEqual(self.access(), {(self.member.pk, self.project.pk)})
+
+    def test_backfill_and_rebuild(self):
+        self.project.members.add(self.member)
+        expected = self.access()
+
+        ProjectAccess.objects.all().delete()
+        migration = importlib.import_module('tasks.migrations.0002_project_access')
+        migration.backfill_project_access(apps, None)
+        self.assertEqual(self.access(), expected)
+
+        ProjectAccess.objects.filter(user=self.member).delete()
+        ProjectAccess.objects.create(user=make_user('stray'), project=self.project)
+        call_command('rebuild_project_access', stdout=io.StringIO())
+        self.assertEqual(self.access(), expected)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages neither skip nor repeat rows, even across ties and inserts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('pager')
+        cls.project = Project.objects.create(name='Pages', created_by=cls.user)
+        created_at = timezone.now() - timedelta(days=1)
+        cls.tasks = [make_task(cls.project, cls.user, title=f'Task {index}', assigned_to=cls.user)
+                     for index in range(5)]
+        # Every task shares one created_at, so only the id breaks the tie
+        Task.objects.update(created_at=created_at)
+
+    def walk(self, client, path):
+        ids, pages = [], 0
+        while path:
+            response = client.get(path)
+            self.assertEqual(response.status_code, 200, response.data)
+            ids += [item['id'] for item in response.data['results']]
+            path, pages = response.data['next'], pages + 1
+            if pages == 1:
+                make_task(self.project, self.user, title='Inserted meanwhile')
+        return ids, pages
+
+    def test_stable_across_ties_and_inserts(self):
+        ids, pages = self.walk(api_client(self.user), '/api/tasks/tasks/?pagination=cursor&page_size=2')
+        self.assertEqual(ids, sorted((task.pk for task in self.tasks), reverse=True))
+        self.assertEqual(pages, 3)
+
+    def test_ascending_due_dates(self):
+        ids, _ = self.walk(
+            api_client(self.user), '/api/tasks/tasks/my_tasks/?pagination=cursor&page_size=2&ordering=due_date'
+        )
+        self.assertEqual(ids, [task.pk for task in sorted(self.tasks, key=lambda task: (task.due_date, task.pk))])
+
+    def test_invalid_parameters(self):
+        client = api_client(self.user)
+        for query in ('cursor=bogus', 'pagination=cursor&ordering=title', 'pagination=cursor&page_size=many'):
+            self.assertEqual(client.get(f'/api/tasks/tasks/?{query}').status_code, 400)
+
+    def test_actions_stay_unpaginated_by_default(self):
+        response = api_client(self.user).get('/api/tasks/tasks/my_tasks/')
+        self.assertEqual(len(response.data), 5)
+
+
+class TaskListSerializerTests(TestCase):
+    """List rows are compact and cost the same number of queries at any size"""
+
+    path = '/api/tasks/tasks/?latest_comments=0'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('lister')
+        cls.project = Project.objects.create(name='Compact', created_by=cls.user)
+        cls.task = make_task(cls.project, cls.user, assigned_to=cls.user)
+        for text in ('First', 'Second'):
+            TaskComment.objects.create(task=cls.task, user=cls.user, comment=text)
+
+    def test_compact_rows(self):
+        row = api_client(self.user).get(self.path).data['results'][0]
+        self.assertEqual(row['project'], {'id': self.project.pk, 'name': 'Compact'})
+        self.assertEqual(row['assigned_to']['username'], 'lister')
+        self.assertEqual((row['comment_count'], row['attachment_count']), (2, 0))
+        self.assertNotIn('comments', row)
+
+    def test_expand(self):
+        row = api_client(self.user).get(self.path + '&expand=project,comments').data['results'][0]
+        self.assertEqual(row['project']['name'], 'Compact')
+        self.assertIn('task_count', row['project'])
+        self.assertEqual(sorted(comment['comment'] for comment in row['comments']), ['First', 'Second'])
+
+    def test_queries_do_not_grow_with_rows(self):
+        client = api_client(self.user)
+        path = '/api/tasks/tasks/?latest_comments=2&expand=comments'
+        client.get(path)
+        with CaptureQueriesContext(connection) as few:
+            client.get(path)
+        for index in range(5):
+            task = make_task(self.project, make_user(f'creator{index}'), assigned_to=self.user)
+            TaskComment.objects.create(task=task, user=self.user, comment='More')
+        with CaptureQueriesContext(connection) as many:
+            self.assertEqual(len(client.get(path).data['results']), 6)
+        self.assertEqual(len(many), len(few))
+
+
+class TaskTagTests(TestCase):
+    """Tag links follow the tags string and back the tag filters and facets"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('tagger')
+        cls.project = Project.objects.create(name='Tagged', created_by=cls.user)
+        cls.both = make_task(cls.project, cls.user, title='Both', tags='Backend, urgent')
+        cls.backend = make_task(cls.project, cls.user, title='Backend only', tags='backend,backend')
+        cls.untagged = make_task(cls.project, cls.user, title='Untagged')
+        hidden = Project.objects.create(name='Hidden', created_by=make_user('stranger'))
+        make_task(hidden, hidden.created_by, tags='backend')
+
+    def titles(self, query):
+        response = api_client(self.user).get(f'/api/tasks/tasks/?{query}')
+        return sorted(task['title'] for task in response.data['results'])
+
+    def test_links_follow_edits(self):
+        self.assertEqual(sorted(self.both.tag_links.values_list('tag__name', flat=True)), ['backend', 'urgent'])
+        self.both.tags = 'urgent, docs'
+        self.both.save()
+        self.assertEqual(sorted(self.both.tag_links.values_list('tag__name', flat=True)), ['docs', 'urgent'])
+
+    def test_filters(self):
+        self.assertEqual(self.titles('tag=backend'), ['Backend only', 'Both'])
+        self.assertEqual(self.titles('tag=backend&tag=urgent'), ['Both'])
+        self.assertEqual(self.titles('tag=urgent&tag=missing&tag_mode=any'), ['Both'])
+
+    def test_facets(self):
+        response = api_client(self.user).get('/api/tasks/tasks/tag_facets/')
+        self.assertEqual(response.data, [{'tag': 'backend', 'count': 2}, {'tag': 'urgent', 'count': 1}])
+        response = api_client(self.user).get('/api/tasks/tasks/tag_facets/?tag=urgent&limit=5')
+        self.assertEqual(response.data, [{'tag': 'backend', 'count': 1}, {'tag': 'urgent', 'count': 1}])
+
+
+class TaskIndexTests(TestCase):
+    """The hot-path indexes exist and the benchmark leaves no trace"""
+
+    def index_names(self):
+        with connection.cursor() as cursor:
+            return set(connection.introspection.get_constraints(cursor, Task._meta.db_table))
+
+    def test_indexes_exist(self):
+        self.assertLessEqual({index.name for index in Task._meta.indexes}, self.index_names())
+
+    @skipUnless(connection.vendor == 'sqlite', 'plan text is backend-specific')
+    def test_keyset_and_overdue_plans_use_indexes(self):
+        plan = Task.objects.order_by('due_date', 'id')[:20].explain()
+        self.assertIn('tasks_due_date_id_idx', plan)
+        overdue = Task.objects.filter(due_date__lt=timezone.now(), status__in=['todo', 'in_progress'])
+        # Either due-date index serves it; which one depends on table statistics
+        self.assertRegex(overdue.order_by('due_date').explain(), r'SEARCH tasks USING INDEX tasks_\w*due_date')
+
+    def test_benchmark_rolls_back(self):
+        before = self.index_names()
+        output = io.StringIO()
+        call_command('benchmark_task_queries', tasks=200, users=5, projects=3, repeat=1, no_plans=True, stdout=output)
+        self.assertIn('rolled back', output.getvalue())
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(self.index_names(), before)
+
+
+class DeltaSyncTests(TransactionTestCase):
+    """changes?since= returns upserts and tombstones, and 410 once pruned past the cursor"""
+
+    path = '/api/tasks/tasks/changes/'
+
+    def setUp(self):
+        self.owner = make_user('syncowner')
+        self.member = make_user('syncmember')
+        self.project = Project.objects.create(name='Synced', created_by=self.owner)
+        self.project.members.add(self.member)
+        self.kept, self.removed = make_task(self.project, self.owner), make_task(self.project, self.owner)
+        self.client = api_client(self.member)
+
+    def cursor(self):
+        return self.client.get(self.path).data['cursor']
+
+    def sync(self, since, **params):
+        return self.client.get(self.path, {'since': since, **params})
+
+    def test_upserts_and_tombstones(self):
+        cursor = self.cursor()
+        self.kept.title = 'Renamed'
+        self.kept.save()
+        removed_id = self.removed.pk
+        self.removed.delete()
+        created = make_task(self.project, self.owner)
+
+        data = self.sync(cursor).data
+        self.assertEqual([task['id'] for task in data['upserts']], [self.kept.pk, created.pk])
+        self.assertEqual(data['upserts'][0]['title'], 'Renamed')
+        self.assertEqual([(item['id'], item['reason']) for item in data['tombstones']], [(removed_id, 'deleted')])
+        self.assertEqual(self.sync(data['cursor']).data['upserts'], [])
+
+    def test_lost_access_sends_tombstones(self):
+        cursor = self.cursor()
+        self.project.members.remove(self.member)
+        data = self.sync(cursor).data
+        self.assertEqual(data['upserts'], [])
+        self.assertEqual(
+            sorted((item['id'], item['reason']) for item in data['tombstones']),
+            [(self.kept.pk, 'not_visible'), (self.removed.pk, 'not_visible')],
+        )
+
+    def test_limit(self):
+        cursor = self.cursor()
+        for task in (self.kept, self.removed):
+            task.save()
+        data = self.sync(cursor, limit=1).data
+        self.assertTrue(data['has_more'])
+        self.assertEqual([task['id'] for task in data['upserts']], [self.kept.pk])
+        data = self.sync(data['cursor'], limit=1).data
+        self.assertEqual([task['id'] for task in data['upserts']], [self.removed.pk])
+
+    def test_resync_after_pruning(self):
+        cursor = self.cursor()
+        for _ in range(2):
+            self.kept.save()
+        call_command('prune_task_changes', days=0, stdout=io.StringIO())
+        response = self.sync(cursor)
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.data['cursor'], self.cursor())
+        self.assertEqual(self.sync('soon').status_code, 400)
+
+
+class ProjectMembersTests(TestCase):
+    """Bulk add, remove and replace of project members by id or email"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user('teamlead', role='moderator')
+        cls.alice, cls.bob, cls.carol = (make_user(name) for name in ('alice', 'bob', 'carol'))
+        cls.project = Project.objects.create(name='Team', created_by=cls.owner)
+        cls.project.members.add(cls.alice)
+        cls.path = f'/api/tasks/projects/{cls.project.pk}/members/'
+
+    def members(self):
+        return set(self.project.members.values_list('username', flat=True))
+
+    def send(self, method, **data):
+        return getattr(api_client(self.owner), method)(self.path, data, format='json')
+
+    def test_add(self):
+        response = self.send(
+            'post', user_ids=[self.alice.pk, self.bob.pk], emails=['carol@example.com', 'x@example.com']
+        )
+        self.assertEqual(response.data['added'], sorted([self.bob.pk, self.carol.pk]))
+        self.assertEqual(response.data['already_members'], [self.alice.pk])
+        self.assertEqual(response.data['not_found'], ['x@example.com'])
+        self.assertEqual(self.members(), {'alice', 'bob', 'carol'})
+        self.assertTrue(has_project_access(self.carol, self.project.pk))
+
+    def test_remove(self):
+        response = self.send('delete', user_ids=[self.alice.pk, self.bob.pk])
+        self.assertEqual((response.data['removed'], response.data['not_members']), ([self.alice.pk], [self.bob.pk]))
+        self.assertEqual(self.members(), set())
+        self.assertFalse(ProjectAccess.objects.filter(user=self.alice, project=self.project).exists())
+
+    def test_replace(self):
+        response = self.send('put', user_ids=[self.bob.pk, self.carol.pk])
+        self.assertEqual(
+            (response.data['added'], response.data['removed']),
+            (sorted([self.bob.pk, self.carol.pk]), [self.alice.pk]),
+        )
+        self.assertEqual(self.members(), {'bob', 'carol'})
+        self.assertEqual(self.send('put').data['removed'], sorted([self.bob.pk, self.carol.pk]))
+
+    def test_replace_with_unknown_users_changes_nothing(self):
+        response = self.send('put', user_ids=[self.bob.pk, 0])
+        self.assertEqual((response.status_code, response.data['not_found']), (400, [0]))
+        self.assertEqual(self.members(), {'alice'})
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.send('post').status_code, 400)
+        response = api_client(self.alice).post(self.path, {'user_ids': [self.bob.pk]}, format='json')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.members(), {'alice'})
+
+
+@override_settings(TASK_WORKFLOW_HOOKS=['tasks.tests.failing_hook', 'tasks.tests.record_transitions'])
+class WorkflowTests(TestCase):
+    """Project rules gate every status write; hooks see only committed changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('flow')
+        cls.project = Project.objects.create(name='Flow', created_by=cls.user)
+        set_project_rules(cls.project, [('todo', 'in_progress'), ('in_progress', 'completed')])
+
+    def setUp(self):
+        applied_transitions.clear()
+        self.task = make_task(self.project, self.user)
+        self.client = api_client(self.user)
+
+    def assert_status(self, expected):
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, expected)
+
+    def test_patch(self):
+        path = f'/api/tasks/tasks/{self.task.pk}/'
+        response = self.client.patch(path, {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('allowed: in_progress', str(response.data['status']))
+        self.assert_status('todo')
+        self.assertEqual(self.client.patch(path, {'status': 'in_progress'}, format='json').status_code, 200)
+        self.assert_status('in_progress')
+
+    def test_change_status(self):
+        path = f'/api/tasks/tasks/{self.task.pk}/change_status/'
+        self.assertEqual(self.client.post(path, {'status': 'completed'}, format='json').status_code, 400)
+        self.assert_status('todo')
+        self.assertEqual(self.client.post(path, {'status': 'in_progress'}, format='json').status_code, 200)
+        self.assert_status('in_progress')
+
+    def test_bulk_status(self):
+        started = make_task(self.project, self.user, status='in_progress')
+        response = self.client.post(
+            '/api/tasks/tasks/bulk/status/', {'ids': [self.task.pk, started.pk], 'status': 'completed'}, format='json'
+        )
+        self.assertEqual([item['status'] for item in response.data['results']], ['error', 'updated'])
+        self.assertIn('status', response.data['results'][0]['errors'])
+        self.assert_status('todo')
+
+    def test_hooks_run_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(f'/api/tasks/tasks/{self.task.pk}/change_status/', {'status': 'in_progress'},
+                             format='json')
+            self.assertEqual(applied_transitions, [])
+        # The failing hook is logged and does not stop the next one
+        with self.assertLogs('tasks.workflow', 'ERROR'):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(applied_transitions, [(self.task.pk, self.project.pk, 'todo', 'in_progress')])
+
+    def test_no_hooks_for_rolled_back_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    bulk.update_status([self.task], 'in_progress')
+                    raise RuntimeError('abort')
+            except RuntimeError:
+                pass
+        self.assertEqual(applied_transitions, [])
+        self.assert_status('todo')
+
+
+class ArchiveTests(TestCase):
+    """Archived tasks leave the live table but stay reachable with include_archived"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user('archivist')
+        cls.project = Project.objects.create(name='History', created_by=cls.user)
+        long_ago = timezone.now() - timedelta(days=60)
+        cls.done = make_task(cls.project, cls.user, title='Old done', status='completed', tags='release')
+        TaskComment.objects.create(task=cls.done, user=cls.user, comment='Shipped')
+        cls.cancelled = make_task(cls.project, cls.user, title='Old cancelled', status='cancelled')
+        Task.objects.filter(pk=cls.done.pk).update(completed_at=long_ago)
+        Task.objects.filter(pk=cls.cancelled.pk).update(updated_at=long_ago)
+        cls.recent = make_task(cls.project, cls.user, title='Recent done', status='completed')
+        cls.open = make_task(cls.project, cls.user, title='Open')
+
+    def titles(self, query=''):
+        response = api_client(self.user).get(f'/api/tasks/tasks/?{query}')
+        return sorted((task['title'], task.get('is_archived')) for task in response.data['results'])
+
+    def archive(self):
+        output = io.StringIO()
+        call_command('archive_tasks', days=30, batch_size=1, stdout=output)
+        self.assertIn('Archived 2 tasks', output.getvalue())
+
+    def test_round_trip(self):
+        stats = api_client(self.user).get('/api/tasks/tasks/dashboard_stats/').data
+        self.archive()
+
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Recent done', 'Open'})
+        self.assertEqual(self.titles(), [('Open', None), ('Recent done', None)])
+        self.assertEqual(self.titles('include_archived=1'), [
+            ('Old cancelled', True), ('Old done', True), ('Open', False), ('Recent done', False),
+        ])
+        self.assertEqual(self.titles('include_archived=1&tag=release'), [('Old done', True)])
+
+        client = api_client(self.user)
+        path = f'/api/tasks/tasks/{self.done.pk}/'
+        self.assertEqual(client.get(path).status_code, 404)
+        archived = client.get(path + '?include_archived=1').data
+        self.assertTrue(archived['is_archived'])
+        self.assertEqual([comment['comment'] for comment in archived['comments']], ['Shipped'])
+
+        # The rollups keep the totals unchanged when archived tasks are included
+        live = client.get('/api/tasks/tasks/dashboard_stats/').data
+        self.assertEqual(live['total_tasks'], 2)
+        after = client.get('/api/tasks/tasks/dashboard_stats/?include_archived=1').data
+        self.assertEqual(after, stats)
+
+    def test_dry_run_moves_nothing(self):
+        output = io.StringIO()
+        call_command('archive_tasks', days=30, dry_run=True, stdout=output)
+        self.assertIn('2 tasks would be archived', output.getvalue())
+        self.assertEqual(Task.objects.count(), 4)
+
+    def test_hidden_from_outsiders(self):
+        self.archive()
+        response = api_client(make_user('nosy')).get(f'/api/tasks/tasks/{self.done.pk}/?include_archived=1')
+        self.assertEqual(response.status_code, 404)
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.batches = []
+
+    def send(self, user, reminders):
+        self.batches.append((user.username, [reminder.task_id for reminder in reminders]))
+
+
+class ReminderSchedulerTests(TransactionTestCase):
+    """Reminders go out once, one batch per recipient, and follow task changes"""
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.owner, self.assignee = make_user('remindowner'), make_user('remindee')
+        project = Project.objects.create(name='Reminders', created_by=self.owner)
+        self.soon = make_task(project, self.owner, due_date=self.at(30), assigned_to=self.assignee)
+        self.sooner = make_task(project, self.owner, due_date=self.at(20), assigned_to=self.assignee)
+        self.unassigned = make_task(project, self.owner, due_date=self.at(45))
+        self.later = make_task(project, self.owner, due_date=self.at(180), assigned_to=self.assignee)
+        make_task(project, self.owner, due_date=self.at(10), status='completed')
+        self.backend = RecordingBackend()
+
+    def at(self, minutes):
+        return self.now + timedelta(minutes=minutes)
+
+    def scheduler(self):
+        scheduler = ReminderScheduler(self.backend, lead_minutes=[60], window=timedelta(hours=6))
+        scheduler.start(self.now)
+        return scheduler
+
+    def test_batches_per_recipient(self):
+        scheduler = self.scheduler()
+        self.assertEqual(scheduler.tick(self.now), 3)
+        self.assertEqual(sorted(self.backend.batches), [
+            ('remindee', [self.sooner.pk, self.soon.pk]), ('remindowner', [self.unassigned.pk]),
+        ])
+        self.assertEqual(scheduler.tick(self.now), 0)
+        # A restarted worker finds the sent log and does not repeat them
+        self.assertEqual(self.scheduler().tick(self.now), 0)
+        self.assertEqual(scheduler.tick(self.at(120)), 1)
+        self.assertEqual(self.backend.batches[-1], ('remindee', [self.later.pk]))
+
+    def test_follows_task_changes(self):
+        scheduler = self.scheduler()
+        self.later.due_date = self.at(100)
+        self.later.save()
+        self.soon.status = 'completed'
+        self.soon.save()
+        self.unassigned.delete()
+
+        scheduler.tick(self.now)
+        self.assertEqual(self.backend.batches, [('remindee', [self.sooner.pk])])
+        self.assertEqual(scheduler.tick(self.at(39)), 0)
+        self.assertEqual(scheduler.tick(self.at(40)), 1)
+        self.assertEqual(self.backend.batches[-1], ('remindee', [self.later.pk]))
+        self.assertEqual(scheduler.tick(self.at(120)), 0)
@@ -0,0 +1,162 @@
+"""
+Resumable chunked uploads for task attachments.
+
+The protocol is init, then PUT chunks, then complete. Chunks are sent in
+order with a ``Content-Range: bytes <start>-<end>/<size>`` header and are
+streamed from the request body straight into a part file at their offset,
+so neither a chunk nor the file is ever held in memory. A client that loses
+its connection asks for the upload's ``offset`` and continues from there.
+Each chunk is hashed while it is written (and checked against an optional
+``X-Chunk-SHA256`` header), and its digest is appended to the upload in the
+same update that advances the offset.
+
+The upload's ``chunk_digest`` is the SHA-256 of the chunk digests (binary,
+in order), not the SHA-256 of the file: it depends on how the file was cut
+into chunks. Completion combines the stored digests instead of reading the
+file again, checks the result against the ``expected_chunk_digest`` given at
+init, and moves the part file into storage as a ``TaskAttachment`` rather
+than copying it.
+"""
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.utils import timezone
+from rest_framework import status
+
+from .models import AttachmentUpload, TaskAttachment
+
+BLOCK_SIZE = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class PartFile(File):
+    """An assembled part file; FileSystemStorage moves it into place instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def part_path(upload):
+    return os.path.join(settings.TASK_UPLOAD_TEMP_DIR, f'{upload.pk}.part')
+
+
+def start_upload(upload):
+    os.makedirs(settings.TASK_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(part_path(upload), 'wb').close()
+
+
+def discard_upload(upload):
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range must look like "bytes <start>-<end>/<size>".')
+    start, end, total = (int(value) for value in match.groups())
+    if total != size:
+        raise UploadError(f'Content-Range size {total} does not match the upload size {size}.')
+    if start > end or end >= size:
+        raise UploadError('Content-Range is outside the file.', status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+    return start, end
+
+
+def write_chunk(upload, stream, content_range, chunk_sha256=None):
+    """Stream one chunk from ``stream`` into the part file and advance the offset"""
+    if upload.status != 'pending':
+        raise UploadError('Upload is already complete.', status.HTTP_409_CONFLICT)
+    start, end = parse_content_range(content_range, upload.size)
+    if start != upload.offset:
+        raise UploadError(f'Expected a chunk starting at byte {upload.offset}.', status.HTTP_409_CONFLICT)
+    length = end - start + 1
+    if length > settings.TASK_UPLOAD_MAX_CHUNK_SIZE:
+        raise UploadError(
+            f'Chunks may be at most {settings.TASK_UPLOAD_MAX_CHUNK_SIZE} bytes.',
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(part_path(upload), 'r+b') as part:
+            part.seek(start)
+            while stream is not None and written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                digest.update(block)
+                part.write(block)
+                written += len(block)
+    except FileNotFoundError:
+        raise UploadError('Upload data is no longer available; start a new upload.', status.HTTP_410_GONE)
+
+    if written != length:
+        raise UploadError(f'Received {written} bytes but Content-Range announced {length}.')
+    if chunk_sha256 and chunk_sha256.lower() != digest.hexdigest():
+        raise UploadError('Chunk SHA-256 does not match its content.')
+
+    # Only advance when no concurrent request wrote this chunk first
+    advanced = AttachmentUpload.objects.filter(pk=upload.pk, offset=start, status='pending').update(
+        offset=end + 1, chunk_digests=Concat(F('chunk_digests'), Value(digest.hexdigest())),
+        updated_at=timezone.now()
+    )
+    if not advanced:
+        raise UploadError('This chunk was already written by another request.', status.HTTP_409_CONFLICT)
+    upload.offset = end + 1
+    upload.chunk_digests += digest.hexdigest()
+    return digest.hexdigest()
+
+
+def combine_chunk_digests(chunk_digests):
+    """SHA-256 of the concatenated binary chunk digests, given as one hex string"""
+    return hashlib.sha256(bytes.fromhex(chunk_digests)).hexdigest()
+
+
+def complete_upload(upload):
+    """Verify the assembled file and turn it into a TaskAttachment"""
+    if upload.status != 'pending':
+        raise UploadError('Upload is already complete.', status.HTTP_409_CONFLICT)
+    if upload.offset != upload.size:
+        raise UploadError(f'Upload is incomplete: {upload.offset} of {upload.size} bytes received.',
+                          status.HTTP_409_CONFLICT)
+
+    path = part_path(upload)
+    if not os.path.exists(path):
+        raise UploadError('Upload data is no longer available; start a new upload.', status.HTTP_410_GONE)
+    chunk_digest = combine_chunk_digests(upload.chunk_digests)
+    if upload.expected_chunk_digest and upload.expected_chunk_digest.lower() != chunk_digest:
+        raise UploadError('Chunk digest does not match the one given at init.')
+
+    with transaction.atomic():
+        # Claim the upload so a concurrent completion cannot create a second attachment
+        claimed = AttachmentUpload.objects.filter(pk=upload.pk, status='pending').update(status='complete')
+        if not claimed:
+            raise UploadError('Upload is already complete.', status.HTTP_409_CONFLICT)
+        attachment = TaskAttachment(
+            task_id=upload.task_id, filename=upload.filename, uploaded_by_id=upload.uploaded_by_id
+        )
+        with open(path, 'rb') as part:
+            attachment.file.save(upload.filename, PartFile(part), save=False)
+        attachment.save()
+        upload.status = 'complete'
+        upload.chunk_digest = chunk_digest
+        upload.attachment = attachment
+        upload.save(update_fields=['status', 'chunk_digest', 'attachment', 'updated_at'])
+
+    discard_upload(upload)
+    return attachment
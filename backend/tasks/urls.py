@@ -1,13 +1,18 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProjectViewSet, TaskViewSet, TaskCommentViewSet, TaskAttachmentViewSet
+from .events import task_events
+from .views import (
+    ProjectViewSet, TaskViewSet, TaskCommentViewSet, TaskAttachmentViewSet, AttachmentUploadViewSet
+)
 
 router = DefaultRouter()
 router.register(r'projects', ProjectViewSet)
 router.register(r'tasks', TaskViewSet)
 router.register(r'comments', TaskCommentViewSet)
 router.register(r'attachments', TaskAttachmentViewSet)
+router.register(r'uploads', AttachmentUploadViewSet, basename='attachmentupload')
 
 urlpatterns = [
+    path('events/', task_events, name='task-events'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
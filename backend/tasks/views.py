@@ -1,15 +1,95 @@
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, mixins, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Prefetch, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Project, Task, TaskComment, TaskAttachment
+from core.files import serve_file
+from users.permissions import IsOwnerOrReadOnly
+from .models import (
+    Project, Task, TaskComment, TaskAttachment, TaskTagLink, AttachmentUpload,
+    ArchivedTask, ArchivedTaskAttachment, ArchivedTaskComment,
+)
 from .serializers import (
-    ProjectSerializer, TaskSerializer, TaskCreateSerializer, 
-    TaskUpdateSerializer, TaskCommentSerializer, TaskAttachmentSerializer
+    ProjectSerializer, ProjectMembersSerializer, WorkflowTransitionSerializer, TaskSerializer, TaskListSerializer, TaskCreateSerializer,
+    TaskUpdateSerializer, TaskCommentSerializer, TaskAttachmentSerializer,
+    AttachmentUploadSerializer, ArchivedTaskListSerializer, ArchivedTaskSerializer, UserBriefSerializer,
+    TaskDependencySerializer,
 )
 from .permissions import IsAdminOrModeratorForProject, TaskPermission
+from . import bulk
+from .access import visible_projects, visible_tasks
+from .analytics import project_analytics
+from .archive import archived_dashboard_totals, filter_archived
+from .cache import project_cache_key, shared_cache, user_cache_key
+from .calendar import parse_range, task_calendar
+from .changes import changes_since, is_pruned, latest_sequence, resolve_changes
+from .conditional import ConditionalGetMixin
+from .dependencies import DependencyError, add_dependency, project_schedule, remove_dependency
+from .export import EXPORT_FORMATS, export_response
+from .filters import TaskFilter
+from .membership import change_members
+from .pagination import CommentKeysetPagination, TaskKeysetPagination
+from .search import TaskSearchFilter
+from .uploads import UploadError, complete_upload, discard_upload, start_upload, write_chunk
+from .workflow import set_project_rules, transition_error
+from .workload import recommend_assignees
+
+
+def count_subquery(model, field):
+    """Correlated COUNT of ``model`` rows pointing at the outer row through ``field``"""
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def latest_comments_prefetch(limit):
+    """
+    The newest ``limit`` comments of every task as ``latest_comments``.
+    Prefetching a sliced queryset runs one ROW_NUMBER() window query for
+    the whole page instead of loading every comment.
+    """
+    comments = TaskComment.objects.select_related('user').order_by('-created_at', '-id')[:limit]
+    return Prefetch('comments', queryset=comments, to_attr='latest_comments')
+
+
+def project_detail_queryset():
+    """Projects with everything ProjectSerializer renders loaded up front"""
+    return Project.objects.select_related('created_by').prefetch_related('members').annotate(
+        task_count=count_subquery(Task, 'project')
+    )
+
+
+def dashboard_aggregates(user, now=None):
+    """Conditional COUNTs for every dashboard figure, evaluated in one query"""
+    now = now or timezone.now()
+    aggregates = {
+        'total_tasks': Count('id'),
+        'my_tasks': Count('id', filter=Q(assigned_to=user)),
+        'completed_tasks': Count('id', filter=Q(status='completed')),
+        'overdue_tasks': Count('id', filter=Q(
+            due_date__lt=now,
+            status__in=['todo', 'in_progress']
+        )),
+        'high_priority': Count('id', filter=Q(priority='high')),
+        'urgent_priority': Count('id', filter=Q(priority='urgent')),
+    }
+    # Status and priority distributions are folded into the same query
+    for value, _ in Task.STATUS_CHOICES:
+        aggregates[f'status__{value}'] = Count('id', filter=Q(status=value))
+    for value, _ in Task.PRIORITY_CHOICES:
+        aggregates[f'priority__{value}'] = Count('id', filter=Q(priority=value))
+    return aggregates
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -39,7 +119,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
                 (hasattr(obj, 'created_by') and obj.created_by == request.user))
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
     permission_classes = [IsAdminOrModeratorForProject]
@@ -50,17 +130,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = Project.objects.all()
-        user = self.request.user
-        
-        # Admins can see all projects
-        if user.role == 'admin':
-            return queryset
-        
-        # Standard users can see projects they created or are members of
-        return queryset.filter(
-            Q(created_by=user) | Q(members=user)
-        ).distinct()
+        # Admins see all projects; standard users see projects they created or are members of
+        return visible_projects(project_detail_queryset(), self.request.user)
 
     @action(detail=True, methods=['post'])
     def add_member(self, request, pk=None):
@@ -98,45 +169,284 @@ class ProjectViewSet(viewsets.ModelViewSet):
         except User.DoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=['post', 'put', 'delete'])
+    def members(self, request, pk=None):
+        """
+        Bulk membership: POST adds, DELETE removes and PUT replaces the
+        member set with the users given as {"user_ids": [...], "emails": [...]}
+        """
+        project = self.get_object()
+        mode = {'POST': 'add', 'DELETE': 'remove', 'PUT': 'replace'}[request.method]
+        serializer = ProjectMembersSerializer(data=request.data, context={'allow_empty': mode == 'replace'})
+        serializer.is_valid(raise_exception=True)
+        result = change_members(project, mode, **serializer.validated_data)
+        if mode == 'replace' and result['not_found']:
+            result['error'] = 'Some users were not found; membership was not changed'
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+
+    @action(detail=True, methods=['get', 'put'])
+    def workflow(self, request, pk=None):
+        """
+        Allowed status transitions. PUT replaces them with a list of
+        {"from_status", "to_status"}; an empty list allows every change.
+        """
+        project = self.get_object()
+        if request.method == 'PUT':
+            items = request.data.get('transitions') if isinstance(request.data, dict) else request.data
+            serializer = WorkflowTransitionSerializer(data=items, many=True)
+            serializer.is_valid(raise_exception=True)
+            set_project_rules(
+                project, [(item['from_status'], item['to_status']) for item in serializer.validated_data]
+            )
+        transitions = project.workflow_transitions.all()
+        return Response({'transitions': WorkflowTransitionSerializer(transitions, many=True).data})
+
+    @action(detail=True, methods=['get'])
+    def analytics(self, request, pk=None):
+        """
+        Delivery metrics: cycle time, weekly throughput over ?weeks= (default
+        12), daily burndown over ?days= (default 30) and estimate accuracy
+        """
+        project = self.get_object()
+        try:
+            weeks = int(request.query_params.get('weeks', 12))
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'weeks and days must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        if not (1 <= weeks <= 104 and 1 <= days <= 365):
+            return Response({'error': 'weeks must be 1-104 and days 1-365'}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        cache_key = project_cache_key('analytics', project.pk, weeks, days, now.date())
+        data = cache.get(cache_key) if shared_cache() else None
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
 
-class TaskViewSet(viewsets.ModelViewSet):
+        data = project_analytics(project.pk, now, weeks=weeks, days=days)
+        if shared_cache():
+            cache.set(cache_key, data, settings.TASK_ANALYTICS_CACHE_TIMEOUT)
+        response = Response(data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """
+        Earliest start and finish of each task, in hours after its blockers'
+        remaining estimates, and the critical path through the dependencies
+        """
+        project = self.get_object()
+        data, hit = project_schedule(project.pk)
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def assignees(self, request, pk=None):
+        """
+        Members ranked by open workload, least loaded first: estimated hours
+        of their open tasks weighted by priority and due-date proximity
+        """
+        project = self.get_object()
+        try:
+            limit = int(request.query_params.get('limit', 0))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ranking, hit = recommend_assignees(project.pk)
+        if limit > 0:
+            ranking = ranking[:limit]
+        response = Response({
+            'results': [
+                {**item, 'user': UserBriefSerializer(item['user']).data} for item in ranking
+            ],
+        })
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+
+class TaskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     permission_classes = [TaskPermission]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['status', 'priority', 'project', 'assigned_to', 'created_by']
+    # TaskSearchFilter runs last so relevance ordering wins when no ?ordering= is given
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TaskSearchFilter]
+    filterset_class = TaskFilter
     search_fields = ['title', 'description', 'tags']
     ordering_fields = ['title', 'due_date', 'created_at', 'priority']
     ordering = ['-created_at']
 
+    def get_conditional_time_window(self):
+        # is_overdue and days_until_due change with time, not only on writes
+        return settings.TASK_CONDITIONAL_GET_WINDOW
+
+    @property
+    def paginator(self):
+        """Page-number pagination by default, keyset pagination on ?pagination=cursor"""
+        if not hasattr(self, '_paginator'):
+            if self.action == 'comments':
+                self._paginator = CommentKeysetPagination()
+            elif self.action == 'list' and self.include_archived():
+                # Merged live + archived lists are page-numbered
+                self._paginator = super().paginator
+            elif TaskKeysetPagination.is_requested(self.request):
+                self._paginator = TaskKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_keyset_ordering(self):
+        return 'due_date' if self.action == 'overdue' else '-created_at'
+
+    # Actions rendered with the compact TaskListSerializer
+    list_actions = ['list', 'my_tasks', 'overdue', 'changes']
+    # Actions rendered with the full TaskSerializer
+    detail_actions = ['retrieve', 'change_status']
+
     def get_serializer_class(self):
         if self.action == 'create':
             return TaskCreateSerializer
         elif self.action in ['update', 'partial_update']:
             return TaskUpdateSerializer
+        elif self.action in self.list_actions:
+            return TaskListSerializer
         return TaskSerializer
 
+    def get_expand(self):
+        """Nested representations requested with ?expand=project,comments,attachments"""
+        if not hasattr(self, '_expand'):
+            requested = self.request.query_params.get('expand', '')
+            self._expand = {
+                name.strip() for name in requested.split(',')
+                if name.strip() in TaskListSerializer.EXPANDABLE_FIELDS
+            }
+        return self._expand
+
+    def get_latest_comments_limit(self):
+        """Comments per list row from ?latest_comments= (0 disables)"""
+        try:
+            limit = int(self.request.query_params.get('latest_comments', settings.TASK_LATEST_COMMENTS))
+        except ValueError:
+            limit = settings.TASK_LATEST_COMMENTS
+        return max(0, min(limit, 20))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in self.list_actions:
+            context['expand'] = self.get_expand()
+            context['search'] = bool(self.request.query_params.get('search'))
+            context['latest_comments'] = self.get_latest_comments_limit()
+        return context
+
     def get_queryset(self):
-        queryset = Task.objects.select_related('project', 'created_by', 'assigned_to').prefetch_related('comments', 'attachments')
-        user = self.request.user
-        
-        # Admins can see all tasks
-        if user.role == 'admin':
-            return queryset
-        
-        # Standard users can see tasks in projects they have access to
-        return queryset.filter(
-            Q(project__created_by=user) | 
-            Q(project__members=user) |
-            Q(assigned_to=user) |
-            Q(created_by=user)
-        ).distinct()
+        queryset = Task.objects.select_related('created_by', 'assigned_to')
+        full_project = Prefetch('project', queryset=project_detail_queryset())
+
+        if self.action in self.list_actions:
+            queryset = queryset.annotate(
+                comment_count=count_subquery(TaskComment, 'task'),
+                attachment_count=count_subquery(TaskAttachment, 'task'),
+            )
+            expand = self.get_expand()
+            if 'project' in expand:
+                queryset = queryset.prefetch_related(full_project)
+            else:
+                queryset = queryset.select_related('project')
+            if 'comments' in expand:
+                queryset = queryset.prefetch_related('comments__user')
+            if 'attachments' in expand:
+                queryset = queryset.prefetch_related('attachments__uploaded_by')
+            limit = self.get_latest_comments_limit()
+            if limit:
+                queryset = queryset.prefetch_related(latest_comments_prefetch(limit))
+        elif self.action in self.detail_actions:
+            queryset = queryset.annotate(comment_count=count_subquery(TaskComment, 'task')).prefetch_related(
+                full_project, 'comments__user', 'attachments__uploaded_by'
+            )
+        else:
+            queryset = queryset.select_related('project')
+
+        # Admins see all tasks; standard users see tasks in projects they have
+        # access to plus tasks assigned to or created by them
+        return visible_tasks(queryset, self.request.user)
+
+    def include_archived(self):
+        return self.request.query_params.get('include_archived') in ('1', 'true')
+
+    def get_archived_queryset(self):
+        return visible_tasks(
+            ArchivedTask.objects.select_related('project', 'created_by', 'assigned_to').annotate(
+                comment_count=count_subquery(ArchivedTaskComment, 'task'),
+                attachment_count=count_subquery(ArchivedTaskAttachment, 'task'),
+            ),
+            self.request.user,
+        )
+
+    def list(self, request, *args, **kwargs):
+        if self.include_archived():
+            return self.dispatch_conditional(request, self.list_with_archive, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.include_archived():
+            return self.dispatch_conditional(request, self.retrieve_with_archive, *args, **kwargs)
+        return super().retrieve(request, *args, **kwargs)
+
+    def list_with_archive(self, request, *args, **kwargs):
+        """
+        Live and archived tasks as one list. A UNION of (id, sort key,
+        archived flag) is ordered and paginated, then only the rows on the
+        page are loaded from each table.
+        """
+        ordering = request.query_params.get('ordering', '')
+        if ordering.lstrip('-') not in self.ordering_fields:
+            ordering = self.ordering[0]
+        field = ordering.lstrip('-')
+        tiebreak = '-id' if ordering.startswith('-') else 'id'
+
+        live = self.filter_queryset(self.get_queryset()).order_by().prefetch_related(None)
+        archived = filter_archived(visible_tasks(ArchivedTask.objects.all(), request.user), request.query_params)
+        rows = live.annotate(is_archived=Value(False)).values_list('id', field, 'is_archived').union(
+            archived.order_by().annotate(is_archived=Value(True)).values_list('id', field, 'is_archived'),
+            all=True,
+        ).order_by(ordering, tiebreak)
+
+        page = self.paginate_queryset(rows)
+        rows = list(rows) if page is None else page
+        context = {**self.get_serializer_context(), 'search': False}
+        live_ids = [pk for pk, _, is_archived in rows if not is_archived]
+        archived_ids = [pk for pk, _, is_archived in rows if is_archived]
+        serialized = {}
+        for item in TaskListSerializer(
+            self.get_queryset().filter(pk__in=live_ids), many=True, context=context
+        ).data:
+            serialized[(item['id'], False)] = {**item, 'is_archived': False}
+        for item in ArchivedTaskListSerializer(
+            self.get_archived_queryset().filter(pk__in=archived_ids), many=True, context=context
+        ).data:
+            serialized[(item['id'], True)] = item
+        results = [serialized[(pk, is_archived)] for pk, _, is_archived in rows]
+        if page is None:
+            return Response(results)
+        return self.get_paginated_response(results)
+
+    def retrieve_with_archive(self, request, *args, **kwargs):
+        """The live task, or its archived copy once it has been archived"""
+        try:
+            instance = self.get_object()
+        except Http404:
+            archived = self.get_archived_queryset().prefetch_related('comments__user', 'attachments__uploaded_by')
+            instance = get_object_or_404(archived, pk=kwargs['pk'])
+            return Response(ArchivedTaskSerializer(instance, context=self.get_serializer_context()).data)
+        return Response({**self.get_serializer(instance).data, 'is_archived': False})
 
     @action(detail=False, methods=['get'])
     def my_tasks(self, request):
         """Get tasks assigned to the current user"""
         tasks = self.get_queryset().filter(assigned_to=request.user)
-        serializer = self.get_serializer(tasks, many=True)
-        return Response(serializer.data)
+        return self._optionally_paginated_response(tasks)
 
     @action(detail=False, methods=['get'])
     def overdue(self, request):
@@ -145,35 +455,217 @@ class TaskViewSet(viewsets.ModelViewSet):
             due_date__lt=timezone.now(),
             status__in=['todo', 'in_progress']
         )
-        serializer = self.get_serializer(tasks, many=True)
+        return self._optionally_paginated_response(tasks)
+
+    def _optionally_paginated_response(self, queryset):
+        """Full list unless keyset pagination was requested, for backwards compatibility"""
+        if TaskKeysetPagination.is_requested(self.request):
+            page = self.paginate_queryset(queryset)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        """Get dashboard statistics for tasks"""
-        queryset = self.get_queryset()
-        
-        stats = {
-            'total_tasks': queryset.count(),
-            'my_tasks': queryset.filter(assigned_to=request.user).count(),
-            'completed_tasks': queryset.filter(status='completed').count(),
-            'overdue_tasks': queryset.filter(
-                due_date__lt=timezone.now(),
-                status__in=['todo', 'in_progress']
-            ).count(),
-            'high_priority': queryset.filter(priority='high').count(),
-            'urgent_priority': queryset.filter(priority='urgent').count(),
-        }
-        
-        # Task status distribution
-        status_distribution = queryset.values('status').annotate(count=Count('id'))
-        stats['status_distribution'] = {item['status']: item['count'] for item in status_distribution}
-        
-        # Priority distribution
-        priority_distribution = queryset.values('priority').annotate(count=Count('id'))
-        stats['priority_distribution'] = {item['priority']: item['count'] for item in priority_distribution}
-        
-        return Response(stats)
+        """
+        Get dashboard statistics for tasks; ?include_archived=1 adds the
+        archived totals from the archive rollups
+        """
+        include_archived = self.include_archived()
+        cache_key = user_cache_key('dashboard_stats', request.user, int(include_archived))
+        # A per-process cache would miss other workers' invalidations
+        cached = shared_cache() and request.query_params.get('fresh') not in ('1', 'true')
+
+        stats = cache.get(cache_key) if cached else None
+        if stats is not None:
+            response = Response(stats)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        totals = self.get_queryset().order_by().aggregate(**dashboard_aggregates(request.user))
+        if include_archived:
+            for name, count in archived_dashboard_totals(request.user).items():
+                totals[name] += count
+
+        stats = {}
+        distributions = {'status_distribution': {}, 'priority_distribution': {}}
+        for name, count in totals.items():
+            group, _, value = name.partition('__')
+            if not value:
+                stats[name] = count
+            elif count:
+                distributions[f'{group}_distribution'][value] = count
+        stats.update(distributions)
+
+        if shared_cache():
+            cache.set(cache_key, stats, settings.TASK_DASHBOARD_CACHE_TIMEOUT)
+        response = Response(stats)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        Compact rows of the visible tasks due from ?start= to ?end= (dates,
+        inclusive), grouped by day with per-day counts; ?include_archived=1
+        adds archived tasks
+        """
+        return self.dispatch_conditional(request, self._calendar)
+
+    def _calendar(self, request):
+        try:
+            start, end = parse_range(request.query_params.get('start'), request.query_params.get('end'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        include_archived = self.include_archived()
+        cache_key = user_cache_key('calendar', request.user, start, end, int(include_archived))
+        data = cache.get(cache_key) if shared_cache() else None
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        user = request.user
+        data = task_calendar(
+            visible_tasks(Task.objects.all(), user), start, end,
+            archived=visible_tasks(ArchivedTask.objects.all(), user) if include_archived else None,
+        )
+        if shared_cache():
+            cache.set(cache_key, data, settings.TASK_CALENDAR_CACHE_TIMEOUT)
+        response = Response(data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def tag_facets(self, request):
+        """Per-tag task counts for the visible, filtered task set"""
+        tasks = self.filter_queryset(self.get_queryset())
+        facets = (
+            TaskTagLink.objects.filter(task_id__in=tasks.order_by().values('pk'))
+            .values('tag__name')
+            .annotate(count=Count('id'))
+            .order_by('-count', 'tag__name')
+        )
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response([
+            {'tag': item['tag__name'], 'count': item['count']}
+            for item in facets[:max(1, min(limit, 500))]
+        ])
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Delta sync: tasks changed after the ?since= sequence number.
+        Visible tasks come back in ``upserts``; deleted tasks and tasks the
+        caller can no longer see come back in ``tombstones``. Pass the
+        returned ``cursor`` as the next ``since``; without ``since`` only the
+        current cursor is returned, to be taken right before a full fetch.
+        """
+        since = request.query_params.get('since')
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 500)), 1000))
+            since = int(since) if since is not None else None
+        except ValueError:
+            return Response({'error': 'since and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if since is None:
+            return Response({'cursor': latest_sequence(), 'has_more': False, 'upserts': [], 'tombstones': []})
+        if is_pruned(since):
+            return Response(
+                {'error': 'Changes since this cursor are no longer available; run a full sync.',
+                 'cursor': latest_sequence()},
+                status=status.HTTP_410_GONE
+            )
+
+        entries, cursor, has_more = changes_since(request.user, since, limit)
+        upserts, tombstones = resolve_changes(entries, self.get_queryset(), request.user)
+        return Response({
+            'cursor': cursor,
+            'has_more': has_more,
+            'upserts': self.get_serializer(upserts, many=True).data,
+            'tombstones': tombstones,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the filtered, visible tasks as CSV or NDJSON.
+        Choose with ?export_format=csv|ndjson (``format`` is taken by DRF).
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return export_response(self.filter_queryset(self.get_queryset()), export_format)
+
+    def _bulk_items(self, key):
+        """Read a list payload (bare list or {key: [...]}) for the bulk actions"""
+        items = self.request.data
+        if isinstance(items, dict):
+            items = items.get(key)
+        if not isinstance(items, list) or not items:
+            return None, Response({'error': f'{key} must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > bulk.MAX_BULK_ITEMS:
+            return None, Response(
+                {'error': f'At most {bulk.MAX_BULK_ITEMS} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    def _bulk_response(self, result, success_status=status.HTTP_200_OK):
+        response_status = success_status if result.succeeded else status.HTTP_400_BAD_REQUEST
+        return Response(result.as_dict(), status=response_status)
+
+    @action(detail=False, methods=['post'], url_path='bulk/create')
+    def bulk_create(self, request):
+        """Create many tasks in one transaction"""
+        rows, error = self._bulk_items('tasks')
+        if error:
+            return error
+        return self._bulk_response(bulk.bulk_create_tasks(request.user, rows), status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch'], url_path='bulk/update')
+    def bulk_update(self, request):
+        """Partially update many tasks in one transaction; each row needs an id"""
+        rows, error = self._bulk_items('tasks')
+        if error:
+            return error
+        return self._bulk_response(bulk.bulk_update_tasks(request.user, rows))
+
+    @action(detail=False, methods=['post'], url_path='bulk/status')
+    def bulk_change_status(self, request):
+        """Change the status of many tasks"""
+        ids, error = self._bulk_items('ids')
+        if error:
+            return error
+        new_status = request.data.get('status')
+        if new_status not in bulk.STATUS_VALUES:
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._bulk_response(bulk.bulk_change_status(request.user, ids, new_status))
+
+    @action(detail=False, methods=['post'], url_path='bulk/delete')
+    def bulk_delete(self, request):
+        """Delete many tasks"""
+        ids, error = self._bulk_items('ids')
+        if error:
+            return error
+        return self._bulk_response(bulk.bulk_delete_tasks(request.user, ids))
+
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk=None):
+        """All comments of the task, newest first, with keyset pagination"""
+        task = self.get_object()
+        comments = TaskComment.objects.filter(task=task).select_related('user')
+        page = self.paginate_queryset(comments)
+        serializer = TaskCommentSerializer(page, many=True, context=self.get_serializer_context())
+        return self.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['post'])
     def add_comment(self, request, pk=None):
@@ -193,6 +685,36 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = TaskCommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['get', 'post', 'delete'])
+    def dependencies(self, request, pk=None):
+        """
+        Tasks this task is blocked by and blocks. POST {"blocked_by": id}
+        adds a blocker unless that would create a cycle; DELETE removes one.
+        """
+        task = self.get_object()
+        response_status = status.HTTP_200_OK
+        if request.method != 'GET':
+            serializer = TaskDependencySerializer(data=request.data, context=self.get_serializer_context())
+            serializer.is_valid(raise_exception=True)
+            blocked_by = serializer.validated_data['blocked_by']
+            if request.method == 'DELETE':
+                if not remove_dependency(task, blocked_by.pk):
+                    return Response({'error': 'Dependency not found'}, status=status.HTTP_404_NOT_FOUND)
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            try:
+                _, created = add_dependency(task, blocked_by)
+            except DependencyError as error:
+                return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+            if created:
+                response_status = status.HTTP_201_CREATED
+
+        visible = visible_tasks(Task.objects.all(), request.user).order_by('id')
+        fields = ('id', 'title', 'status', 'estimated_hours')
+        return Response({
+            'blocked_by': list(visible.filter(dependents__task=task).values(*fields)),
+            'blocks': list(visible.filter(dependencies__blocked_by=task).values(*fields)),
+        }, status=response_status)
+
     @action(detail=True, methods=['post'])
     def change_status(self, request, pk=None):
         """Change task status"""
@@ -202,12 +724,11 @@ class TaskViewSet(viewsets.ModelViewSet):
         if new_status not in [choice[0] for choice in Task.STATUS_CHOICES]:
             return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
         
-        task.status = new_status
-        if new_status == 'completed':
-            task.completed_at = timezone.now()
-        else:
-            task.completed_at = None
-        task.save()
+        error = transition_error(task.project_id, task.status, new_status)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        bulk.update_status([task], new_status)
         
         serializer = self.get_serializer(task)
         return Response(serializer.data)
@@ -216,10 +737,17 @@ class TaskViewSet(viewsets.ModelViewSet):
 class TaskCommentViewSet(viewsets.ModelViewSet):
     queryset = TaskComment.objects.all()
     serializer_class = TaskCommentSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    # Anyone who can see the task may read; only the author or a moderator may edit
+    permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['task']
 
+    def get_queryset(self):
+        tasks = visible_tasks(Task.objects.all(), self.request.user)
+        return TaskComment.objects.select_related('user').filter(
+            task__in=tasks.values('pk')
+        ).order_by('-created_at', '-id')
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -231,5 +759,68 @@ class TaskAttachmentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['task']
 
+    def get_queryset(self):
+        # Attachments are visible exactly when their task is
+        tasks = visible_tasks(Task.objects.all(), self.request.user)
+        return TaskAttachment.objects.select_related('uploaded_by').filter(
+            task__in=tasks.values('pk')
+        ).order_by('-uploaded_at')
+
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
\ No newline at end of file
+        serializer.save(uploaded_by=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the file; supports Range requests and X-Accel-Redirect"""
+        attachment = self.get_object()
+        return serve_file(request, attachment.file, attachment.filename)
+
+
+class AttachmentUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                              mixins.DestroyModelMixin, mixins.ListModelMixin,
+                              viewsets.GenericViewSet):
+    """
+    Resumable chunked attachment uploads (see tasks.uploads):
+    POST uploads/ to start, PUT uploads/<id>/chunk/ with Content-Range for
+    each chunk, GET uploads/<id>/ to find the offset to resume from, and
+    POST uploads/<id>/complete/ to create the attachment.
+    """
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return AttachmentUpload.objects.filter(uploaded_by=self.request.user)
+
+    def perform_create(self, serializer):
+        upload = serializer.save(uploaded_by=self.request.user)
+        start_upload(upload)
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+        instance.delete()
+
+    def _upload_error(self, upload, error):
+        return Response({'error': str(error), 'offset': upload.offset}, status=error.status_code)
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Write one chunk; the body is streamed to disk, never parsed"""
+        upload = self.get_object()
+        try:
+            chunk_sha256 = write_chunk(
+                upload, request.stream, request.headers.get('Content-Range'),
+                request.headers.get('X-Chunk-SHA256'),
+            )
+        except UploadError as error:
+            return self._upload_error(upload, error)
+        return Response({'offset': upload.offset, 'size': upload.size, 'chunk_sha256': chunk_sha256})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        try:
+            attachment = complete_upload(upload)
+        except UploadError as error:
+            return self._upload_error(upload, error)
+        serializer = TaskAttachmentSerializer(attachment, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,101 @@
+"""
+Per-project status workflows.
+
+``WorkflowTransition`` rows are compiled into one in-memory lookup table,
+``{project_id: {from_status: frozenset(to_statuses)}}``. With a shared
+cache the table is rebuilt only after the ``workflow`` scope is bumped by a
+rule change, so checking a transition (or a whole batch of them) needs no
+queries; with a per-process cache other workers would not see the bump, so
+the table is reloaded for every check.
+Projects without rules allow every change.
+
+Hooks named in ``TASK_WORKFLOW_HOOKS`` are called with the list of applied
+``Transition``s once the transaction that applied them has committed, so
+a slow or failing hook never holds locks or rolls back a status change.
+"""
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .cache import WORKFLOW_SCOPE, get_version, invalidate_workflows, shared_cache
+from .models import WorkflowTransition
+
+logger = logging.getLogger(__name__)
+
+Transition = namedtuple('Transition', ['task_id', 'project_id', 'from_status', 'to_status'])
+
+# (version, table) of the last compiled rules in this process
+_compiled = (None, {})
+
+
+def compile_rules(rows):
+    table = {}
+    for project_id, from_status, to_status in rows:
+        table.setdefault(project_id, {}).setdefault(from_status, set()).add(to_status)
+    return {
+        project_id: {from_status: frozenset(targets) for from_status, targets in rules.items()}
+        for project_id, rules in table.items()
+    }
+
+
+def transition_table():
+    """The compiled rules of every project, reloaded only when they change"""
+    global _compiled
+    rows = WorkflowTransition.objects.order_by().values_list('project_id', 'from_status', 'to_status')
+    if not shared_cache():
+        return compile_rules(rows)
+    version = get_version(WORKFLOW_SCOPE)
+    if _compiled[0] != version:
+        _compiled = (version, compile_rules(rows))
+    return _compiled[1]
+
+
+def transition_error(project_id, from_status, to_status, table=None):
+    """None when the change is allowed, otherwise why it is not"""
+    rules = (transition_table() if table is None else table).get(project_id)
+    if rules is None or from_status == to_status or to_status in rules.get(from_status, ()):
+        return None
+    allowed = sorted(rules.get(from_status, ()))
+    if allowed:
+        return f"Cannot move a task from {from_status} to {to_status}; allowed: {', '.join(allowed)}."
+    return f"Cannot move a task out of {from_status} in this project."
+
+
+def set_project_rules(project, transitions):
+    """Replace the project's rules with (from_status, to_status) pairs"""
+    with transaction.atomic():
+        WorkflowTransition.objects.filter(project=project).delete()
+        WorkflowTransition.objects.bulk_create([
+            WorkflowTransition(project=project, from_status=from_status, to_status=to_status)
+            for from_status, to_status in sorted(set(transitions))
+        ])
+        invalidate_workflows()
+
+
+@lru_cache(maxsize=None)
+def _load_hooks(paths):
+    return [import_string(path) for path in paths]
+
+
+def get_hooks():
+    return _load_hooks(tuple(settings.TASK_WORKFLOW_HOOKS))
+
+
+def run_hooks(hooks, transitions):
+    for hook in hooks:
+        try:
+            hook(transitions)
+        except Exception:
+            logger.exception('Workflow hook %s failed', getattr(hook, '__name__', hook))
+
+
+def queue_hooks(transitions):
+    """Run the configured hooks for actual status changes after commit"""
+    transitions = [item for item in transitions if item.from_status != item.to_status]
+    hooks = get_hooks()
+    if transitions and hooks:
+        transaction.on_commit(lambda: run_hooks(hooks, transitions))
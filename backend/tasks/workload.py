@@ -0,0 +1,153 @@
+"""
+Workload-aware assignee recommendations.
+
+A person's workload is the sum over their open assigned tasks (in every
+project) of ``estimated_hours`` (``DEFAULT_HOURS`` when missing), weighted
+by priority and by how close the due date is. Proximity is measured in
+whole days from the start of the current day, so a task's weight does
+not drift during the day and cached figures stay exact.
+
+Workloads are cached per user for the current day, under the user's
+``workload`` cache scope, and shared by every project the user belongs to.
+A project reads its candidates' (creator and members) entries in one round
+trip and computes the missing ones with one grouped aggregate. A task write
+that changes someone's workload bumps their scope after commit, so the
+next read recomputes it. Entries are never patched in place: two writers
+updating the same entry at once cannot lose each other's change. With a
+process-local cache backend, workloads are computed on every read instead.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .cache import get_versions, invalidate_workloads, shared_cache, workload_scope
+from .models import ProjectAccess, Task
+
+User = get_user_model()
+
+OPEN_STATUSES = ('todo', 'in_progress', 'review')
+# Hours assumed for tasks without an estimate
+DEFAULT_HOURS = 4
+PRIORITY_WEIGHTS = {'low': 0.5, 'medium': 1.0, 'high': 1.5, 'urgent': 2.0}
+# (due before day start + N days, weight); later due dates weigh 1
+DUE_WEIGHTS = ((0, 2.0), (2, 1.5), (7, 1.2))
+
+
+def day_start(now=None):
+    return timezone.localtime(now or timezone.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _cache_key(user_id, version, day):
+    return f'tasks:workload:{user_id}:{version}:{day.date()}'
+
+
+def weighted_hours(day):
+    """SQL expression for one task's contribution to its assignee's workload"""
+    priority = Case(
+        *(When(priority=value, then=Value(weight)) for value, weight in PRIORITY_WEIGHTS.items()),
+        default=Value(1.0), output_field=FloatField(),
+    )
+    proximity = Case(
+        *(When(due_date__lt=day + timedelta(days=days), then=Value(weight)) for days, weight in DUE_WEIGHTS),
+        default=Value(1.0), output_field=FloatField(),
+    )
+    hours = Coalesce(F('estimated_hours'), Value(DEFAULT_HOURS))
+    return ExpressionWrapper(hours * priority * proximity, output_field=FloatField())
+
+
+def contribution(state, day):
+    """(open tasks, hours, workload) one task adds to its assignee, in Python"""
+    if not state or state.get('assigned_to_id') is None or state.get('status') not in OPEN_STATUSES:
+        return None
+    hours = state.get('estimated_hours') or DEFAULT_HOURS
+    proximity = 1.0
+    for days, weight in DUE_WEIGHTS:
+        if state['due_date'] < day + timedelta(days=days):
+            proximity = weight
+            break
+    return 1, hours, hours * PRIORITY_WEIGHTS.get(state.get('priority'), 1.0) * proximity
+
+
+def compute_workloads(user_ids, day):
+    """{user id: [open tasks, open hours, workload]} from one grouped aggregate"""
+    workloads = {user_id: [0, 0, 0.0] for user_id in user_ids}
+    rows = (
+        Task.objects.filter(assigned_to__in=user_ids, status__in=OPEN_STATUSES)
+        .order_by()
+        .values('assigned_to')
+        .annotate(
+            open_tasks=Count('id'),
+            open_hours=Sum(Coalesce(F('estimated_hours'), Value(DEFAULT_HOURS))),
+            workload=Sum(weighted_hours(day)),
+        )
+    )
+    for row in rows:
+        workloads[row['assigned_to']] = [row['open_tasks'], row['open_hours'], row['workload']]
+    return workloads
+
+
+def project_workloads(project_id, now=None):
+    """
+    Return ({user id: [open tasks, open hours, workload]}, cache hit) for the
+    project's candidates; a hit means none had to be computed
+    """
+    day = day_start(now)
+    candidates = set(ProjectAccess.objects.filter(
+        project_id=project_id, user__is_active=True
+    ).values_list('user_id', flat=True))
+    if not shared_cache():
+        return compute_workloads(candidates, day), False
+    # Versions are read before the tasks, so an entry computed from rows a
+    # concurrent write has since changed is stored under a stale key
+    versions = get_versions([workload_scope(user_id) for user_id in candidates])
+    keys = {user_id: _cache_key(user_id, versions[workload_scope(user_id)], day) for user_id in candidates}
+    cached = cache.get_many(list(keys.values()))
+    workloads = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+    missing = candidates - workloads.keys()
+    if missing:
+        computed = compute_workloads(missing, day)
+        cache.set_many(
+            {keys[user_id]: computed[user_id] for user_id in missing}, settings.TASK_WORKLOAD_CACHE_TIMEOUT
+        )
+        workloads.update(computed)
+    return workloads, not missing
+
+
+def recommend_assignees(project_id, now=None):
+    """Candidates ranked by ascending workload, then open task count; returns (ranking, cache hit)"""
+    workloads, hit = project_workloads(project_id, now)
+    users = User.objects.in_bulk(list(workloads))
+    ranking = [
+        {
+            'user': users[user_id],
+            'open_tasks': open_tasks,
+            'open_hours': open_hours,
+            'workload': round(workload, 2),
+        }
+        for user_id, (open_tasks, open_hours, workload) in workloads.items()
+        if user_id in users
+    ]
+    ranking.sort(key=lambda item: (item['workload'], item['open_tasks'], item['user'].username))
+    return ranking, hit
+
+
+def record_workload_changes(pairs):
+    """
+    Invalidate cached workloads after commit for (previous state, new state)
+    pairs of ``changes.task_state`` dicts; None stands for created/deleted
+    """
+    day = day_start()
+    user_ids = set()
+    for previous, current in pairs:
+        before, after = contribution(previous, day), contribution(current, day)
+        if before == after and (before is None or previous['assigned_to_id'] == current['assigned_to_id']):
+            continue
+        for state, amount in ((previous, before), (current, after)):
+            if amount is not None:
+                user_ids.add(state['assigned_to_id'])
+    invalidate_workloads(user_ids)
@@ -21,6 +21,7 @@ urlpatterns = [
     path('current/', views.current_user, name='current_user'),
     path('users/', views.UserListView.as_view(), name='user_list'),
     path('users/<int:id>/', views.UserDetailView.as_view(), name='user_detail'),
+    path('users/<int:id>/avatar/', views.user_avatar, name='user_avatar'),
     
     # Admin URLs
     path('admin/users/', views.AdminUserListView.as_view(), name='admin_user_list'),
@@ -5,6 +5,8 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
+from django.shortcuts import get_object_or_404
+from core.files import serve_file
 from .models import UserProfile
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, UserLoginSerializer,
@@ -153,6 +155,14 @@ class UserDetailView(generics.RetrieveAPIView):
     lookup_field = 'id'
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_avatar(request, id):
+    """Serve an active user's avatar to signed-in users"""
+    user = get_object_or_404(User, id=id, is_active=True)
+    return serve_file(request, user.avatar, as_attachment=False)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def current_user(request):